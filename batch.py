@@ -0,0 +1,233 @@
+import io
+import os
+import cv2
+import csv
+import glob
+import json
+import time
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dependencies.descriptions import *
+from dependencies.video import Video
+from dependencies.objectTracker import ObjectTracker
+from main import transformFrame, detectObjects
+
+OUTPUT_DIR = "./batch_results"
+PROGRESS_FILE_NAME = "progress.jsonl"
+SUMMARY_CSV_FILE_NAME = "summary.csv"
+SUMMARY_JSON_FILE_NAME = "summary.json"
+VIDEO_FILE_EXTENSIONS = (".mp4", ".avi", ".mkv", ".mov")
+
+RESULT_FIELDS = (
+    "video_file_path",
+    "analyzed_frames",
+    "rings",
+    "necklaces",
+    "earings",
+    "processing_time",
+    "fps",
+    "error"
+)
+
+
+def main():
+
+    video_file_paths = findVideoFiles(args.input)
+    progress_file_path = os.path.join(args.output_dir, PROGRESS_FILE_NAME)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    # skip files completed in previous, interrupted runs,
+    # failed ones too, unless they should be retried
+    results = loadResults(progress_file_path)
+    if args.retry_failed:
+        results = {
+            path: result for path, result in results.items() if not result.get("error")
+        }
+    video_file_paths = [
+        path for path in video_file_paths if path not in results
+    ]
+    print(
+        f"Files to analyze: {len(video_file_paths)},",
+        f"already analyzed: {len(results)}"
+    )
+
+    with (
+        ProcessPoolExecutor(
+            max_workers=args.workers,
+            initializer=initWorker
+        ) as executor,
+        open(progress_file_path, "a") as progress_file
+    ):
+        futures = {
+            executor.submit(analyzeVideoFile, path): path for path in video_file_paths
+        }
+
+        # save each result as soon as it is ready, so it survives interruption
+        for future in as_completed(futures):
+
+            # one unreadable file must not stop the analysis of the other ones,
+            # it is saved as failed, so it is not retried by the next run
+            try:
+                result = future.result()
+            except Exception as exception:
+                result = {
+                    "video_file_path": futures[future],
+                    "error": f"{type(exception).__name__}: {exception}"
+                }
+
+            results[result["video_file_path"]] = result
+            progress_file.write(json.dumps(result) + "\n")
+            progress_file.flush()
+
+            if result.get("error"):
+                print(f"{result['video_file_path']}: failed ({result['error']})")
+                continue
+
+            print(
+                f"{result['video_file_path']}:",
+                f"rings: {result['rings']}",
+                f"necklaces: {result['necklaces']}",
+                f"earings: {result['earings']}",
+                f"({result['fps']:.1f} fps)"
+            )
+
+    saveSummary(list(results.values()))
+
+    return None
+
+
+def initWorker() -> None:
+    # each process analyzes one file, so OpenCV threads would only compete for cores
+    cv2.setNumThreads(1)
+
+
+def analyzeVideoFile(video_file_path: str) -> dict[str, str | int | float]:
+    '''
+        Runs headless pipeline with its own tracker on the whole video file.
+        Returns dict with counts of found objects and processing statistics.
+        Only the analysis of frames is timed, without opening the file.
+    '''
+    # messages about particular objects are not needed in batch mode
+    with contextlib.redirect_stdout(io.StringIO()):
+        video = Video(path=video_file_path)
+        tracker = ObjectTracker()
+
+        start_time = time.perf_counter()
+        while (org_frame := video.get_frame()) is not None:
+            rings_KP, earings_KP, necklaces_KP = detectObjects(
+                transformFrame(org_frame)
+            )
+            tracker.trackObjects(
+                rings_key_points=rings_KP,
+                necklaces_key_points=necklaces_KP,
+                earings_key_points=earings_KP
+            )
+
+        processing_time = time.perf_counter() - start_time
+        report = tracker.getTrackingReport()
+
+    if not report["analyzed_frames"]:
+        raise Exception("Could not read any frame")
+
+    return {
+        "video_file_path": video_file_path,
+        "analyzed_frames": report["analyzed_frames"],
+        "rings": report["rings"],
+        "necklaces": report["necklaces"],
+        "earings": report["earings"],
+        "processing_time": processing_time,
+        "fps": report["analyzed_frames"] / processing_time
+    }
+
+
+def findVideoFiles(input_pattern: str) -> list[str]:
+    '''
+        Returns sorted list of video files in given directory (recursively),
+        or matching given glob pattern.
+    '''
+    if os.path.isdir(input_pattern):
+        input_pattern = os.path.join(input_pattern, "**", "*")
+
+    return sorted(
+        path for path in glob.glob(input_pattern, recursive=True)
+        if os.path.isfile(path) and path.lower().endswith(VIDEO_FILE_EXTENSIONS)
+    )
+
+
+def loadResults(progress_file_path: str) -> dict[str, dict[str, str | int | float]]:
+    results = {}
+
+    if not os.path.exists(progress_file_path):
+        return results
+
+    with open(progress_file_path) as progress_file:
+        for line in progress_file:
+            # the last line might be incomplete, if previous run was killed while writing it
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            results[result["video_file_path"]] = result
+
+    return results
+
+
+def saveSummary(results: list[dict[str, str | int | float]]) -> None:
+    results.sort(key=lambda result: result["video_file_path"])
+    analyzed_results = [result for result in results if not result.get("error")]
+    failed_results = [result for result in results if result.get("error")]
+
+    with open(os.path.join(args.output_dir, SUMMARY_CSV_FILE_NAME), "w", newline="") as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=RESULT_FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+
+    with open(os.path.join(args.output_dir, SUMMARY_JSON_FILE_NAME), "w") as json_file:
+        json.dump(
+            {
+                "files": results,
+                "failed_files": [result["video_file_path"] for result in failed_results],
+                "rings": sum(result["rings"] for result in analyzed_results),
+                "necklaces": sum(result["necklaces"] for result in analyzed_results),
+                "earings": sum(result["earings"] for result in analyzed_results),
+                "analyzed_frames": sum(result["analyzed_frames"] for result in analyzed_results)
+            },
+            json_file,
+            indent=4
+        )
+
+    print(f"Summary of {len(results)} files saved to {args.output_dir}")
+    if failed_results:
+        print(f"Failed files: {len(failed_results)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=BATCH_PROGRAM_DESCRIPTION)
+    parser.add_argument(
+        "input",
+        type=str,
+        help=BATCH_INPUT_HELPER
+    )
+    parser.add_argument(
+        "-o",
+        "--output_dir",
+        default=OUTPUT_DIR,
+        type=str,
+        help=BATCH_OUTPUT_DIR_HELPER
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        default=os.cpu_count(),
+        type=int,
+        help=BATCH_WORKERS_HELPER
+    )
+    parser.add_argument(
+        "--retry_failed",
+        action="store_true",
+        help=BATCH_RETRY_FAILED_HELPER
+    )
+    args = parser.parse_args()
+
+    main()
@@ -0,0 +1,177 @@
+import cv2
+import time
+import numpy
+import argparse
+from dependencies.descriptions import *
+from dependencies.batchPreprocessing import BatchPreprocessor
+from dependencies.stripParallel import StripParallelPreprocessor
+from main import transformFrame, VIDEO_FILE_PATH
+
+FRAMES = 64
+BATCH_SIZES = (1, 2, 4, 8, 16)
+STRIPS = (1, 2, 4, 8)
+REPEATS = 3
+WIDTH = 1280
+HEIGHT = 720
+
+
+def main():
+
+    frames = readFrames(args.video_file_path, args.frames)
+    if not frames:
+        raise Exception("Could not read any frame")
+    print(f"Frames: {len(frames)} of {frames[0].shape}")
+
+    # frames are copied, as transformFrame fills contours on its gray frame
+    reference = [
+        tuple(transformed.copy() for transformed in transformFrame(frame))
+        for frame in frames
+    ]
+
+    frame_time = measure(
+        lambda: [transformFrame(frame) for frame in frames],
+        args.repeats
+    ) / len(frames)
+    print(f"Frame by frame [ms/frame]: {frame_time * 1000:.2f} ({1 / frame_time:.1f} fps)")
+
+    for batch_size in args.batch_sizes:
+        preprocessor = BatchPreprocessor()
+
+        batch_time = measure(
+            lambda: transformInBatches(preprocessor, frames, batch_size),
+            args.repeats
+        ) / len(frames)
+
+        print(
+            f"Batch {batch_size} [ms/frame]: {batch_time * 1000:.2f}",
+            f"({1 / batch_time:.1f} fps, speedup: {frame_time / batch_time:.2f},",
+            f"identical: {isIdentical(preprocessor, frames, batch_size, reference)})"
+        )
+
+    # serial transformFrame uses the same OpenCV closing, so only the gain of strips is measured
+    for strips in args.strips:
+        preprocessor = StripParallelPreprocessor(strips=strips)
+
+        strip_time = measure(
+            lambda: [preprocessor.transformFrame(frame) for frame in frames],
+            args.repeats
+        ) / len(frames)
+
+        identical = all(
+            all(numpy.array_equal(a, b) for a, b in zip(preprocessor.transformFrame(frame), expected))
+            for frame, expected in zip(frames, reference)
+        )
+        print(
+            f"Strips {strips} [ms/frame]: {strip_time * 1000:.2f}",
+            f"({1 / strip_time:.1f} fps, speedup: {frame_time / strip_time:.2f},",
+            f"identical: {identical})"
+        )
+
+    return None
+
+
+def readFrames(video_file_path: str, frames: int) -> list[numpy.ndarray]:
+    '''
+        Returns frames decoded in advance and resized as by Video,
+        so decoding is not measured.
+    '''
+    capture = cv2.VideoCapture(video_file_path)
+    decoded_frames = []
+
+    while len(decoded_frames) < frames:
+        frame_flag, frame = capture.read()
+        if not frame_flag:
+            break
+        decoded_frames.append(cv2.resize(frame, (WIDTH, HEIGHT)))
+
+    capture.release()
+
+    return decoded_frames
+
+
+def transformInBatches(
+    preprocessor: BatchPreprocessor,
+    frames: list[numpy.ndarray],
+    batch_size: int
+) -> list[tuple[numpy.ndarray, numpy.ndarray]]:
+    transformed_frames = []
+    for start in range(0, len(frames), batch_size):
+        transformed_frames.extend(
+            preprocessor.transformFrames(frames[start:start + batch_size])
+        )
+
+    return transformed_frames
+
+
+def isIdentical(
+    preprocessor: BatchPreprocessor,
+    frames: list[numpy.ndarray],
+    batch_size: int,
+    reference: list[tuple[numpy.ndarray, numpy.ndarray]]
+) -> bool:
+    # returned frames are valid only until the next batch, so each batch is compared separately
+    for start in range(0, len(frames), batch_size):
+        for transformed, expected in zip(
+            preprocessor.transformFrames(frames[start:start + batch_size]),
+            reference[start:start + batch_size]
+        ):
+            if not all(numpy.array_equal(a, b) for a, b in zip(transformed, expected)):
+                return False
+
+    return True
+
+
+def measure(function, repeats: int) -> float:
+    '''
+        Returns the shortest time of repeated calls of the function.
+    '''
+    times = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start_time)
+
+    return min(times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=BENCHMARK_PROGRAM_DESCRIPTION)
+    parser.add_argument(
+        "-p",
+        "--video_file_path",
+        default=VIDEO_FILE_PATH,
+        type=str,
+        help=VIDEO_FILE_PATH_HELPER
+    )
+    parser.add_argument(
+        "-n",
+        "--frames",
+        default=FRAMES,
+        type=int,
+        help=BENCHMARK_FRAMES_HELPER
+    )
+    parser.add_argument(
+        "-k",
+        "--batch_sizes",
+        nargs="*",
+        default=BATCH_SIZES,
+        type=int,
+        help=BENCHMARK_BATCH_SIZES_HELPER
+    )
+    parser.add_argument(
+        "-s",
+        "--strips",
+        nargs="*",
+        default=STRIPS,
+        type=int,
+        help=BENCHMARK_STRIPS_HELPER
+    )
+    parser.add_argument(
+        "--repeats",
+        default=REPEATS,
+        type=int,
+        help=BENCHMARK_REPEATS_HELPER
+    )
+    args = parser.parse_args()
+
+    main()
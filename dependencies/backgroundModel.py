@@ -0,0 +1,80 @@
+import cv2
+import numpy
+from typing import Final
+from dataclasses import dataclass, field
+from dependencies.segmentation import Segmentation
+
+
+@dataclass
+class BackgroundModel:
+    '''
+        Learns static background of the scene (belt surface, frame, lights)
+        with MOG2 background subtractor and returns bounding boxes of foreground regions,
+        so the further processing can be limited to them.
+
+        Model is learned on downsampled frame, as only rough regions are needed.
+        Foreground mask is opened, to remove single noisy pixels, which would join regions together.
+        Boxes are extended by margin, so edges and blobs of objects are not cut.
+
+        WARNING: objects which do not move for longer than HISTORY frames
+        become part of the background.
+    '''
+
+    DOWNSAMPLE_FACTOR: Final[int] = 4
+    HISTORY: Final[int] = 500
+    VAR_THRESHOLD: Final[float] = 16
+    MIN_REGION_AREA: Final[int] = 400
+    REGION_MARGIN: Final[int] = 24
+
+    __subtractor: cv2.BackgroundSubtractorMOG2 = field(init=False, default=None)
+    __opening_kernel: numpy.ndarray = field(init=False, default=None)
+
+    def __post_init__(self):
+        self.__subtractor = cv2.createBackgroundSubtractorMOG2(
+            history=self.HISTORY,
+            varThreshold=self.VAR_THRESHOLD,
+            detectShadows=False
+        )
+        self.__opening_kernel = cv2.getStructuringElement(
+            cv2.MORPH_ELLIPSE,
+            (3, 3)
+        )
+
+    def getForegroundRegions(self, frame: numpy.ndarray) -> list[tuple[int, int, int, int]]:
+        '''
+            Updates background model with provided frame.
+            Returns list of not overlapping foreground regions, as (x, y, width, height)
+            in coordinates of provided frame.
+        '''
+        small_frame = cv2.resize(
+            frame,
+            None,
+            fx=1 / self.DOWNSAMPLE_FACTOR,
+            fy=1 / self.DOWNSAMPLE_FACTOR,
+            interpolation=cv2.INTER_AREA
+        )
+        foreground_mask = cv2.morphologyEx(
+            self.__subtractor.apply(small_frame),
+            cv2.MORPH_OPEN,
+            self.__opening_kernel
+        )
+
+        # scale boxes back to the frame resolution
+        boxes = [
+            (
+                x * self.DOWNSAMPLE_FACTOR,
+                y * self.DOWNSAMPLE_FACTOR,
+                width * self.DOWNSAMPLE_FACTOR,
+                height * self.DOWNSAMPLE_FACTOR
+            )
+            for x, y, width, height in Segmentation.boundingBoxes(
+                foreground_mask,
+                self.MIN_REGION_AREA // (self.DOWNSAMPLE_FACTOR ** 2)
+            )
+        ]
+
+        return Segmentation.mergeBoxes(
+            boxes,
+            self.REGION_MARGIN,
+            frame.shape[:2]
+        )
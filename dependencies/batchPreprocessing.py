@@ -0,0 +1,243 @@
+import cv2
+import numpy
+from typing import Final
+from collections import deque
+from dataclasses import dataclass, field
+from skimage import morphology
+from dependencies.filter import Filter
+from dependencies.segmentation import Segmentation
+from dependencies.draw import Draw
+from dependencies.video import Video
+
+
+@dataclass
+class BatchPreprocessor:
+    '''
+        Transforms many frames the same way as transformFrame in main.py (in full resolution),
+        but as one tall image, where frames are stacked one under another, separated by guard rows,
+        so each step is called once per batch instead of once per frame.
+        Result is bit-identical to transformFrame.
+
+        Steps:
+            - gray conversion, which writes each frame straight into the tall image (stacking without copy),
+            - gaussian blur of the tall image, guard rows reflect rows of neighbouring frames,
+              as the border of a single frame is reflected,
+            - edge detection of each frame, written into the tall image,
+              as Canny hysteresis and non-maximum suppression would cross guard rows,
+            - closing of the tall image as dilation and erosion,
+              guard rows are set between them, so they do not affect rows of frames,
+            - contours found and filled on the whole tall image, guard rows separate contours of frames.
+        Frames for detection are returned as views of the tall images, which are reused by the next batch.
+    '''
+
+    BATCH_SIZE: Final[int] = 4
+
+    __shape: tuple[int, ...] = field(init=False, default=None)
+    __gray_frames: numpy.ndarray = field(init=False, default=None)
+    __canny_frames: numpy.ndarray = field(init=False, default=None)
+    __rings_frames: numpy.ndarray = field(init=False, default=None)
+    __closing_kernel: numpy.ndarray = field(init=False, default=None)
+    __closing_radius: int = field(init=False, default=None)
+
+    def transformFrames(
+        self,
+        frames: list[numpy.ndarray]
+    ) -> list[
+        tuple[
+            numpy.ndarray,
+            numpy.ndarray
+        ]
+    ]:
+        '''
+            Returns 2 frames in tuple for each frame, as transformFrame.
+            All frames have to be of the same shape.
+            Returned frames are valid until the next call.
+        '''
+        height = frames[0].shape[0]
+        guard = BatchPreprocessor.getGuardRows()
+        offsets = [i * (height + guard) for i in range(len(frames))]
+        frame_rows = [slice(offset, offset + height) for offset in offsets]
+        guard_rows = [slice(offset + height, offset + height + guard) for offset in offsets[:-1]]
+
+        self.__allocate(len(frames), frames[0].shape[:2], guard)
+
+        # gray conversion, straight into the tall image
+        for frame, rows in zip(frames, frame_rows):
+            cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self.__gray_frames[rows])
+
+        # gaussian blur, guard rows reflect both neighbouring frames (border of the blur)
+        gauss_halo = Filter.GAUSS_K_SIZE[1] // 2
+        for rows, above, below in zip(guard_rows, frame_rows[:-1], frame_rows[1:]):
+            BatchPreprocessor.__reflect_into_guard(self.__gray_frames, rows, above, below, gauss_halo)
+        gaussian_frames = Filter.gauss(self.__gray_frames)
+
+        # edge detection of each frame, straight into the tall image
+        for rows in frame_rows:
+            cv2.Canny(
+                gaussian_frames[rows],
+                Filter.CANNY_THR_1,
+                Filter.CANNY_THR_2,
+                edges=self.__canny_frames[rows]
+            )
+        for rows in guard_rows:
+            self.__canny_frames[rows] = 0
+
+        # closing as dilation and erosion, guard rows are ignored by erosion,
+        # as the border of a single frame is
+        dilated_frames = cv2.dilate(self.__canny_frames, self.__closing_kernel)
+        for rows in guard_rows:
+            dilated_frames[rows] = 255
+        cv2.erode(dilated_frames, self.__closing_kernel, dst=self.__rings_frames)
+        for rows in guard_rows:
+            self.__rings_frames[rows] = 0
+
+        # contours of all frames found and filled at once
+        contours = Segmentation.findContours(self.__rings_frames)
+        Draw.contourFill(self.__gray_frames, contours)
+
+        return [
+            (self.__rings_frames[rows], self.__gray_frames[rows]) for rows in frame_rows
+        ]
+
+    @staticmethod
+    def getGuardRows() -> int:
+        '''
+            Returns number of rows between frames: reflection of both frames for the blur
+            and disk radius for the closing (at least one row, to separate contours).
+        '''
+        return max(
+            2 * (Filter.GAUSS_K_SIZE[1] // 2),
+            Filter.CLOSING_DISK_RADIUS,
+            1
+        )
+
+    def __allocate(self, frames: int, frame_shape: tuple[int, int], guard: int) -> None:
+        height, width = frame_shape
+        shape = (frames * height + (frames - 1) * guard, width)
+
+        if self.__shape != shape:
+            self.__shape = shape
+            self.__gray_frames = numpy.empty(shape, dtype=numpy.uint8)
+            self.__canny_frames = numpy.empty(shape, dtype=numpy.uint8)
+            self.__rings_frames = numpy.empty(shape, dtype=numpy.uint8)
+
+        # closing constants can be changed by config reload, so the kernel is rebuilt only then
+        if self.__closing_radius != Filter.CLOSING_DISK_RADIUS:
+            self.__closing_radius = Filter.CLOSING_DISK_RADIUS
+            self.__closing_kernel = morphology.disk(self.__closing_radius).astype(numpy.uint8)
+
+        return None
+
+    @staticmethod
+    def __reflect_into_guard(
+        tall_frame: numpy.ndarray,
+        guard_rows: slice,
+        above: slice,
+        below: slice,
+        halo: int
+    ) -> None:
+        '''
+            Fills the first halo guard rows with reflection of the frame above
+            and the last halo guard rows with reflection of the frame below (the same as BORDER_REFLECT_101).
+        '''
+        if halo == 0:
+            return None
+
+        tall_frame[guard_rows.start:guard_rows.start + halo] = (
+            tall_frame[above.stop - 2:above.stop - 2 - halo:-1]
+        )
+        tall_frame[guard_rows.stop - halo:guard_rows.stop] = (
+            tall_frame[below.start + halo:below.start:-1]
+        )
+
+        return None
+
+
+@dataclass
+class BatchedVideo:
+    '''
+        Reads frames from the video in batches of batch_size frames and transforms each batch
+        at once with BatchPreprocessor, for offline processing of recordings.
+        Frames are returned one by one, as by Video.get_frame,
+        transformed frames of the current one are returned by get_transformed_frames.
+        Frames can not be skipped, as the whole batch is already read.
+    '''
+
+    video: Video = field(default=None)
+    batch_size: int = field(default=BatchPreprocessor.BATCH_SIZE)
+
+    frame_no: int = field(init=False, default=None)
+    capture_timestamp: float = field(init=False, default=None)
+    current_frame: numpy.ndarray = field(init=False, default=None)
+
+    __preprocessor: BatchPreprocessor = field(init=False, default_factory=BatchPreprocessor)
+    __batch: deque = field(init=False, default_factory=deque)
+    __transformed_frames: tuple[numpy.ndarray, numpy.ndarray] = field(init=False, default=None)
+
+    def __post_init__(self):
+        if self.video is None:
+            raise Exception("Video not defined")
+
+        self.frame_no = self.video.frame_no
+
+    @property
+    def fps(self) -> float:
+        return self.video.fps
+
+    @property
+    def width(self) -> int:
+        return self.video.width
+
+    @property
+    def height(self) -> int:
+        return self.video.height
+
+    @property
+    def captured_frames(self) -> int:
+        return self.video.captured_frames
+
+    @property
+    def dropped_frames(self) -> int:
+        return self.video.dropped_frames
+
+    def get_frame(self) -> numpy.ndarray:
+        if not self.__batch:
+            self.__read_batch()
+
+        if not self.__batch:
+            return None
+
+        (
+            self.current_frame,
+            self.frame_no,
+            self.capture_timestamp,
+            self.__transformed_frames
+        ) = self.__batch.popleft()
+
+        return self.current_frame
+
+    def get_transformed_frames(self) -> tuple[numpy.ndarray, numpy.ndarray]:
+        return self.__transformed_frames
+
+    def skip_frames(self, frames_to_skip: int) -> None:
+        if frames_to_skip:
+            raise Exception("Frames can not be skipped in batches")
+
+    def show_frame(self, frame: numpy.ndarray = None) -> None:
+        self.video.show_frame(frame)
+
+    def __read_batch(self) -> None:
+        frames = []
+        while len(frames) < self.batch_size and (frame := self.video.get_frame()) is not None:
+            frames.append((frame, self.video.frame_no, self.video.capture_timestamp))
+
+        if not frames:
+            return None
+
+        transformed_frames = self.__preprocessor.transformFrames(
+            [frame for frame, _, _ in frames]
+        )
+        for (frame, frame_no, capture_timestamp), transformed in zip(frames, transformed_frames):
+            self.__batch.append((frame, frame_no, capture_timestamp, transformed))
+
+        return None
@@ -0,0 +1,77 @@
+import cv2
+import numpy
+from typing import Final
+from dataclasses import dataclass, field
+
+X = 0
+Y = 1
+
+
+@dataclass
+class BeltMotionEstimator:
+    '''
+        Measures conveyor belt displacement between consecutive analyzed frames,
+        using phase correlation on downsampled horizontal strip of the belt.
+        Returned displacement is in pixels of the full resolution frame.
+
+        If the correlation response is too weak (i.e. belt strip without any texture),
+        the last reliable measurement is returned, assuming constant belt speed.
+    '''
+
+    DOWNSAMPLE_FACTOR: Final[int] = 4
+    MIN_RESPONSE: Final[float] = 0.1
+
+    strip_top: int = field(default=0)
+    strip_bottom: int = field(default=720)
+
+    movement: tuple[float, float] = field(init=False, default=(0.0, 0.0))
+
+    __previous_strip: numpy.ndarray = field(init=False, default=None)
+    __window: numpy.ndarray = field(init=False, default=None)
+
+    def estimate(self, frame: numpy.ndarray) -> tuple[float, float]:
+        '''
+            Returns belt displacement (x, y) between previous and provided frame.
+            For the first frame there is nothing to compare to, so (0, 0) is returned.
+        '''
+        strip = self.__prepare_strip(frame)
+
+        if self.__previous_strip is None:
+            self.__previous_strip = strip
+            self.__window = cv2.createHanningWindow(
+                (strip.shape[1], strip.shape[0]),
+                cv2.CV_32F
+            )
+            return (0.0, 0.0)
+
+        shift, response = cv2.phaseCorrelate(
+            self.__previous_strip,
+            strip,
+            self.__window
+        )
+        self.__previous_strip = strip
+
+        # keep last reliable measurement if correlation peak is too weak
+        if response >= self.MIN_RESPONSE:
+            self.movement = (
+                shift[X] * self.DOWNSAMPLE_FACTOR,
+                shift[Y] * self.DOWNSAMPLE_FACTOR
+            )
+
+        return self.movement
+
+    def __prepare_strip(self, frame: numpy.ndarray) -> numpy.ndarray:
+
+        # downsample before color conversion, to convert as little pixels as possible
+        strip = cv2.resize(
+            frame[self.strip_top:self.strip_bottom],
+            None,
+            fx=1 / self.DOWNSAMPLE_FACTOR,
+            fy=1 / self.DOWNSAMPLE_FACTOR,
+            interpolation=cv2.INTER_AREA
+        )
+
+        if strip.ndim == 3:
+            strip = cv2.cvtColor(strip, cv2.COLOR_BGR2GRAY)
+
+        return numpy.float32(strip)
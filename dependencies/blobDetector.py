@@ -24,8 +24,9 @@ class BlobDetector:
     min_inertia_ratio: float = field(default=0.2, init=True)
     max_inertia_ratio: float = field(default=0.8, init=True)
 
-    detector_params: cv2.SimpleBlobDetector = field(
-        default=cv2.SimpleBlobDetector_Params(), init=False
+    # each detector needs its own params object, default one would be shared by all of them
+    detector_params: cv2.SimpleBlobDetector_Params = field(
+        default_factory=cv2.SimpleBlobDetector_Params, init=False
     )
     blob_detector: cv2.SimpleBlobDetector = field(default=None, init=False)
 
@@ -0,0 +1,261 @@
+import cv2
+import time
+import numpy
+import threading
+from abc import ABC, abstractmethod
+from typing import Final
+from dataclasses import dataclass, field
+
+
+@dataclass
+class LatestFrameCapture(ABC):
+    '''
+        Parent class for live frame sources.
+        Frames are read in background thread and only the newest one is kept,
+        so analysis always gets the latest frame and latency does not grow,
+        when analysis is slower than the source. Frames which were replaced
+        before being taken by analysis are counted as dropped.
+
+        Inheritance classes have to define abstract _open_source and _read_source methods.
+        Frames are numbered by _source_frame_no, which counts captured frames by default.
+    '''
+
+    WINDOW_TITLE: Final[str] = "Frame"
+    MSG_VIDEO_ENDED: Final[str] = "Video ended"
+
+    DELAY_BETWEEN_FRAMES: Final[int] = 1
+    RETRY_LIMIT_GET_FRAME: Final[int] = 3
+    FRAME_WAIT_TIMEOUT: Final[float] = 1.0
+    # used if the source does not report its frame rate, the same as in main.py
+    DEFAULT_FPS: Final[float] = 30
+
+    EXIT_KEY: int = 27
+
+    width: int = field(default=1280)
+    height: int = field(default=720)
+
+    frame_no: int = field(default=0, init=False)
+    fps: float = field(default=None, init=False)
+    frame_flag: bool = field(default=True, init=False)
+    capture: cv2.VideoCapture = field(default=None, init=False)
+    current_frame: numpy.ndarray = field(default=None, init=False)
+    capture_timestamp: float = field(default=None, init=False)
+
+    captured_frames: int = field(default=0, init=False)
+    dropped_frames: int = field(default=0, init=False)
+    processed_frames: int = field(default=0, init=False)
+
+    __latency_sum: float = field(default=0.0, init=False)
+    __latency_max: float = field(default=0.0, init=False)
+
+    __latest: tuple[numpy.ndarray, int, float] = field(default=None, init=False)
+    __source_ended: bool = field(default=False, init=False)
+    __running: bool = field(default=False, init=False)
+    __new_frame: threading.Condition = field(
+        default_factory=threading.Condition,
+        init=False
+    )
+    __thread: threading.Thread = field(default=None, init=False)
+
+    def __post_init__(self):
+        self._open_source()
+
+        self.__running = True
+        self.__thread = threading.Thread(
+            target=self.__capture_loop,
+            daemon=True
+        )
+        self.__thread.start()
+
+    def __del__(self):
+        self.release()
+
+    @abstractmethod
+    def _open_source(self) -> None:
+        ...
+
+    @abstractmethod
+    def _read_source(self) -> tuple[bool, numpy.ndarray]:
+        ...
+
+    def _source_frame_no(self) -> int:
+        # called after the frame was captured, so the first frame is 1
+        return self.captured_frames
+
+    def release(self) -> None:
+        self.__running = False
+        if self.__thread is not None and self.__thread is not threading.current_thread():
+            self.__thread.join()
+        cv2.destroyAllWindows()
+        if self.capture is not None:
+            self.capture.release()
+
+    def pause(self, delay_counter: int = 1) -> None:
+        return (cv2.waitKey(pow(self.DELAY_BETWEEN_FRAMES, delay_counter)) == self.EXIT_KEY)
+
+    def get_frame(self) -> numpy.ndarray:
+
+        if self.pause():
+            print("Program exited")
+            self.frame_flag = False
+            return None
+
+        # wait for a frame, which was not taken yet
+        with self.__new_frame:
+            while self.__latest is None and not self.__source_ended:
+                self.__new_frame.wait(self.FRAME_WAIT_TIMEOUT)
+
+            if self.__latest is None:
+                print(self.MSG_VIDEO_ENDED)
+                self.frame_flag = False
+                return None
+
+            self.current_frame, self.frame_no, self.capture_timestamp = self.__latest
+            self.__latest = None
+
+        self.current_frame = cv2.resize(
+            self.current_frame,
+            (self.width, self.height)
+        )
+        return self.current_frame
+
+    def skip_frames(self, frames_to_skip: int) -> None:
+        # live source always provides the newest frame, so there is nothing to skip,
+        # scheduler of live source never asks for it
+        return None
+
+    def mark_processed(self) -> None:
+        '''
+            Has to be called after the last frame returned by get_frame was processed,
+            to measure capture to process latency.
+        '''
+        latency = time.monotonic() - self.capture_timestamp
+        self.processed_frames = self.processed_frames + 1
+        self.__latency_sum = self.__latency_sum + latency
+        self.__latency_max = max(self.__latency_max, latency)
+
+    def show_frame(self, frame: numpy.ndarray = None) -> None:
+        if self.frame_flag is False:
+            return
+
+        cv2.imshow(
+            self.WINDOW_TITLE,
+            self.current_frame if frame is None else frame
+        )
+
+    def is_ended(self) -> bool:
+        return self.frame_flag is False
+
+    def print_capture_report(self) -> None:
+        print("Captured frames: ", self.captured_frames)
+        print("Dropped frames: ", self.dropped_frames)
+        print("Processed frames: ", self.processed_frames)
+        if self.processed_frames:
+            print(
+                "Capture to process latency [ms]: ",
+                "mean", round(self.__latency_sum / self.processed_frames * 1000, 2),
+                "max", round(self.__latency_max * 1000, 2)
+            )
+
+    def __capture_loop(self) -> None:
+
+        # Init retry counter
+        retry_counter: int = 0
+
+        while self.__running:
+            frame_flag, frame = self._read_source()
+            timestamp = time.monotonic()
+
+            # There is a chance that reading might fail,
+            # so source is considered as ended after RETRY_LIMIT_GET_FRAME failures in a row
+            if not frame_flag:
+                if (retry_counter := retry_counter + 1) < self.RETRY_LIMIT_GET_FRAME:
+                    continue
+                break
+            retry_counter = 0
+
+            with self.__new_frame:
+                self.captured_frames = self.captured_frames + 1
+
+                # previous frame was not taken by analysis, so it is dropped
+                if self.__latest is not None:
+                    self.dropped_frames = self.dropped_frames + 1
+
+                self.__latest = (frame, self._source_frame_no(), timestamp)
+                self.__new_frame.notify_all()
+
+        with self.__new_frame:
+            self.__source_ended = True
+            self.__new_frame.notify_all()
+
+
+@dataclass
+class CameraCapture(LatestFrameCapture):
+    '''
+        Live camera, available as V4L2 device with given index.
+    '''
+
+    device_index: int = field(default=0)
+
+    def _open_source(self) -> None:
+        self.capture = cv2.VideoCapture(self.device_index, cv2.CAP_V4L2)
+
+        if not self.capture.isOpened():
+            raise Exception("Could not open camera")
+
+        self.capture.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        self.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        self.fps = self.capture.get(cv2.CAP_PROP_FPS)
+
+    def _read_source(self) -> tuple[bool, numpy.ndarray]:
+        return self.capture.read()
+
+
+@dataclass
+class SimulatedCamera(LatestFrameCapture):
+    '''
+        Replays video file in real time, with its native frame rate,
+        to test the live path without a camera.
+        Frames are numbered by their position in the file, as by Video,
+        so checkpoints and recordings point to the right frames.
+    '''
+
+    path: str = field(default=None)
+    start_frame_no: int = field(default=0)
+
+    __frame_period: float = field(default=None, init=False)
+    __start_time: float = field(default=None, init=False)
+    __read_frames: int = field(default=0, init=False)
+
+    def _open_source(self) -> None:
+        if self.path is None:
+            raise Exception("Path not defined")
+
+        self.capture = cv2.VideoCapture(self.path)
+
+        if not self.capture.isOpened():
+            raise Exception("Could not open video file")
+
+        self.capture.set(cv2.CAP_PROP_POS_FRAMES, self.start_frame_no)
+        self.fps = self.capture.get(cv2.CAP_PROP_FPS) or self.DEFAULT_FPS
+        self.__frame_period = 1 / self.fps
+
+    def _read_source(self) -> tuple[bool, numpy.ndarray]:
+        frame_flag, frame = self.capture.read()
+
+        # release the frame not earlier than the camera would deliver it
+        if self.__start_time is None:
+            self.__start_time = time.monotonic()
+        self.__read_frames = self.__read_frames + 1
+        delay = (
+            self.__start_time +
+            self.__read_frames * self.__frame_period -
+            time.monotonic()
+        )
+        if delay > 0:
+            time.sleep(delay)
+
+        return (frame_flag, frame)
+
+    def _source_frame_no(self) -> int:
+        return int(self.capture.get(cv2.CAP_PROP_POS_FRAMES))
@@ -0,0 +1,120 @@
+import os
+import queue
+import pickle
+import threading
+from typing import Final
+from dataclasses import dataclass, field
+from dependencies.objectTracker import ObjectTracker
+
+
+@dataclass
+class TrackerCheckpointer:
+    '''
+        Periodically saves the state of the tracker, together with the number of the next frame
+        to analyze, so the analysis can be resumed after crash.
+
+        State is taken on the calling thread, between frames, so it is consistent.
+        It is pickled and written on background thread, to temporary file,
+        which then replaces the checkpoint, so the checkpoint is never partially written.
+        Both the file and its directory are synced, so the replaced checkpoint survives power loss.
+        Taking the state is cheap, as objects convert only new positions and retired ones are taken once.
+        If the writer can not keep up, only the newest pending state is written.
+        Checkpoints which could not be written (i.e. disk full) are reported and counted,
+        the analysis goes on and the next checkpoint is written again.
+    '''
+
+    CHECKPOINT_INTERVAL: Final[int] = 300
+    CLOSE_POLL_INTERVAL: Final[float] = 0.1
+
+    path: str = field(default=None)
+    interval: int = field(default=CHECKPOINT_INTERVAL)
+
+    failed_writes: int = field(init=False, default=0)
+
+    __frames_since_checkpoint: int = field(init=False, default=0)
+    __pending: queue.Queue = field(init=False, default=None)
+    __thread: threading.Thread = field(init=False, default=None)
+
+    def __post_init__(self):
+        if self.path is None:
+            raise Exception("Path not defined")
+
+        self.__pending = queue.Queue(maxsize=1)
+        self.__thread = threading.Thread(target=self.__writer_loop, daemon=True)
+        self.__thread.start()
+
+    def update(self, frame_no: int, tracker: ObjectTracker) -> None:
+        '''
+            Has to be called after each analyzed frame.
+            frame_no is the number of the next frame to analyze.
+        '''
+        self.__frames_since_checkpoint = self.__frames_since_checkpoint + 1
+
+        if self.__frames_since_checkpoint < self.interval:
+            return None
+
+        self.__frames_since_checkpoint = 0
+        self.__put((int(frame_no), tracker.getState()))
+
+        return None
+
+    def close(self) -> None:
+        '''
+            Waits until the pending checkpoint is written and stops the writer.
+            Does not wait, if the writer is not running any more.
+        '''
+        while self.__thread.is_alive():
+            try:
+                self.__pending.put(None, timeout=self.CLOSE_POLL_INTERVAL)
+                break
+            except queue.Full:
+                continue
+
+        self.__thread.join()
+
+    @staticmethod
+    def load(path: str) -> tuple[int, dict]:
+        '''
+            Returns number of the next frame to analyze and tracker state.
+        '''
+        with open(path, "rb") as checkpoint_file:
+            return pickle.load(checkpoint_file)
+
+    def __put(self, checkpoint: tuple[int, dict]) -> None:
+
+        # replace checkpoint which is still waiting, as the new one is more recent
+        try:
+            self.__pending.get_nowait()
+        except queue.Empty:
+            pass
+
+        self.__pending.put(checkpoint)
+
+    def __writer_loop(self) -> None:
+        temporary_path = self.path + ".tmp"
+
+        while (checkpoint := self.__pending.get()) is not None:
+            try:
+                with open(temporary_path, "wb") as checkpoint_file:
+                    pickle.dump(checkpoint, checkpoint_file, protocol=pickle.HIGHEST_PROTOCOL)
+                    checkpoint_file.flush()
+                    os.fsync(checkpoint_file.fileno())
+
+                os.replace(temporary_path, self.path)
+                TrackerCheckpointer.__sync_directory(self.path)
+
+            # previous checkpoint is left untouched, the next one will be tried again
+            except Exception as exception:
+                self.failed_writes = self.failed_writes + 1
+                print(f"Checkpoint of frame {checkpoint[0]} not written: {exception}")
+
+    @staticmethod
+    def __sync_directory(path: str) -> None:
+        '''
+            Writes the directory entry of replaced file to disk, so the replacement survives power loss.
+        '''
+        directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
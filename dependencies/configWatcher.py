@@ -0,0 +1,205 @@
+import os
+import json
+import threading
+import dataclasses
+from typing import Final
+from dataclasses import dataclass, field
+from dependencies.filter import Filter
+from dependencies.blobDetector import BlobDetector
+from dependencies.objectsDefinition import Ring, Necklace, Earings
+
+# sections of config file with constants, and classes they are applied to
+CONFIGURABLE_CLASSES = {
+    "Filter": Filter,
+    "Ring": Ring,
+    "Necklace": Necklace,
+    "Earings": Earings
+}
+DETECTORS_SECTION = "detectors"
+
+# parameters of BlobDetector, which OpenCV accepts only as integers,
+# other numeric parameters are floats, regardless of their default values
+INTEGER_DETECTOR_PARAMETERS = ("blob_color",)
+
+
+@dataclass
+class PipelineConfig:
+    '''
+        Configuration loaded from file, ready to be applied:
+            - detectors <- blob detectors already built, by name (rings, earings, necklaces),
+            - constants <- values of all configurable constants, by class.
+    '''
+
+    detectors: dict[str, BlobDetector] = field(default_factory=dict)
+    constants: dict[type, dict[str, int | float | tuple]] = field(default_factory=dict)
+
+    def applyConstants(self) -> None:
+        for configurable_class, constants in self.constants.items():
+            for name, value in constants.items():
+                setattr(configurable_class, name, value)
+
+
+@dataclass
+class ConfigWatcher:
+    '''
+        Watches JSON config file and loads it on background thread, each time it is modified.
+        Detectors are built while loading, so applying config between frames only swaps them.
+
+        Config file contains sections:
+            - detectors <- parameters of BlobDetector, for rings, earings and necklaces,
+            - Filter, Ring, Necklace, Earings <- constants of these classes.
+        Values not present in the file are the default ones, so removing a value restores it.
+        If file can not be loaded or contains unknown values, previous config is kept.
+    '''
+
+    POLL_INTERVAL: Final[float] = 1.0
+
+    path: str = field(default=None)
+    detectors: dict[str, BlobDetector] = field(default=None)
+    poll_interval: float = field(default=POLL_INTERVAL)
+
+    __default_constants: dict[type, dict[str, int | float | tuple]] = field(init=False, default=None)
+    __modification_time: int = field(init=False, default=None)
+    __pending: PipelineConfig = field(init=False, default=None)
+    __lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    __stopped: threading.Event = field(init=False, default_factory=threading.Event)
+    __thread: threading.Thread = field(init=False, default=None)
+
+    def __post_init__(self):
+        if self.path is None:
+            raise Exception("Path not defined")
+
+        if self.detectors is None:
+            raise Exception("Detectors not defined")
+
+        self.__default_constants = {
+            configurable_class: {
+                name: getattr(configurable_class, name)
+                for name in dir(configurable_class)
+                if name.isupper() and isinstance(getattr(configurable_class, name), (int, float, tuple))
+            }
+            for configurable_class in CONFIGURABLE_CLASSES.values()
+        }
+
+        # the first config is loaded immediately, so it is applied before the first frame
+        self.__check_file()
+
+        self.__thread = threading.Thread(target=self.__watch_loop, daemon=True)
+        self.__thread.start()
+
+    def takePendingConfig(self) -> PipelineConfig | None:
+        '''
+            Returns config loaded since the previous call, or None if file was not modified.
+        '''
+        with self.__lock:
+            config, self.__pending = self.__pending, None
+
+        return config
+
+    def stop(self) -> None:
+        self.__stopped.set()
+        self.__thread.join()
+
+    def __watch_loop(self) -> None:
+        while not self.__stopped.wait(self.poll_interval):
+            self.__check_file()
+
+    def __check_file(self) -> None:
+        try:
+            modification_time = os.stat(self.path).st_mtime_ns
+        except OSError:
+            # file might be replaced just now, so keep current config
+            return None
+
+        if modification_time == self.__modification_time:
+            return None
+
+        self.__modification_time = modification_time
+
+        try:
+            config = self.__load()
+        except (OSError, ValueError, TypeError) as error:
+            print(f"Config {self.path} not applied: {error}")
+            return None
+
+        with self.__lock:
+            self.__pending = config
+
+        print(f"Config {self.path} loaded")
+
+        return None
+
+    def __load(self) -> PipelineConfig:
+        with open(self.path) as config_file:
+            content = json.load(config_file)
+
+        if not isinstance(content, dict):
+            raise ValueError("config has to be JSON object")
+
+        unknown_sections = set(content) - set(CONFIGURABLE_CLASSES) - {DETECTORS_SECTION}
+        if unknown_sections:
+            raise ValueError(f"unknown sections {sorted(unknown_sections)}")
+
+        detectors_parameters = content.get(DETECTORS_SECTION, {})
+        unknown_detectors = set(detectors_parameters) - set(self.detectors)
+        if unknown_detectors:
+            raise ValueError(f"unknown detectors {sorted(unknown_detectors)}")
+
+        config = PipelineConfig()
+
+        for name, default_detector in self.detectors.items():
+            parameters = {}
+            for parameter, value in detectors_parameters.get(name, {}).items():
+                if (
+                    parameter not in BlobDetector.__dataclass_fields__ or
+                    not BlobDetector.__dataclass_fields__[parameter].init
+                ):
+                    raise ValueError(f"unknown parameter {parameter} of {name} detector")
+
+                default = getattr(default_detector, parameter)
+                if not isinstance(default, bool) and parameter not in INTEGER_DETECTOR_PARAMETERS:
+                    default = float(default)
+
+                parameters[parameter] = ConfigWatcher.__convert(value, default, parameter)
+
+            # new detector is built here, with its own params
+            config.detectors[name] = dataclasses.replace(default_detector, **parameters)
+
+        for section, configurable_class in CONFIGURABLE_CLASSES.items():
+            constants = dict(self.__default_constants[configurable_class])
+            for name, value in content.get(section, {}).items():
+                if name not in constants:
+                    raise ValueError(f"unknown constant {section}.{name}")
+
+                constants[name] = ConfigWatcher.__convert(value, constants[name], f"{section}.{name}")
+
+            config.constants[configurable_class] = constants
+
+        return config
+
+    @staticmethod
+    def __convert(value, default, name: str) -> int | float | bool | tuple:
+        '''
+            Returns value converted to the type of default value.
+            Raises TypeError if it is not possible.
+        '''
+        if isinstance(default, bool):
+            if isinstance(value, bool):
+                return value
+
+        elif isinstance(default, int):
+            if isinstance(value, int) and not isinstance(value, bool):
+                return value
+
+        elif isinstance(default, float):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return float(value)
+
+        elif isinstance(default, tuple):
+            if isinstance(value, list) and len(value) == len(default):
+                return tuple(
+                    ConfigWatcher.__convert(item, default_item, name)
+                    for item, default_item in zip(value, default)
+                )
+
+        raise TypeError(f"{name} has to be of the same type as {default!r}")
@@ -10,3 +10,287 @@ Relative or absolute path to video file to analyze.
 START_FRAME_NUMBER_HELPER = """
 Frame number from which program starts analysis.
 """
+
+RECORD_KEY_POINTS_HELPER = """
+Path to .npz file, where key points found on each frame will be recorded.
+Recording can be replayed with replay.py to tune tracker without image processing.
+Key points are flushed to partial files during the run, so recording of crashed run
+is recovered by replay.py.
+"""
+
+REPLAY_PROGRAM_DESCRIPTION = """
+Replays key points recorded by main.py directly into the object tracker,
+without any image processing. Allows fast tuning of tracker constants.
+"""
+
+KEY_POINTS_FILE_PATH_HELPER = """
+Relative or absolute path to .npz file with recorded key points.
+"""
+
+SWEEP_HELPER = """
+Tracker constant and values to check, in format: <Class>.<CONSTANT>=<value>,<value>,...
+i.e. Ring.X_AXIS_MOVEMENT_ERROR=5,10,20. Can be used multiple times,
+all combinations of given values are replayed.
+"""
+
+MEASURE_BELT_MOTION_HELPER = """
+Measure conveyor belt movement between frames with phase correlation
+and use it in the tracker, instead of the constant movement per frame.
+"""
+
+BELT_STRIP_HELPER = """
+Rows of the frame (top and bottom, in pixels) where only the belt is visible,
+used by --measure_belt_motion. Static background and lighting outside the belt
+pull the measured movement toward zero. Defaults to the whole frame.
+"""
+
+REAL_TIME_HELPER = """
+Keep up with the source frame rate. When processing is too slow,
+degrade gradually: skip rendering, lower detection resolution,
+analyze every Nth frame and finally drop frames.
+Live sources (camera) drop frames on their own, so they degrade
+only up to lower detection resolution.
+"""
+
+CAMERA_INDEX_HELPER = """
+Index of V4L2 camera device to analyze live, instead of video file.
+Analysis always gets the newest frame, frames which could not be analyzed are dropped.
+"""
+
+SIMULATE_CAMERA_HELPER = """
+Replay video file in real time, with its native frame rate, as if it was a live camera.
+"""
+
+BATCH_PROGRAM_DESCRIPTION = """
+Analyzes all video files in given directory or matching given glob pattern,
+each one in a separate process, and saves aggregated counts of found objects.
+Files analyzed in previous, interrupted runs are skipped.
+"""
+
+BATCH_INPUT_HELPER = """
+Directory with video files (searched recursively) or glob pattern, i.e. "archive/*.mp4".
+"""
+
+BATCH_OUTPUT_DIR_HELPER = """
+Directory where progress of analysis and summary (CSV and JSON) are saved.
+"""
+
+BATCH_WORKERS_HELPER = """
+Number of processes analyzing video files in parallel. Defaults to number of CPU cores.
+"""
+
+BATCH_RETRY_FAILED_HELPER = """
+Analyze again files which failed in previous runs (i.e. unreadable ones).
+By default they are skipped, as files analyzed successfully.
+"""
+
+METRICS_PORT_HELPER = """
+Port of HTTP server on localhost, exposing pipeline and tracker metrics
+in Prometheus text format on /metrics.
+"""
+
+STRIPS_HELPER = """
+Number of horizontal strips, into which each frame is split for preprocessing.
+Strips are processed in parallel on a thread pool, giving the same result as serial processing.
+Only gray conversion, blur and closing are split, so it pays off only with many free cores,
+see benchmark.py to compare it with serial processing.
+"""
+
+BACKGROUND_MODEL_HELPER = """
+Learn static background (belt, frame, lights) and detect edges and objects
+only inside foreground regions and windows of tracked objects (as with --predicted_windows,
+foreground regions replace its entry band). Objects which do not move become background,
+so they are kept by their windows and by periodic searches of the whole frame.
+"""
+
+CHECKPOINT_PATH_HELPER = """
+Path to file, where tracker state and current frame number are periodically saved,
+so the analysis can be resumed with --resume after crash.
+"""
+
+CHECKPOINT_INTERVAL_HELPER = """
+Number of analyzed frames between checkpoints.
+"""
+
+RESUME_HELPER = """
+Restore tracker state from --checkpoint_path and continue analysis from the saved frame.
+"""
+
+CONCURRENT_CLASSES_HELPER = """
+Detect and track rings, necklaces and earings in separate tasks on a thread pool.
+Gives the same result as serial processing.
+"""
+
+SEGMENTED_PROGRAM_DESCRIPTION = """
+Splits a long recording into time segments with overlap, analyzes each segment
+with its own tracker in separate process and stitches tracks at segment boundaries,
+so objects crossing a boundary are counted once.
+"""
+
+SEGMENTS_HELPER = """
+Number of segments to split the recording into. Defaults to the number of workers.
+"""
+
+SEGMENT_WORKERS_HELPER = """
+Number of processes analyzing segments in parallel. Defaults to the number of CPUs.
+"""
+
+OVERLAP_HELPER = """
+Number of frames analyzed before each segment, to find tracks crossing the boundary.
+Should be longer than the time an object needs to cross the frame.
+"""
+
+SEGMENT_HELPER = """
+Analyze only the segment with given index (counted from 0) and save its tracks
+to the file given by --segment_output, i.e. to run segments on separate machines.
+"""
+
+SEGMENT_OUTPUT_HELPER = """
+Path of the pickle file with tracks of the segment analyzed with --segment.
+"""
+
+STITCH_HELPER = """
+Paths of pickle files with tracks of all segments, to stitch them and report counts,
+without analyzing the video.
+"""
+
+COMPARE_SERIAL_HELPER = """
+Analyze the whole recording also serially and compare counts with the stitched ones.
+"""
+
+CONFIG_HELPER = """
+Path of JSON config file, with sections: "detectors" (parameters of rings, earings
+and necklaces detectors) and "Filter", "Ring", "Necklace", "Earings" (constants of these classes).
+File is watched and each modification is applied between frames, without restart.
+Values not present in the file are the default ones.
+"""
+
+FRAME_STRIDE_HELPER = """
+Analyze only every n-th frame of the source, to lower the compute.
+Tracker takes skipped frames into account.
+"""
+
+REPLAY_FRAME_STRIDE_HELPER = """
+Replay only every n-th recorded frame, to check tracking with skipped frames.
+"""
+
+PREDICTED_WINDOWS_HELPER = """
+Search for objects only in windows around predicted positions of tracked objects
+and in the band at the left edge of the frame, where new objects appear.
+The whole frame is searched periodically (see --full_sweep_interval).
+"""
+
+FULL_SWEEP_INTERVAL_HELPER = """
+Number of frames between searches of the whole frame, with --predicted_windows.
+"""
+
+PROFILE_MEMORY_HELPER = """
+Trace memory allocations and report periodically memory allocated and retained
+by each pipeline stage, size of tracker structures and the biggest differences
+since the previous report. Slows down the processing.
+Stages have to run one by one, so it can not be used with --concurrent_classes or --stage_workers.
+"""
+
+MEMORY_REPORT_INTERVAL_HELPER = """
+Number of frames between memory reports, with --profile_memory.
+"""
+
+MEMORY_REPORT_PATH_HELPER = """
+Path of the file, where memory reports are appended. If not provided, reports are printed.
+"""
+
+STAGE_GRAPH_HELPER = """
+Process frames with the graph of stages, which declare their inputs and outputs.
+Stages, whose outputs are not needed (i.e. rendering when frames are not displayed),
+are skipped and independent stages can be run in parallel (see --stage_workers).
+"""
+
+STAGE_WORKERS_HELPER = """
+Number of threads running independent stages in parallel, with --stage_graph.
+"""
+
+TRACE_LATENCY_HELPER = """
+Report percentiles of latencies: from capture of each frame until it is tracked
+and, for each object type, from capture of the frame where object appeared
+until it is confirmed and until it is marked as not visible.
+"""
+
+FRAME_BUS_HELPER = """
+Publish raw and annotated frames to the frame bus (shared memory) with given name,
+instead of displaying them, so they can be watched by viewer.py in other processes.
+Analysis never waits for viewers.
+Frame bus left by crashed run is removed and created again.
+"""
+
+VIEWER_PROGRAM_DESCRIPTION = """
+Displays or records frames published by main.py to the frame bus (see --frame_bus).
+Viewer reads frames at its own pace, so frames are missed if it is too slow.
+"""
+
+FRAME_BUS_NAME_HELPER = """
+Name of the frame bus, the same as --frame_bus of main.py.
+"""
+
+VIEWER_RAW_HELPER = """
+Show raw frames instead of frames with marked objects.
+"""
+
+VIEWER_RECORD_HELPER = """
+Path of the video file, where frames are recorded. Recorder reads frames in order
+and misses them only if it can not keep up.
+"""
+
+VIEWER_FPS_HELPER = """
+Frame rate of the recorded video file.
+"""
+
+VIEWER_NO_DISPLAY_HELPER = """
+Do not display frames, i.e. to only record them.
+"""
+
+VIEWER_TIMEOUT_HELPER = """
+Seconds without any new frame published, after which viewer exits,
+as the publisher stopped without closing the frame bus (i.e. it crashed).
+Viewer exits at once, if the publisher process is not running any more.
+"""
+
+PRESENCE_GATE_HELPER = """
+Skip detectors on frames, where objects of their type can not be found,
+checked cheaply with connected regions of the downsampled frame.
+Bound holds for all thresholds of the detector, so on the bright belt detectors
+of earings and necklaces are skipped mainly on small regions of --predicted_windows.
+Percent of skipped frames is reported for each object type.
+"""
+
+VALIDATE_PRESENCE_GATE_HELPER = """
+Use presence gate, but run skipped detectors anyway and report frames,
+where they found objects (violations). Found objects are not skipped.
+"""
+
+BATCH_SIZE_HELPER = """
+Read and transform frames in batches of given size, as one tall image,
+to call each preprocessing step once per batch. Only for offline processing
+of recordings. See benchmark.py to compare batch sizes.
+"""
+
+BENCHMARK_PROGRAM_DESCRIPTION = """
+Measures throughput of frame preprocessing (transformFrame) frame by frame,
+in batches of different sizes and in different numbers of parallel strips,
+on frames decoded in advance, and checks that they give the same frames.
+"""
+
+BENCHMARK_FRAMES_HELPER = """
+Number of frames decoded in advance and preprocessed in each measurement.
+"""
+
+BENCHMARK_BATCH_SIZES_HELPER = """
+Batch sizes to measure, none to skip batches.
+"""
+
+BENCHMARK_STRIPS_HELPER = """
+Numbers of strips to measure (--strips of main.py), none to skip strips.
+"""
+
+BENCHMARK_REPEATS_HELPER = """
+Number of repeats of each measurement, the best one is reported.
+"""
@@ -1,6 +1,6 @@
 import cv2
 import numpy
-from typing import Final
+from typing import ClassVar
 from dataclasses import dataclass
 from skimage import segmentation, morphology
 
@@ -8,12 +8,14 @@ from skimage import segmentation, morphology
 @dataclass
 class Filter:
 
-    GAUSS_SIGMA_X: Final[int] = 1
-    GAUSS_SIGMA_Y: Final[int] = 1
-    GAUSS_K_SIZE: Final[float] = (1, 1)
+    GAUSS_SIGMA_X: ClassVar[int] = 1
+    GAUSS_SIGMA_Y: ClassVar[int] = 1
+    GAUSS_K_SIZE: ClassVar[tuple[int, int]] = (1, 1)
 
-    CANNY_THR_1: Final[int] = 150
-    CANNY_THR_2: Final[int] = 240
+    CANNY_THR_1: ClassVar[int] = 150
+    CANNY_THR_2: ClassVar[int] = 240
+
+    CLOSING_DISK_RADIUS: ClassVar[int] = 2
 
     @staticmethod
     def gauss(frame: numpy.ndarray) -> numpy.ndarray:
@@ -38,6 +40,15 @@ class Filter:
     def closing(frame: numpy.ndarray, disk_radius: int) -> numpy.ndarray:
         return morphology.closing(image=frame, footprint=morphology.disk(disk_radius))
 
+    @staticmethod
+    def fast_closing(frame: numpy.ndarray, disk_radius: int) -> numpy.ndarray:
+        # gives the same result as closing, but computed by OpenCV, which releases GIL
+        return cv2.morphologyEx(
+            src=frame,
+            op=cv2.MORPH_CLOSE,
+            kernel=morphology.disk(disk_radius).astype(numpy.uint8)
+        )
+
     @staticmethod
     def remove_small_objects(frame: numpy.ndarray, min_size: int) -> numpy.ndarray:
         return morphology.remove_small_objects(ar=frame, min_size=min_size)
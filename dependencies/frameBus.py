@@ -0,0 +1,360 @@
+import os
+import time
+import numpy
+from typing import Final
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory, resource_tracker
+
+# layout of the control block (int64 values) at the beginning of the shared memory:
+# header, followed by SLOT_FIELDS values for each slot
+MAGIC = 0x4652414D45425553
+HEADER_FIELDS = 8
+(
+    HEADER_MAGIC, HEADER_SLOTS, HEADER_HEIGHT, HEADER_WIDTH, HEADER_CHANNELS,
+    HEADER_PUBLISHED, HEADER_CLOSED, HEADER_PUBLISHER_PID
+) = range(8)
+SLOT_FIELDS = 8
+SLOT_SEQUENCE, SLOT_PUBLICATION, SLOT_FRAME_NO, SLOT_TIMESTAMP, SLOT_ANNOTATED = range(5)
+
+# frames start at the cache line boundary
+FRAMES_ALIGNMENT = 64
+
+
+def _control_size(slots: int) -> int:
+    size = (HEADER_FIELDS + slots * SLOT_FIELDS) * numpy.dtype(numpy.int64).itemsize
+    return -(-size // FRAMES_ALIGNMENT) * FRAMES_ALIGNMENT
+
+
+def _is_process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # process exists, but belongs to other user
+        return True
+
+    return True
+
+
+@dataclass
+class FrameBus:
+    '''
+        Publishes raw and annotated frames to the ring of slots in shared memory with given name,
+        so viewers and other consumers run in separate processes (see FrameBusReader)
+        and never block the analysis.
+
+        Each slot is guarded by its sequence number (seqlock): it is odd while the slot is written
+        and even when the slot is consistent, so readers can detect frames overwritten while read.
+        Publisher never waits for readers, readers which are too slow miss frames.
+        Frames are written straight into the slot (one memory copy, no serialization).
+
+        All frames have to be of frame_shape (height, width, channels).
+        Shared memory left by crashed publisher (not closed, publisher not running) is removed
+        and created again, the one of running publisher is not taken over.
+    '''
+
+    SLOTS: Final[int] = 4
+
+    name: str = field(default=None)
+    frame_shape: tuple[int, int, int] = field(default=None)
+    slots: int = field(default=SLOTS)
+
+    published_frames: int = field(init=False, default=0)
+
+    __memory: shared_memory.SharedMemory = field(init=False, default=None)
+    __control: numpy.ndarray = field(init=False, default=None)
+    __frames: numpy.ndarray = field(init=False, default=None)
+
+    def __post_init__(self):
+        if self.name is None:
+            raise Exception("Name not defined")
+        if self.frame_shape is None:
+            raise Exception("Frame shape not defined")
+
+        control_size = _control_size(self.slots)
+        frames_size = self.slots * 2 * int(numpy.prod(self.frame_shape))
+
+        try:
+            self.__memory = shared_memory.SharedMemory(
+                name=self.name,
+                create=True,
+                size=control_size + frames_size
+            )
+        except FileExistsError:
+            FrameBus.__remove_stale(self.name)
+            self.__memory = shared_memory.SharedMemory(
+                name=self.name,
+                create=True,
+                size=control_size + frames_size
+            )
+
+        self.__control, self.__frames = FrameBus._map(
+            self.__memory, self.slots, self.frame_shape
+        )
+
+        self.__control[:] = 0
+        self.__control[HEADER_SLOTS] = self.slots
+        self.__control[HEADER_HEIGHT:HEADER_CHANNELS + 1] = self.frame_shape
+        self.__control[HEADER_PUBLISHER_PID] = os.getpid()
+
+        # readers check magic number at the end, so they never see incomplete header
+        self.__control[HEADER_MAGIC] = MAGIC
+
+    def __del__(self):
+        self.close()
+
+    def publish(
+        self,
+        frame_no: int,
+        capture_timestamp: float,
+        raw_frame: numpy.ndarray,
+        annotated_frame: numpy.ndarray = None
+    ) -> None:
+        '''
+            Writes frames to the next slot of the ring.
+            If annotated frame is not provided, readers get the raw frame instead.
+        '''
+        publication = self.published_frames + 1
+        slot = (publication - 1) % self.slots
+        slot_control = self.__control[HEADER_FIELDS + slot * SLOT_FIELDS:][:SLOT_FIELDS]
+
+        # odd sequence number, slot is being written
+        slot_control[SLOT_SEQUENCE] = slot_control[SLOT_SEQUENCE] + 1
+
+        numpy.copyto(self.__frames[slot, 0], raw_frame)
+        if annotated_frame is not None:
+            numpy.copyto(self.__frames[slot, 1], annotated_frame)
+
+        slot_control[SLOT_PUBLICATION] = publication
+        slot_control[SLOT_FRAME_NO] = int(frame_no)
+        slot_control[SLOT_TIMESTAMP] = (
+            -1 if capture_timestamp is None else int(capture_timestamp * 1e9)
+        )
+        slot_control[SLOT_ANNOTATED] = annotated_frame is not None
+
+        # even sequence number, slot is consistent again
+        slot_control[SLOT_SEQUENCE] = slot_control[SLOT_SEQUENCE] + 1
+
+        self.__control[HEADER_PUBLISHED] = publication
+        self.published_frames = publication
+
+        return None
+
+    def close(self) -> None:
+        '''
+            Marks the bus as closed for readers and removes shared memory.
+            Readers which are attached keep their mapping until they detach.
+        '''
+        if self.__memory is None:
+            return None
+
+        self.__control[HEADER_CLOSED] = 1
+        self.__control = None
+        self.__frames = None
+
+        self.__memory.close()
+        self.__memory.unlink()
+        self.__memory = None
+
+        return None
+
+    @staticmethod
+    def __remove_stale(name: str) -> None:
+        '''
+            Removes shared memory with given name, left by publisher which is not running any more.
+        '''
+        memory = shared_memory.SharedMemory(name=name, create=False)
+        magic, closed, publisher_pid = 0, 0, 0
+        if memory.size >= HEADER_FIELDS * numpy.dtype(numpy.int64).itemsize:
+            header = numpy.ndarray((HEADER_FIELDS,), dtype=numpy.int64, buffer=memory.buf)
+            magic, closed, publisher_pid = (
+                int(header[HEADER_MAGIC]), int(header[HEADER_CLOSED]), int(header[HEADER_PUBLISHER_PID])
+            )
+            del header
+        memory.close()
+
+        if magic == MAGIC and not closed and publisher_pid and _is_process_alive(publisher_pid):
+            # resource tracker would remove shared memory of the running publisher at exit
+            resource_tracker.unregister(memory._name, "shared_memory")
+            raise Exception(f"Frame bus {name} is used by running process {publisher_pid}")
+
+        print(f"Removed stale frame bus {name}")
+        memory.unlink()
+
+        return None
+
+    @staticmethod
+    def _map(
+        memory: shared_memory.SharedMemory,
+        slots: int,
+        frame_shape: tuple[int, int, int]
+    ) -> tuple[numpy.ndarray, numpy.ndarray]:
+        '''
+            Returns control block and frames (slot, raw / annotated, height, width, channels)
+            as arrays in given shared memory.
+        '''
+        control_size = _control_size(slots)
+        control = numpy.ndarray(
+            (HEADER_FIELDS + slots * SLOT_FIELDS,),
+            dtype=numpy.int64,
+            buffer=memory.buf
+        )
+        frames = numpy.ndarray(
+            (slots, 2, *frame_shape),
+            dtype=numpy.uint8,
+            buffer=memory.buf,
+            offset=control_size
+        )
+
+        return (control, frames)
+
+
+@dataclass
+class FrameBusReader:
+    '''
+        Attaches to the frame bus with given name, published by FrameBus in another process.
+        Frames are copied out of the slot and the copy is checked with the sequence number of the slot,
+        so a frame overwritten while read is never returned (it is read again).
+
+        Counts:
+            - received_frames <- frames returned,
+            - missed_frames <- frames published, but overwritten before they were read,
+            - torn_reads <- reads repeated, as the slot was written at the same time.
+    '''
+
+    READ_RETRIES: Final[int] = 3
+
+    name: str = field(default=None)
+
+    slots: int = field(init=False, default=None)
+    frame_shape: tuple[int, int, int] = field(init=False, default=None)
+
+    received_frames: int = field(init=False, default=0)
+    missed_frames: int = field(init=False, default=0)
+    torn_reads: int = field(init=False, default=0)
+
+    __memory: shared_memory.SharedMemory = field(init=False, default=None)
+    __control: numpy.ndarray = field(init=False, default=None)
+    __frames: numpy.ndarray = field(init=False, default=None)
+    __last_publication: int = field(init=False, default=0)
+    __seen_publication: int = field(init=False, default=0)
+    __seen_publication_time: float = field(init=False, default=0.0)
+
+    def __post_init__(self):
+        if self.name is None:
+            raise Exception("Name not defined")
+
+        self.__memory = shared_memory.SharedMemory(name=self.name, create=False)
+
+        # resource tracker would remove shared memory of the publisher, when the reader exits
+        resource_tracker.unregister(self.__memory._name, "shared_memory")
+
+        header = numpy.ndarray((HEADER_FIELDS,), dtype=numpy.int64, buffer=self.__memory.buf)
+        if header[HEADER_MAGIC] != MAGIC:
+            self.__memory.close()
+            raise Exception("Frame bus not initialized")
+
+        self.slots = int(header[HEADER_SLOTS])
+        self.frame_shape = tuple(int(value) for value in header[HEADER_HEIGHT:HEADER_CHANNELS + 1])
+        self.__control, self.__frames = FrameBus._map(self.__memory, self.slots, self.frame_shape)
+
+        # frames published before attaching are not counted as missed
+        self.__last_publication = self.getPublishedFrames()
+        self.__seen_publication = self.__last_publication
+        self.__seen_publication_time = time.monotonic()
+
+    def __del__(self):
+        self.close()
+
+    def isClosed(self) -> bool:
+        return bool(self.__control[HEADER_CLOSED])
+
+    def getPublishedFrames(self) -> int:
+        return int(self.__control[HEADER_PUBLISHED])
+
+    def isPublisherAlive(self) -> bool:
+        return _is_process_alive(int(self.__control[HEADER_PUBLISHER_PID]))
+
+    def getIdleTime(self) -> float:
+        '''
+            Returns seconds since the number of published frames last changed (as seen by this reader),
+            i.e. to stop waiting for publisher, which crashed without closing the frame bus.
+        '''
+        published_frames = self.getPublishedFrames()
+        if published_frames != self.__seen_publication:
+            self.__seen_publication = published_frames
+            self.__seen_publication_time = time.monotonic()
+
+        return time.monotonic() - self.__seen_publication_time
+
+    def readLatest(self) -> tuple[int, float, numpy.ndarray, numpy.ndarray] | None:
+        '''
+            Returns the newest frame, which was not returned yet, or None if there is no such frame.
+            Frames published in the meantime are missed, i.e. to display frames at own pace.
+            Frame is returned as (frame_no, capture_timestamp, raw_frame, annotated_frame),
+            where annotated_frame is the raw one if it was not published.
+        '''
+        return self.__read(self.getPublishedFrames())
+
+    def readNext(self) -> tuple[int, float, numpy.ndarray, numpy.ndarray] | None:
+        '''
+            Returns the frame following the previously returned one, as readLatest does.
+            If it was already overwritten, the newest frame is returned instead,
+            i.e. to record frames without gaps, as long as the reader keeps up.
+        '''
+        if self.__last_publication < self.getPublishedFrames():
+            return self.__read(self.__last_publication + 1)
+
+        return None
+
+    def close(self) -> None:
+        if self.__memory is None:
+            return None
+
+        self.__control = None
+        self.__frames = None
+        self.__memory.close()
+        self.__memory = None
+
+        return None
+
+    def __read(self, publication: int) -> tuple[int, float, numpy.ndarray, numpy.ndarray] | None:
+        if publication <= self.__last_publication:
+            return None
+
+        for _ in range(self.READ_RETRIES):
+            slot = (publication - 1) % self.slots
+            slot_control = self.__control[HEADER_FIELDS + slot * SLOT_FIELDS:][:SLOT_FIELDS]
+
+            sequence = int(slot_control[SLOT_SEQUENCE])
+            read_publication = int(slot_control[SLOT_PUBLICATION])
+            frame_no = int(slot_control[SLOT_FRAME_NO])
+            timestamp = int(slot_control[SLOT_TIMESTAMP])
+            annotated = bool(slot_control[SLOT_ANNOTATED])
+            raw_frame = self.__frames[slot, 0].copy()
+            annotated_frame = self.__frames[slot, 1].copy() if annotated else raw_frame
+
+            # slot was written before or while it was read, so it is read again
+            if sequence % 2 == 1 or int(slot_control[SLOT_SEQUENCE]) != sequence:
+                self.torn_reads = self.torn_reads + 1
+                time.sleep(0)
+                continue
+
+            # the frame was already overwritten by a newer one, which is taken instead
+            if read_publication != publication:
+                publication = self.getPublishedFrames()
+                continue
+
+            self.missed_frames = self.missed_frames + publication - self.__last_publication - 1
+            self.received_frames = self.received_frames + 1
+            self.__last_publication = publication
+
+            return (
+                frame_no,
+                None if timestamp < 0 else timestamp / 1e9,
+                raw_frame,
+                annotated_frame
+            )
+
+        return None
@@ -0,0 +1,220 @@
+import io
+import os
+import cv2
+import numpy
+from typing import Final
+from dataclasses import dataclass, field
+
+X = 0
+Y = 1
+
+# Indexes of object classes, in the same order as returned by detectObjects
+RINGS = 0
+EARINGS = 1
+NECKLACES = 2
+
+KEY_POINT_DTYPE = numpy.dtype([
+    ("frame_no", numpy.int32),
+    ("class", numpy.uint8),
+    ("x", numpy.float32),
+    ("y", numpy.float32),
+    ("size", numpy.float32)
+])
+
+
+@dataclass
+class KeyPointRecorder:
+    '''
+        Records key points found by detectors on each analyzed frame,
+        so the tracking can be replayed later without any image processing.
+        Recording is saved as .npz file with 2 arrays:
+            - key_points <- structured array (frame number, class, x, y, size)
+            - frames <- numbers of all analyzed frames, also those without any key point
+
+        Key points and frames are stored in preallocated chunks, which are appended to partial files
+        (path with PARTIAL_KEY_POINTS_SUFFIX and PARTIAL_FRAMES_SUFFIX) when they are full,
+        or every FLUSH_INTERVAL frames, so memory does not grow with the length of the run
+        and a crash loses at most FLUSH_INTERVAL frames. save converts partial files into the .npz file,
+        partial files left by crashed run are converted by recoverPartialRecording.
+    '''
+
+    CHUNK_SIZE: Final[int] = 65_536
+    FLUSH_INTERVAL: Final[int] = 1_000
+
+    PARTIAL_KEY_POINTS_SUFFIX: Final[str] = ".key_points.part"
+    PARTIAL_FRAMES_SUFFIX: Final[str] = ".frames.part"
+
+    path: str = field(default=None)
+
+    recorded_key_points: int = field(init=False, default=0)
+    recorded_frames: int = field(init=False, default=0)
+
+    __key_points: numpy.ndarray = field(init=False, default=None)
+    __key_points_in_chunk: int = field(init=False, default=0)
+    __frames: numpy.ndarray = field(init=False, default=None)
+    __frames_in_chunk: int = field(init=False, default=0)
+    __key_points_file: io.BufferedWriter = field(init=False, default=None)
+    __frames_file: io.BufferedWriter = field(init=False, default=None)
+
+    def __post_init__(self):
+        if self.path is None:
+            raise Exception("Path not defined")
+
+        self.__key_points = numpy.empty(self.CHUNK_SIZE, dtype=KEY_POINT_DTYPE)
+        self.__frames = numpy.empty(self.FLUSH_INTERVAL, dtype=numpy.int32)
+        self.__key_points_file = open(self.path + self.PARTIAL_KEY_POINTS_SUFFIX, "wb")
+        self.__frames_file = open(self.path + self.PARTIAL_FRAMES_SUFFIX, "wb")
+
+    def record(
+        self,
+        frame_no: int,
+        detectedObjects: tuple[
+            tuple[cv2.KeyPoint],
+            tuple[cv2.KeyPoint],
+            tuple[cv2.KeyPoint]
+        ]
+    ) -> None:
+        frame_no = int(frame_no)
+
+        for object_class, key_points in enumerate(detectedObjects):
+            for key_point in key_points:
+                if self.__key_points_in_chunk == self.CHUNK_SIZE:
+                    self.__flush_key_points()
+
+                self.__key_points[self.__key_points_in_chunk] = (
+                    frame_no,
+                    object_class,
+                    key_point.pt[X],
+                    key_point.pt[Y],
+                    key_point.size
+                )
+                self.__key_points_in_chunk = self.__key_points_in_chunk + 1
+                self.recorded_key_points = self.recorded_key_points + 1
+
+        self.__frames[self.__frames_in_chunk] = frame_no
+        self.__frames_in_chunk = self.__frames_in_chunk + 1
+        self.recorded_frames = self.recorded_frames + 1
+
+        # key points are flushed first, so partial files never have frames without their key points
+        if self.__frames_in_chunk == self.FLUSH_INTERVAL:
+            self.__flush_key_points()
+            self.__flush_frames()
+
+    def save(self) -> None:
+        self.__flush_key_points()
+        self.__flush_frames()
+        self.__key_points_file.close()
+        self.__frames_file.close()
+
+        KeyPointRecorder.recoverPartialRecording(self.path)
+        print(
+            f"Saved {self.recorded_key_points} key points "
+            f"from {self.recorded_frames} frames to {self.path}"
+        )
+
+    @staticmethod
+    def recoverPartialRecording(path: str) -> bool:
+        '''
+            Converts partial files of the recording into the .npz file and removes them.
+            Records cut by crash while being written are dropped.
+            Returns False, if there are no partial files.
+        '''
+        key_points_path = path + KeyPointRecorder.PARTIAL_KEY_POINTS_SUFFIX
+        frames_path = path + KeyPointRecorder.PARTIAL_FRAMES_SUFFIX
+        if not (os.path.exists(key_points_path) and os.path.exists(frames_path)):
+            return False
+
+        key_points = KeyPointRecorder.__read_partial_file(key_points_path, KEY_POINT_DTYPE)
+        frames = KeyPointRecorder.__read_partial_file(frames_path, numpy.dtype(numpy.int32))
+
+        # only key points of frames, which are recorded, as frames are flushed after key points
+        key_points = key_points[key_points["frame_no"] <= frames[-1]] if len(frames) else key_points[:0]
+
+        numpy.savez_compressed(path, key_points=key_points, frames=frames)
+        os.remove(key_points_path)
+        os.remove(frames_path)
+
+        return True
+
+    @staticmethod
+    def __read_partial_file(path: str, dtype: numpy.dtype) -> numpy.ndarray:
+        with open(path, "rb") as partial_file:
+            data = partial_file.read()
+
+        return numpy.frombuffer(data[:len(data) - len(data) % dtype.itemsize], dtype=dtype)
+
+    def __flush_key_points(self) -> None:
+        self.__key_points[:self.__key_points_in_chunk].tofile(self.__key_points_file)
+        self.__key_points_file.flush()
+        self.__key_points_in_chunk = 0
+
+    def __flush_frames(self) -> None:
+        self.__frames[:self.__frames_in_chunk].tofile(self.__frames_file)
+        self.__frames_file.flush()
+        self.__frames_in_chunk = 0
+
+
+@dataclass
+class KeyPointReplay:
+    '''
+        Loads key points saved by KeyPointRecorder.
+        Key points are converted to cv2.KeyPoint objects once, while loading,
+        so the same recording can be replayed many times at low cost.
+    '''
+
+    path: str = field(default=None)
+
+    frames: list[
+        tuple[
+            int,
+            tuple[
+                tuple[cv2.KeyPoint],
+                tuple[cv2.KeyPoint],
+                tuple[cv2.KeyPoint]
+            ]
+        ]
+    ] = field(init=False, default_factory=list)
+
+    def __post_init__(self):
+        if self.path is None:
+            raise Exception("Path not defined")
+
+        # recording of crashed run is left in partial files
+        if not os.path.exists(self.path) and KeyPointRecorder.recoverPartialRecording(self.path):
+            print(f"Recording recovered from partial files of {self.path}")
+
+        self.__load()
+
+    def __load(self) -> None:
+        with numpy.load(self.path) as recording:
+            key_points = recording["key_points"]
+            frames = recording["frames"]
+
+        # sort key points by frame number (stable, so order inside frame is kept)
+        # and find boundaries of each frame in sorted array
+        key_points = key_points[numpy.argsort(key_points["frame_no"], kind="stable")]
+        starts = numpy.searchsorted(key_points["frame_no"], frames, side="left")
+        ends = numpy.searchsorted(key_points["frame_no"], frames, side="right")
+
+        for frame_no, start, end in zip(frames, starts, ends):
+            detectedObjects: tuple[list[cv2.KeyPoint], ...] = ([], [], [])
+
+            for record in key_points[start:end]:
+                detectedObjects[record["class"]].append(
+                    cv2.KeyPoint(
+                        float(record["x"]),
+                        float(record["y"]),
+                        float(record["size"])
+                    )
+                )
+
+            self.frames.append(
+                (
+                    int(frame_no),
+                    (
+                        tuple(detectedObjects[RINGS]),
+                        tuple(detectedObjects[EARINGS]),
+                        tuple(detectedObjects[NECKLACES])
+                    )
+                )
+            )
@@ -0,0 +1,122 @@
+import time
+import numpy
+import random
+from typing import Final
+from dataclasses import dataclass, field
+from dependencies.objectTracker import ObjectTracker
+
+
+@dataclass
+class LatencyTracer:
+    '''
+        Reports distributions (percentiles) of latencies, measured with monotonic clock:
+            - frame latency <- from capture of the frame until objects on it were tracked
+              (see observeFrame),
+            - confirmation latency <- from capture of the frame where object was seen for the first time,
+              until the tracker confirmed it (it is not a phantom object anymore),
+            - retirement latency <- from capture of the frame where object was seen for the first time,
+              until the tracker marked it as not visible.
+        Latencies of objects are reported for each object type, only for objects confirmed by the tracker.
+
+        Frame latencies are kept in reservoir of RESERVOIR_SIZE uniformly sampled frames,
+        so memory does not grow with the length of the run and percentiles are estimated from the sample.
+        Maximum and number of frames are counted exactly.
+    '''
+
+    PERCENTILES: Final[tuple[int, ...]] = (50, 90, 99)
+    RESERVOIR_SIZE: Final[int] = 10_000
+
+    frame_latencies: numpy.ndarray = field(init=False, default=None)
+    observed_frames: int = field(init=False, default=0)
+    max_frame_latency: float = field(init=False, default=0.0)
+
+    __random: random.Random = field(init=False, default=None)
+
+    def __post_init__(self):
+        self.frame_latencies = numpy.empty(self.RESERVOIR_SIZE, dtype=numpy.float64)
+
+        # seeded, so the same latencies give the same report
+        self.__random = random.Random(0)
+
+    def observeFrame(self, capture_timestamp: float) -> None:
+        '''
+            Has to be called after objects on the frame were tracked.
+        '''
+        latency = time.monotonic() - capture_timestamp
+        self.max_frame_latency = max(self.max_frame_latency, latency)
+
+        # reservoir sampling, each frame is kept with the same probability
+        if self.observed_frames < self.RESERVOIR_SIZE:
+            self.frame_latencies[self.observed_frames] = latency
+        elif (sample_id := self.__random.randrange(self.observed_frames + 1)) < self.RESERVOIR_SIZE:
+            self.frame_latencies[sample_id] = latency
+
+        self.observed_frames = self.observed_frames + 1
+
+        return None
+
+    def printLatencyReport(self, tracker: ObjectTracker) -> None:
+        LatencyTracer.__print_distribution(
+            "Frame latency",
+            self.frame_latencies[:min(self.observed_frames, self.RESERVOIR_SIZE)],
+            self.observed_frames,
+            self.max_frame_latency
+        )
+
+        for name, objects in (
+            ("rings", tracker.rings),
+            ("necklaces", tracker.necklaces),
+            ("earings", tracker.earings)
+        ):
+            confirmed_objects = [
+                object for object in objects
+                if object.getFirstSeenTime() is not None and object.getConfirmedTime() is not None
+            ]
+
+            LatencyTracer.__print_distribution(
+                f"Confirmation latency of {name}",
+                [
+                    object.getConfirmedTime() - object.getFirstSeenTime()
+                    for object in confirmed_objects
+                ]
+            )
+            LatencyTracer.__print_distribution(
+                f"Retirement latency of {name}",
+                [
+                    object.getRetiredTime() - object.getFirstSeenTime()
+                    for object in confirmed_objects if object.getRetiredTime() is not None
+                ]
+            )
+
+        return None
+
+    @staticmethod
+    def __print_distribution(
+        title: str,
+        latencies: list[float] | numpy.ndarray,
+        samples: int = None,
+        max_latency: float = None
+    ) -> None:
+        '''
+            Prints percentiles of latencies. If latencies are a sample,
+            number of all samples and their maximum have to be given.
+        '''
+        if not len(latencies):
+            print(f"{title} [ms]: ", "no samples")
+            return None
+
+        if samples is None:
+            samples, max_latency = len(latencies), max(latencies)
+
+        percentiles = numpy.percentile(latencies, LatencyTracer.PERCENTILES) * 1000
+        print(
+            f"{title} [ms]: ",
+            *(
+                f"p{percentile} {round(value, 2)}"
+                for percentile, value in zip(LatencyTracer.PERCENTILES, percentiles)
+            ),
+            f"max {round(max_latency * 1000, 2)}",
+            f"(samples: {samples})"
+        )
+
+        return None
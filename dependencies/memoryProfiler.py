@@ -0,0 +1,173 @@
+import sys
+import time
+import numpy
+import contextlib
+import tracemalloc
+from typing import Final
+from dataclasses import dataclass, field
+from dependencies.objectTracker import ObjectTracker
+
+# allocations of numpy arrays (also arrays returned by OpenCV) are traced in this domain
+NUMPY_DOMAIN = numpy.lib.tracemalloc_domain
+
+# allocations of tracemalloc itself and of imports are not interesting
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>")
+)
+
+
+@dataclass
+class StageMemory:
+    '''
+        Memory statistics of one pipeline stage, since the previous report:
+            - calls <- number of measured calls,
+            - peak <- the biggest number of bytes allocated during one call, above memory before it,
+            - retained <- sum of bytes left allocated after calls (negative if released).
+    '''
+
+    calls: int = field(default=0)
+    peak: int = field(default=0)
+    retained: int = field(default=0)
+
+
+@dataclass
+class MemoryProfiler:
+    '''
+        Traces memory allocations with tracemalloc and reports them every report_interval frames:
+            - traced memory, split into numpy buffers and other Python objects,
+            - bytes allocated and retained by each pipeline stage (see measure),
+            - size of tracker structures, for each object type,
+            - lines which allocated the most since the previous report (snapshot diff).
+        Report is appended to the file at path, or printed if path is not provided.
+
+        WARNING: tracing slows down every allocation, so it should be used only to find leaks.
+        Traced memory and its peak are counted for the whole process, so stage statistics
+        are valid only if stages run one by one (allocations of background threads,
+        i.e. live capture, are counted in the stage which is running at the moment).
+    '''
+
+    REPORT_INTERVAL: Final[int] = 1000
+    TRACEBACK_FRAMES: Final[int] = 1
+    TOP_DIFFERENCES: Final[int] = 10
+
+    report_interval: int = field(default=REPORT_INTERVAL)
+    path: str = field(default=None)
+
+    stages: dict[str, StageMemory] = field(init=False, default_factory=dict)
+
+    __frames: int = field(init=False, default=0)
+    __snapshot: tracemalloc.Snapshot = field(init=False, default=None)
+
+    def __post_init__(self):
+        tracemalloc.start(self.TRACEBACK_FRAMES)
+        self.__snapshot = self.__take_snapshot()
+
+    @contextlib.contextmanager
+    def measure(self, stage: str):
+        '''
+            Context manager to measure memory allocated by given pipeline stage.
+        '''
+        memory_before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        yield
+        memory_after, peak = tracemalloc.get_traced_memory()
+
+        stage_memory = self.stages.setdefault(stage, StageMemory())
+        stage_memory.calls = stage_memory.calls + 1
+        stage_memory.peak = max(stage_memory.peak, peak - memory_before)
+        stage_memory.retained = stage_memory.retained + memory_after - memory_before
+
+    def update(self, tracker: ObjectTracker) -> None:
+        '''
+            Has to be called after each analyzed frame.
+        '''
+        self.__frames = self.__frames + 1
+
+        if self.__frames % self.report_interval == 0:
+            self.report(tracker)
+
+        return None
+
+    def report(self, tracker: ObjectTracker) -> None:
+        snapshot = self.__take_snapshot()
+        lines = [f"Memory report after {self.__frames} frames ({time.strftime('%Y-%m-%d %H:%M:%S')})"]
+
+        current, _ = tracemalloc.get_traced_memory()
+        numpy_buffers = sum(
+            trace.size for trace in snapshot.filter_traces(
+                (tracemalloc.DomainFilter(True, NUMPY_DOMAIN),)
+            ).traces
+        )
+        lines.append(
+            f"Traced [MiB]: {MemoryProfiler.__mib(current)} "
+            f"(numpy buffers: {MemoryProfiler.__mib(numpy_buffers)}, "
+            f"other: {MemoryProfiler.__mib(current - numpy_buffers)})"
+        )
+
+        for stage, stage_memory in self.stages.items():
+            lines.append(
+                f"Stage {stage}: calls: {stage_memory.calls}, "
+                f"peak [MiB]: {MemoryProfiler.__mib(stage_memory.peak)}, "
+                f"retained [KiB]: {stage_memory.retained / 1024:.1f}"
+            )
+
+        for name, objects in (
+            ("rings", tracker.rings),
+            ("necklaces", tracker.necklaces),
+            ("earings", tracker.earings)
+        ):
+            positions = sum(len(object.positions) for object in objects)
+            lines.append(
+                f"Tracker {name}: objects: {len(objects)}, "
+                f"visible: {sum(1 for object in objects if object.isVisible())}, "
+                f"positions: {positions}, "
+                f"size [KiB]: {MemoryProfiler.__get_objects_size(objects) / 1024:.1f}"
+            )
+
+        lines.append("Biggest differences since previous report:")
+        for difference in snapshot.compare_to(self.__snapshot, "lineno")[:self.TOP_DIFFERENCES]:
+            lines.append(f"    {difference}")
+
+        self.__write("\n".join(lines))
+
+        # statistics of stages are reported for the interval
+        self.__snapshot = snapshot
+        self.stages = {}
+
+        return None
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+
+    def __write(self, report: str) -> None:
+        if self.path is None:
+            print(report)
+            return None
+
+        with open(self.path, "a") as report_file:
+            report_file.write(report + "\n\n")
+
+        return None
+
+    @staticmethod
+    def __take_snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+
+    @staticmethod
+    def __get_objects_size(objects: list) -> int:
+        '''
+            Returns estimated number of bytes of the objects list, objects, their positions lists
+            and key points (size of Python wrappers, as key points are small and kept inside them).
+        '''
+        return sys.getsizeof(objects) + sum(
+            sys.getsizeof(object) +
+            sys.getsizeof(object.positions) +
+            sum(sys.getsizeof(key_point) for key_point in object.positions)
+            for object in objects
+        )
+
+    @staticmethod
+    def __mib(size: int) -> str:
+        return f"{size / 2 ** 20:.2f}"
@@ -0,0 +1,170 @@
+import bisect
+import threading
+from typing import Final
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from dependencies.objectTracker import ObjectTracker
+from dependencies.objectsDefinition import Ring, Necklace, Earings
+
+METRICS_PREFIX = "jewelry_vision"
+
+
+@dataclass
+class LatencyHistogram:
+    '''
+        Histogram of latencies in seconds, in Prometheus format.
+        It is updated only by the thread processing frames, without any locks,
+        so the values read by the metrics server may be updated partially (by 1 observation),
+        which is acceptable for monitoring.
+    '''
+
+    BUCKETS: Final[tuple[float]] = (
+        0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0
+    )
+
+    counts: list[int] = field(init=False, default=None)
+    sum: float = field(init=False, default=0.0)
+    count: int = field(init=False, default=0)
+
+    def __post_init__(self):
+        # the last one is for values greater than the biggest bucket
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.BUCKETS, value)] += 1
+        self.sum = self.sum + value
+        self.count = self.count + 1
+
+    def format(self, name: str, labels: str) -> list[str]:
+        lines = []
+        cumulative_count = 0
+
+        for bucket, count in zip(self.BUCKETS, self.counts):
+            cumulative_count = cumulative_count + count
+            lines.append(
+                f'{name}_bucket{{{labels},le="{bucket}"}} {cumulative_count}'
+            )
+
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+
+        return lines
+
+
+@dataclass
+class PipelineMetrics:
+    '''
+        Collects pipeline and tracker telemetry and exposes it in Prometheus text format,
+        by HTTP server on localhost, running in background thread.
+
+        Only stage latencies are recorded on the frame processing path (see observeStage).
+        All other values are read from the pipeline objects, when metrics are requested.
+        Frames read from the source and the ones not analyzed are counted by the source itself
+        (captured_frames and dropped_frames of Video or LatestFrameCapture).
+    '''
+
+    port: int = field(default=None)
+    video: object = field(default=None)
+    tracker: ObjectTracker = field(default=None)
+
+    stage_latencies: dict[str, LatencyHistogram] = field(
+        init=False,
+        default_factory=dict
+    )
+
+    __server: ThreadingHTTPServer = field(init=False, default=None)
+
+    def __post_init__(self):
+        if self.port is None:
+            raise Exception("Port not defined")
+
+        metrics = self
+
+        class MetricsRequestHandler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+
+                body = metrics.format().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # requests are not logged, to not mix them with pipeline messages
+                return None
+
+        self.__server = ThreadingHTTPServer(
+            ("127.0.0.1", self.port),
+            MetricsRequestHandler
+        )
+        threading.Thread(target=self.__server.serve_forever, daemon=True).start()
+        print(f"Metrics available on http://127.0.0.1:{self.port}/metrics")
+
+    def observeStage(self, stage: str, stage_time: float) -> None:
+        if stage not in self.stage_latencies:
+            self.stage_latencies[stage] = LatencyHistogram()
+
+        self.stage_latencies[stage].observe(stage_time)
+
+    def format(self) -> str:
+        lines = []
+
+        # frame counters
+        for name, value in (
+            ("frames_decoded_total", self.video.captured_frames),
+            ("frames_analyzed_total", self.tracker.getAnalyzedFrames()),
+            ("frames_dropped_total", self.video.dropped_frames)
+        ):
+            lines.append(f"# TYPE {METRICS_PREFIX}_{name} counter")
+            lines.append(f"{METRICS_PREFIX}_{name} {value}")
+
+        # latency of pipeline stages
+        name = f"{METRICS_PREFIX}_stage_latency_seconds"
+        lines.append(f"# TYPE {name} histogram")
+        for stage, histogram in list(self.stage_latencies.items()):
+            lines.extend(histogram.format(name, f'stage="{stage}"'))
+
+        # tracks and objects found so far, of each type
+        tracks_name = f"{METRICS_PREFIX}_tracks"
+        objects_name = f"{METRICS_PREFIX}_objects_total"
+        tracks_lines = [f"# TYPE {tracks_name} gauge"]
+        objects_lines = [f"# TYPE {objects_name} counter"]
+
+        for object_type, objects in (
+            (Ring, self.tracker.rings),
+            (Necklace, self.tracker.necklaces),
+            (Earings, self.tracker.earings)
+        ):
+            # copy the list, as it may be appended by the frame processing thread
+            objects = list(objects)
+            active = sum(1 for object in objects if object.isVisible())
+            labels = f'class="{object_type.__name__}"'
+
+            tracks_lines.append(f'{tracks_name}{{{labels},state="active"}} {active}')
+            tracks_lines.append(
+                f'{tracks_name}{{{labels},state="retired"}} {len(objects) - active}'
+            )
+
+            # objects found on enough frames to not be considered as phantoms
+            objects_lines.append(
+                f"{objects_name}{{{labels}}} " +
+                str(sum(
+                    1 for object in objects
+                    if object.getFoundOnFrames() >= object_type.MARK_AS_INVISIBLE_AFTER_MISSING_ON_FRAMES
+                ))
+            )
+
+        lines.extend(tracks_lines)
+        lines.extend(objects_lines)
+
+        return "\n".join(lines) + "\n"
+
+    def shutdown(self) -> None:
+        self.__server.shutdown()
+        self.__server.server_close()
@@ -27,7 +27,10 @@ class ObjectTracker:
             rings_key_points: tuple[cv2.KeyPoint] = tuple(),
             necklaces_key_points: tuple[cv2.KeyPoint] = tuple(),
             earings_key_points: tuple[cv2.KeyPoint] = tuple(),
-            frame_to_draw: numpy.ndarray = None
+            frame_to_draw: numpy.ndarray = None,
+            belt_movement: tuple[float, float] = None,
+            frame_delta: int = 1,
+            capture_timestamp: float = None
     ) -> numpy.ndarray:
         '''
             Public method to track objects in the video frame.
@@ -37,41 +40,134 @@ class ObjectTracker:
                 - earings
 
             Returns a frame with selected objects.
+            If frame_to_draw is not provided, objects are only tracked and None is returned.
+            If belt_movement is provided (measured since previous call), it is used
+            instead of the constant movement per frame defined for the object types.
+            frame_delta is the number of source frames since the previous call,
+            greater than 1 if frames were skipped or dropped.
+            capture_timestamp (monotonic clock) of the frame is recorded as the time
+            when new objects were seen for the first time.
         '''
-        self.__count_analyzed_frames()
+        self.countAnalyzedFrame()
 
         # track rings
-        frame_to_draw = self.__track_objects_of_given_type(
-            Ring,
-            self.rings,
-            rings_key_points,
-            frame_to_draw
-        )
+        self.trackObjectsOfType(Ring, rings_key_points, belt_movement, frame_delta, capture_timestamp)
 
         # track necklaces
-        frame_to_draw = self.__track_objects_of_given_type(
-            Necklace,
-            self.necklaces,
+        self.trackObjectsOfType(Necklace, necklaces_key_points, belt_movement, frame_delta, capture_timestamp)
+
+        # track earings
+        self.trackObjectsOfType(Earings, earings_key_points, belt_movement, frame_delta, capture_timestamp)
+
+        return self.drawObjects(
+            frame_to_draw,
+            rings_key_points,
             necklaces_key_points,
-            frame_to_draw
+            earings_key_points
         )
 
-        # track earings
-        frame_to_draw = self.__track_objects_of_given_type(
-            Earings,
-            self.earings,
-            earings_key_points,
-            frame_to_draw
+    def trackObjectsOfType(
+            self,
+            object_type: type[Ring | Necklace | Earings],
+            key_points: tuple[cv2.KeyPoint] = tuple(),
+            belt_movement: tuple[float, float] = None,
+            frame_delta: int = 1,
+            capture_timestamp: float = None
+    ) -> None:
+        '''
+            Public method to track objects of one type in the video frame.
+            Objects of different types are tracked independently,
+            so this method can be called for each type in parallel.
+            countAnalyzedFrame has to be called once per frame separately.
+        '''
+        objectsToTrack = {
+            Ring: self.rings,
+            Necklace: self.necklaces,
+            Earings: self.earings
+        }[object_type]
+
+        self.__track_objects_of_given_type(
+            object_type,
+            objectsToTrack,
+            key_points,
+            belt_movement,
+            frame_delta,
+            capture_timestamp
         )
 
+    def drawObjects(
+            self,
+            frame_to_draw: numpy.ndarray = None,
+            rings_key_points: tuple[cv2.KeyPoint] = tuple(),
+            necklaces_key_points: tuple[cv2.KeyPoint] = tuple(),
+            earings_key_points: tuple[cv2.KeyPoint] = tuple()
+    ) -> numpy.ndarray:
+        '''
+            Returns a frame with marked key points of all object types.
+            If frame_to_draw is not provided, None is returned.
+        '''
+        if frame_to_draw is None:
+            return None
+
+        for object_type, key_points in (
+            (Ring, rings_key_points),
+            (Necklace, necklaces_key_points),
+            (Earings, earings_key_points)
+        ):
+            frame_to_draw = Draw.keyPoints(
+                frame=frame_to_draw,
+                keyPoints=key_points,
+                color=ObjectTracker.COLOR_ASSIGNMENT_TO_OBJECT_TYPES[object_type]
+            )
+
         return frame_to_draw
 
+    def countAnalyzedFrame(self) -> None:
+        self.__analyzed_frames = self.__analyzed_frames + 1
+
     def printTrackingReport(self) -> None:
+        report = self.getTrackingReport()
+        print("Analyzed frames: ", report["analyzed_frames"])
+        print("Found rings: ", report["rings"])
+        print("Found necklaces: ", report["necklaces"])
+        print("Found earings: ", report["earings"])
+
+    def getTrackingReport(self) -> dict[str, int]:
+        '''
+            Returns number of analyzed frames and number of found objects of each type,
+            after removing phantom objects.
+        '''
         self.__clean_up_phantom_objects()
-        print("Analyzed frames: ", self.__analyzed_frames)
-        print("Found rings: ", len(self.rings))
-        print("Found necklaces: ", len(self.necklaces))
-        print("Found earings: ", len(self.earings))
+        return {
+            "analyzed_frames": self.__analyzed_frames,
+            "rings": len(self.rings),
+            "necklaces": len(self.necklaces),
+            "earings": len(self.earings)
+        }
+
+    def getAnalyzedFrames(self) -> int:
+        return self.__analyzed_frames
+
+    def getState(self) -> dict:
+        '''
+            Returns state of the tracker, with states of all tracked objects,
+            which can be saved, i.e. with pickle.
+        '''
+        return {
+            "analyzed_frames": self.__analyzed_frames,
+            "rings": [object.getState() for object in self.rings],
+            "necklaces": [object.getState() for object in self.necklaces],
+            "earings": [object.getState() for object in self.earings]
+        }
+
+    def restoreState(self, state: dict) -> None:
+        '''
+            Restores state of the tracker returned by getState.
+        '''
+        self.__analyzed_frames = state["analyzed_frames"]
+        self.rings = [Ring.fromState(object) for object in state["rings"]]
+        self.necklaces = [Necklace.fromState(object) for object in state["necklaces"]]
+        self.earings = [Earings.fromState(object) for object in state["earings"]]
 
     def __clean_up_phantom_objects(self) -> None:
         '''
@@ -85,35 +181,36 @@ class ObjectTracker:
         }
 
         for object_type in objectTypesToCleanup:
-            for object in objectTypesToCleanup[object_type]:
+            # loop through copy of the list, as objects are removed from the original one
+            for object in list(objectTypesToCleanup[object_type]):
                 if object.getFoundOnFrames() < object_type.MARK_AS_INVISIBLE_AFTER_MISSING_ON_FRAMES:
                     objectTypesToCleanup[object_type].remove(object)
 
-    def __count_analyzed_frames(self):
-        self.__analyzed_frames = self.__analyzed_frames + 1
-
     @ staticmethod
     def __track_objects_of_given_type(
         object: Ring | Necklace | Earings,
         objectsToTrack: list[Ring | Necklace | Earings],
         key_points: tuple[cv2.KeyPoint] = tuple(),
-        frame_to_draw: numpy.ndarray = None
-    ):
+        belt_movement: tuple[float, float] = None,
+        frame_delta: int = 1,
+        capture_timestamp: float = None
+    ) -> None:
         '''
-            Method to perform necessary operations to track rings
+            Method to perform necessary operations to track objects of given type
         '''
 
-        # mark objects on the frame
-        frame_to_return = Draw.keyPoints(
-            frame=frame_to_draw,
-            keyPoints=key_points,
-            color=ObjectTracker.COLOR_ASSIGNMENT_TO_OBJECT_TYPES[object]
-        )
-
         # if object to track are earings group them into pairs before further processing
         if object is Earings:
             key_points = Earings.groupEaringsIntoPairs(key_points)
 
+        # set number of source frames since the previous call, before calculating distances
+        ObjectTracker.__set_frame_delta(objectsToTrack, frame_delta)
+        ObjectTracker.__set_capture_timestamp(objectsToTrack, capture_timestamp)
+
+        # update measured belt movement before calculating distances
+        if belt_movement is not None:
+            ObjectTracker.__accumulate_belt_movement(objectsToTrack, belt_movement)
+
         # get distance tables
         distanceTable = ObjectTracker.__get_distance_table(
             objectsToTrack,
@@ -133,7 +230,9 @@ class ObjectTracker:
                 ObjectTracker.__add_new_object(
                     object,
                     objectsToTrack,
-                    key_points[KP_id]
+                    key_points[KP_id],
+                    frame_delta,
+                    capture_timestamp
                 )
                 continue
 
@@ -161,13 +260,15 @@ class ObjectTracker:
                 ObjectTracker.__add_new_object(
                     object,
                     objectsToTrack,
-                    key_points[KP_id]
+                    key_points[KP_id],
+                    frame_delta,
+                    capture_timestamp
                 )
 
         # increment counter for each object which has not been found
         ObjectTracker.__increment_missing_on_frames(objectsToTrack)
 
-        return frame_to_return
+        return None
 
     @ staticmethod
     def __object_assignment_validation(
@@ -181,30 +282,15 @@ class ObjectTracker:
             Method to validate if object situated the closest to particular key point is meeting
             the criteria for assigning it to that object
         '''
-        # get number of frames where object was missing
-        # +1 in case of object which has number of missing frames 0,
-        # to avoid multiplication by 0
-        thresholdMux = object_list[objectID].getMissingOnFrames() + 1
+        # get acceptable error related to conveyor belt movement,
+        # which takes into account number of frames where particular object was not found
+        x_error, y_error = object_list[objectID].getAcceptableError()
 
         # check if distance on X axis is less or equal to acceptable error
-        # related to conveyor belt movement, multiplied by number of frames,
-        # where particular object was not found
-        X_axis_condition: bool = (
-            x_distance <= (
-                object.X_AXIS_MOVEMENT_ERROR *
-                thresholdMux
-            )
-        )
+        X_axis_condition: bool = (x_distance <= x_error)
 
         # check if distance on Y axis is less or equal to acceptable error
-        # related to conveyor belt movement, multiplied by number of frames,
-        # where particular object was not found
-        Y_axis_condition: bool = (
-            y_distance <= (
-                object.Y_AXIS_MOVEMENT_ERROR *
-                thresholdMux
-            )
-        )
+        Y_axis_condition: bool = (y_distance <= y_error)
 
         # returns true if both conditions are met
         return (X_axis_condition and Y_axis_condition)
@@ -213,11 +299,15 @@ class ObjectTracker:
     def __add_new_object(
         object: Ring | Necklace | Earings,
         listToAppend: list[Ring | Necklace | Earings],
-        key_point: tuple[float, float]
+        key_point: tuple[float, float],
+        frame_delta: int = 1,
+        capture_timestamp: float = None
     ):
 
         # create new object in list
         listToAppend.append(object())
+        listToAppend[-1].setFrameDelta(frame_delta)
+        listToAppend[-1].setCaptureTimestamp(capture_timestamp)
 
         # append positions for new object
         ObjectTracker.__append_object_position(listToAppend, -1, key_point)
@@ -311,3 +401,36 @@ class ObjectTracker:
             object.incrementMissingOnFrames()
 
         return None
+
+    @ staticmethod
+    def __set_frame_delta(
+        objectList: list[Ring | Necklace | Earings],
+        frame_delta: int
+    ) -> None:
+
+        for object in objectList:
+            object.setFrameDelta(frame_delta)
+
+        return None
+
+    @ staticmethod
+    def __set_capture_timestamp(
+        objectList: list[Ring | Necklace | Earings],
+        capture_timestamp: float
+    ) -> None:
+
+        for object in objectList:
+            object.setCaptureTimestamp(capture_timestamp)
+
+        return None
+
+    @ staticmethod
+    def __accumulate_belt_movement(
+        objectList: list[Ring | Necklace | Earings],
+        belt_movement: tuple[float, float]
+    ) -> None:
+
+        for object in objectList:
+            object.accumulateBeltMovement(belt_movement)
+
+        return None
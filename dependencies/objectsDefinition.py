@@ -1,5 +1,8 @@
 import cv2
 import math
+import time
+import numpy
+from typing import ClassVar
 from dataclasses import dataclass, field
 
 X = 0
@@ -11,6 +14,7 @@ class JewelryObject:
     '''
         Parent class to define jewelry object.
         Configurable attributes are written in Capital letters only.
+        They are class attributes, so changing them affects every object of given type.
         Inheritance classes defines following attributes:
             - X_AXIS_MOVEMENT_ERROR <- movement threshold in X axis (in pixels),
                 which will take up any imperfections in conveyor belt movement.
@@ -25,6 +29,20 @@ class JewelryObject:
             - MARK_AS_INVISIBLE_AFTER_MISSING_ON_FRAMES <- represents the number of frames,
                 where object must be missing, to be considered as not visible.
 
+        If belt movement is measured (see accumulateBeltMovement), it replaces movement per frame constants.
+        Movement errors are multiplied by the number of frames where object was missing in both cases.
+
+        Frames are counted in frames of the source, not in analyzed frames. If frames are skipped,
+        frame delta (see setFrameDelta) is the number of source frames since the previous analyzed one,
+        so movement, errors and numbers of frames grow the same way as if all frames were analyzed.
+
+        Times (monotonic clock, in seconds) are recorded to measure latency of decisions:
+            - first seen <- capture timestamp of the frame where object was found for the first time
+              (see setCaptureTimestamp),
+            - confirmed <- when object was found on MARK_AS_INVISIBLE_AFTER_MISSING_ON_FRAMES frames,
+              so it is not a phantom object anymore,
+            - retired <- when object was marked as not visible.
+
         WARNING: To mark object as not visible ALL of the following criteria values must be met:
             - MARK_AS_INVISIBLE_AFTER_X_COORDINATE
             - MARK_AS_INVISIBLE_AFTER_MISSING_ON_FRAMES
@@ -32,18 +50,15 @@ class JewelryObject:
 
     OBJECT_NAME: str = field(init=True, default="Obiekt biżuteryjny")
 
-    X_AXIS_MOVEMENT_ERROR: int = field(init=False, default=None)
-    Y_AXIS_MOVEMENT_ERROR: int = field(init=False, default=None)
+    X_AXIS_MOVEMENT_ERROR: ClassVar[int] = None
+    Y_AXIS_MOVEMENT_ERROR: ClassVar[int] = None
 
-    X_AXIS_MOVEMENT_PER_FRAME: int = field(init=False, default=None)
-    Y_AXIS_MOVEMENT_PER_FRAME: int = field(init=False, default=None)
+    X_AXIS_MOVEMENT_PER_FRAME: ClassVar[int] = None
+    Y_AXIS_MOVEMENT_PER_FRAME: ClassVar[int] = None
 
-    MARK_AS_INVISIBLE_AFTER_X_COORDINATE: int = field(init=False, default=None)
+    MARK_AS_INVISIBLE_AFTER_X_COORDINATE: ClassVar[int] = None
 
-    MARK_AS_INVISIBLE_AFTER_MISSING_ON_FRAMES: int = field(
-        init=False,
-        default=10
-    )
+    MARK_AS_INVISIBLE_AFTER_MISSING_ON_FRAMES: ClassVar[int] = 10
 
     positions: list[cv2.KeyPoint] = field(init=False, default_factory=list)
 
@@ -51,6 +66,18 @@ class JewelryObject:
     __found_on_frames: int = field(init=False, default=1)
     __appended: bool = field(init=False, default=True)
     __visible: bool = field(init=False, default=True)
+    __belt_movement: tuple[float, float] = field(init=False, default=None)
+    __frame_delta: int = field(init=False, default=1)
+    __capture_timestamp: float = field(init=False, default=None)
+    __first_seen_time: float = field(init=False, default=None)
+    __confirmed_time: float = field(init=False, default=None)
+    __retired_time: float = field(init=False, default=None)
+
+    # positions already converted for getState, in buffer which is only appended,
+    # and state of retired object, which is not tracked any more
+    __positions_array: numpy.ndarray = field(init=False, default=None)
+    __positions_in_array: int = field(init=False, default=0)
+    __retired_state: dict = field(init=False, default=None)
 
     def __post_init__(self):
         print(f"New {self.OBJECT_NAME} found")
@@ -64,11 +91,53 @@ class JewelryObject:
     def getMissingOnFrames(self) -> int:
         return self.__missing_on_frames
 
+    def getFirstSeenTime(self) -> float:
+        return self.__first_seen_time
+
+    def getConfirmedTime(self) -> float:
+        return self.__confirmed_time
+
+    def getRetiredTime(self) -> float:
+        return self.__retired_time
+
+    def setFrameDelta(self, frame_delta: int):
+        self.__frame_delta = frame_delta
+
+    def setCaptureTimestamp(self, capture_timestamp: float):
+        self.__capture_timestamp = capture_timestamp
+
     def appendPositions(self, key_point: cv2.KeyPoint):
         self.positions.append(key_point)
         self.__appended = True
         self.__missing_on_frames = 0
-        self.__found_on_frames = self.__found_on_frames + 1
+
+        # object found on analyzed frame is counted as found on all source frames it stands for
+        self.__found_on_frames = self.__found_on_frames + self.__frame_delta
+
+        if self.__first_seen_time is None:
+            self.__first_seen_time = self.__capture_timestamp
+
+        # the same criterion as used to remove phantom objects
+        if (
+            self.__confirmed_time is None and
+            self.__found_on_frames >= self.MARK_AS_INVISIBLE_AFTER_MISSING_ON_FRAMES
+        ):
+            self.__confirmed_time = time.monotonic()
+
+        # measured belt movement is counted from the last known position
+        if self.__belt_movement is not None:
+            self.__belt_movement = (0.0, 0.0)
+
+    def accumulateBeltMovement(self, belt_movement: tuple[float, float]):
+
+        # sum up belt movement measured since the last time when object was found
+        if self.__belt_movement is None:
+            self.__belt_movement = (0.0, 0.0)
+
+        self.__belt_movement = (
+            self.__belt_movement[X] + belt_movement[X],
+            self.__belt_movement[Y] + belt_movement[Y]
+        )
 
     def resetAppendFlag(self):
         self.__appended = False
@@ -89,13 +158,14 @@ class JewelryObject:
         ):
             # mark object as not visible, print message in console and return
             self.__visible = False
+            self.__retired_time = time.monotonic()
             print(f"{self.OBJECT_NAME} marked as invisible")
             return None
 
         # if object was not appended and no other conditions were met increment number of frames,
         # where object was missing
         if not self.__appended:
-            self.__missing_on_frames = self.__missing_on_frames + 1
+            self.__missing_on_frames = self.__missing_on_frames + self.__frame_delta
 
         return None
 
@@ -116,61 +186,177 @@ class JewelryObject:
 
         return (x_distance, y_distance)
 
-    def getAcceptableMovement(self) -> tuple[int, int]:
+    def getAcceptableMovement(self, frame_delta: int = None) -> tuple[float, float]:
+        '''
+            Returns movement expected since the last position of the object.
+            frame_delta overrides the one set by setFrameDelta, i.e. to predict the next frame.
+        '''
+        if frame_delta is None:
+            frame_delta = self.__frame_delta
+
+        # if belt movement is measured, return movement accumulated since object was found last time
+        if self.__belt_movement is not None:
+            return self.__belt_movement
+
+        # otherwise return possible movement multiplied by the number of frames where object was missing.
+        # even if the object was not identified it was moving on conveyor belt.
+        # frames skipped before the current one are missing frames as well
+        missing_on_frames = self.__missing_on_frames + frame_delta - 1
 
-        # return possible movement multiplied by the number of frames where object was missing.
-        # even if the object was not identified it was moving on conveyor belt
         return (
-            self.__missing_on_frames * self.X_AXIS_MOVEMENT_PER_FRAME,
-            self.__missing_on_frames * self.Y_AXIS_MOVEMENT_PER_FRAME
+            missing_on_frames * self.X_AXIS_MOVEMENT_PER_FRAME,
+            missing_on_frames * self.Y_AXIS_MOVEMENT_PER_FRAME
+        )
+
+    def getAcceptableError(self, frame_delta: int = None) -> tuple[float, float]:
+        '''
+            Returns acceptable distance from the expected position of the object.
+            frame_delta overrides the one set by setFrameDelta, i.e. to predict the next frame.
+        '''
+        if frame_delta is None:
+            frame_delta = self.__frame_delta
+
+        # error grows with missing frames even if belt movement is measured,
+        # as objects missing on frames are mostly the ones which were poorly detected
+        # and their next position is as uncertain as without the measurement
+
+        # get number of frames where object was missing
+        # + frame delta (1 if no frames were skipped) in case of object which has number of missing frames 0,
+        # to avoid multiplication by 0
+        thresholdMux = self.__missing_on_frames + frame_delta
+
+        # acceptable error related to conveyor belt movement, multiplied by number of frames,
+        # where particular object was not found
+        return (
+            self.X_AXIS_MOVEMENT_ERROR * thresholdMux,
+            self.Y_AXIS_MOVEMENT_ERROR * thresholdMux
         )
 
     def getLastPosition(self) -> cv2.KeyPoint:
         return self.positions[-1]
 
+    def getState(self) -> dict:
+        '''
+            Returns state of the object, which can be saved, i.e. with pickle.
+            Positions are stored as array of (x, y, size), only positions found since
+            the previous call are converted. State of retired object is taken only once,
+            so returned states must not be modified.
+        '''
+        if self.__retired_state is not None:
+            return self.__retired_state
+
+        state = {
+            "positions": self.__get_positions_array(),
+            "missing_on_frames": self.__missing_on_frames,
+            "found_on_frames": self.__found_on_frames,
+            "appended": self.__appended,
+            "visible": self.__visible,
+            "belt_movement": self.__belt_movement
+        }
+
+        if not self.__visible:
+            self.__retired_state = state
+
+        return state
+
+    @classmethod
+    def fromState(cls, state: dict) -> "JewelryObject":
+        '''
+            Creates object from state returned by getState.
+            __post_init__ is not called, as the object is not a new one.
+        '''
+        object = cls.__new__(cls)
+        object.OBJECT_NAME = cls.OBJECT_NAME
+        object.positions = [
+            cv2.KeyPoint(float(x), float(y), float(size))
+            for x, y, size in state["positions"]
+        ]
+        object.__missing_on_frames = state["missing_on_frames"]
+        object.__found_on_frames = state["found_on_frames"]
+        object.__appended = state["appended"]
+        object.__visible = state["visible"]
+        object.__belt_movement = state["belt_movement"]
+        object.__frame_delta = 1
+        object.__positions_array = None
+        object.__positions_in_array = 0
+        object.__retired_state = None
+
+        # monotonic clock is not comparable between processes, so times are not restored
+        object.__capture_timestamp = None
+        object.__first_seen_time = None
+        object.__confirmed_time = None
+        object.__retired_time = None
+
+        return object
+
+    def __get_positions_array(self) -> numpy.ndarray:
+        '''
+            Returns array of all positions, as view of the buffer.
+            Rows of returned view are never written again, as the buffer is only appended
+            (or replaced by the bigger one), so it can be read by other threads.
+        '''
+        positions = len(self.positions)
+
+        if self.__positions_array is None or positions > len(self.__positions_array):
+            positions_array = numpy.empty(
+                (max(positions, 2 * self.__positions_in_array, 16), 3),
+                dtype=numpy.float32
+            )
+            if self.__positions_array is not None:
+                positions_array[:self.__positions_in_array] = self.__positions_array[:self.__positions_in_array]
+            self.__positions_array = positions_array
+
+        if positions > self.__positions_in_array:
+            self.__positions_array[self.__positions_in_array:positions] = [
+                (kp.pt[X], kp.pt[Y], kp.size) for kp in self.positions[self.__positions_in_array:]
+            ]
+            self.__positions_in_array = positions
+
+        return self.__positions_array[:positions]
+
 
 @dataclass
 class Ring (JewelryObject):
     OBJECT_NAME: str = "Pierścionek"
 
-    X_AXIS_MOVEMENT_PER_FRAME: int = 4
-    Y_AXIS_MOVEMENT_PER_FRAME: int = 1
+    X_AXIS_MOVEMENT_PER_FRAME: ClassVar[int] = 4
+    Y_AXIS_MOVEMENT_PER_FRAME: ClassVar[int] = 1
 
-    X_AXIS_MOVEMENT_ERROR: int = 10
-    Y_AXIS_MOVEMENT_ERROR: int = 10
+    X_AXIS_MOVEMENT_ERROR: ClassVar[int] = 10
+    Y_AXIS_MOVEMENT_ERROR: ClassVar[int] = 10
 
-    MARK_AS_INVISIBLE_AFTER_X_COORDINATE: int = 1_000
-    MARK_AS_INVISIBLE_AFTER_MISSING_ON_FRAMES: int = 10
+    MARK_AS_INVISIBLE_AFTER_X_COORDINATE: ClassVar[int] = 1_000
+    MARK_AS_INVISIBLE_AFTER_MISSING_ON_FRAMES: ClassVar[int] = 10
 
 
 @dataclass
 class Necklace (JewelryObject):
     OBJECT_NAME: str = "Naszyjnik"
 
-    X_AXIS_MOVEMENT_PER_FRAME: int = 0
-    Y_AXIS_MOVEMENT_PER_FRAME: int = 0
+    X_AXIS_MOVEMENT_PER_FRAME: ClassVar[int] = 0
+    Y_AXIS_MOVEMENT_PER_FRAME: ClassVar[int] = 0
 
-    X_AXIS_MOVEMENT_ERROR: int = 38
-    Y_AXIS_MOVEMENT_ERROR: int = 38
+    X_AXIS_MOVEMENT_ERROR: ClassVar[int] = 38
+    Y_AXIS_MOVEMENT_ERROR: ClassVar[int] = 38
 
-    MARK_AS_INVISIBLE_AFTER_X_COORDINATE: int = 800
-    MARK_AS_INVISIBLE_AFTER_MISSING_ON_FRAMES: int = 10
+    MARK_AS_INVISIBLE_AFTER_X_COORDINATE: ClassVar[int] = 800
+    MARK_AS_INVISIBLE_AFTER_MISSING_ON_FRAMES: ClassVar[int] = 10
 
 
 @dataclass
 class Earings (JewelryObject):
     OBJECT_NAME: str = "Kolczyki"
 
-    X_AXIS_MOVEMENT_PER_FRAME: int = 0
-    Y_AXIS_MOVEMENT_PER_FRAME: int = 0
+    X_AXIS_MOVEMENT_PER_FRAME: ClassVar[int] = 0
+    Y_AXIS_MOVEMENT_PER_FRAME: ClassVar[int] = 0
 
-    X_AXIS_MOVEMENT_ERROR: int = 50
-    Y_AXIS_MOVEMENT_ERROR: int = 50
+    X_AXIS_MOVEMENT_ERROR: ClassVar[int] = 50
+    Y_AXIS_MOVEMENT_ERROR: ClassVar[int] = 50
 
-    DISTANCE_BETWEEN_EARINGS: int = 100
+    DISTANCE_BETWEEN_EARINGS: ClassVar[int] = 100
 
-    MARK_AS_INVISIBLE_AFTER_X_COORDINATE: int = 1_000
-    MARK_AS_INVISIBLE_AFTER_MISSING_ON_FRAMES: int = 40
+    MARK_AS_INVISIBLE_AFTER_X_COORDINATE: ClassVar[int] = 1_000
+    MARK_AS_INVISIBLE_AFTER_MISSING_ON_FRAMES: ClassVar[int] = 40
 
     @staticmethod
     def groupEaringsIntoPairs(keyPoints: tuple[cv2.KeyPoint]) -> tuple[cv2.KeyPoint]:
@@ -0,0 +1,168 @@
+import numpy
+import contextlib
+from typing import Callable
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+
+
+@dataclass(frozen=True)
+class Stage:
+    '''
+        One stage of the pipeline:
+            - name <- name used in measurements and errors,
+            - function <- called with values of inputs, in order,
+            - inputs <- names of values the stage needs (sources or outputs of other stages),
+            - outputs <- names of values the stage returns (tuple, if there are many of them).
+        Stage must not modify its inputs, as they can be shared with other stages.
+    '''
+
+    name: str
+    function: Callable
+    inputs: tuple[str, ...] = field(default=())
+    outputs: tuple[str, ...] = field(default=())
+
+
+@dataclass
+class StageGraph:
+    '''
+        Runs stages in order given by their inputs and outputs, instead of hard-wired calls.
+
+        For each set of requested outputs, a plan is made once and reused:
+            - only stages producing requested outputs (directly or through other stages) are run,
+              so i.e. rendering is skipped, when annotated frame is not requested,
+            - stages are grouped in levels, stages of one level depend only on previous levels,
+              so with more than one worker, stages of one level are run in parallel.
+
+        Each value is computed once per run and shared by all stages using it.
+        Numpy arrays (sources and outputs of stages) are passed as read-only views,
+        so a stage modifying its input fails instead of changing the value seen by other stages.
+
+        If measure is provided (i.e. DeadlineScheduler.measure), each stage is run inside
+        the context manager it returns for the name of the stage.
+    '''
+
+    stages: list[Stage] = field(default_factory=list)
+    sources: tuple[str, ...] = field(default=())
+    workers: int = field(default=1)
+    measure: Callable[[str], contextlib.AbstractContextManager] = field(default=None)
+
+    __producers: dict[str, Stage] = field(init=False, default_factory=dict)
+    __plans: dict[frozenset[str], list[list[Stage]]] = field(init=False, default_factory=dict)
+    __executor: ThreadPoolExecutor = field(init=False, default=None)
+
+    def __post_init__(self):
+        for stage in self.stages:
+            if not stage.outputs:
+                raise ValueError(f"stage {stage.name} has no outputs")
+
+            for output in stage.outputs:
+                if output in self.sources or output in self.__producers:
+                    raise ValueError(f"{output} of stage {stage.name} is already produced")
+                self.__producers[output] = stage
+
+        for stage in self.stages:
+            for input in stage.inputs:
+                if input not in self.sources and input not in self.__producers:
+                    raise ValueError(f"{input} of stage {stage.name} is not produced by any stage")
+
+        # checks also, that there are no cycles
+        self.getPlan(tuple(self.__producers))
+
+        if self.workers > 1:
+            self.__executor = ThreadPoolExecutor(max_workers=self.workers)
+
+    def __del__(self):
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False)
+
+    def run(self, sources: dict[str, object], outputs: tuple[str, ...]) -> dict[str, object]:
+        '''
+            Runs stages needed for requested outputs, with given values of sources.
+            Returns dict with values of requested outputs.
+        '''
+        values = {name: StageGraph.__freeze(value) for name, value in sources.items()}
+
+        for level in self.__get_levels(outputs):
+            if self.__executor is None or len(level) == 1:
+                results = [self.__run_stage(stage, values) for stage in level]
+            else:
+                # list() to wait for all stages of the level and to raise exceptions from threads
+                results = list(
+                    self.__executor.map(lambda stage: self.__run_stage(stage, values), level)
+                )
+
+            for result in results:
+                values.update(result)
+
+        return {output: values[output] for output in outputs}
+
+    def getPlan(self, outputs: tuple[str, ...]) -> list[list[str]]:
+        '''
+            Returns names of stages run for requested outputs, grouped in levels.
+        '''
+        return [[stage.name for stage in level] for level in self.__get_levels(outputs)]
+
+    def __get_levels(self, outputs: tuple[str, ...]) -> list[list[Stage]]:
+        key = frozenset(outputs)
+        if key not in self.__plans:
+            self.__plans[key] = self.__make_plan(outputs)
+
+        return self.__plans[key]
+
+    def __make_plan(self, outputs: tuple[str, ...]) -> list[list[Stage]]:
+        levels: dict[Stage, int] = {}
+
+        def level_of(stage: Stage, path: tuple[str, ...]) -> int:
+            if stage.name in path:
+                raise ValueError(f"stages {' -> '.join(path + (stage.name,))} make a cycle")
+
+            if stage not in levels:
+                levels[stage] = 1 + max(
+                    (
+                        level_of(self.__producers[input], path + (stage.name,))
+                        for input in stage.inputs if input in self.__producers
+                    ),
+                    default=-1
+                )
+
+            return levels[stage]
+
+        for output in outputs:
+            if output in self.sources:
+                continue
+            if output not in self.__producers:
+                raise ValueError(f"{output} is not produced by any stage")
+            level_of(self.__producers[output], ())
+
+        plan = [[] for _ in range(max(levels.values(), default=-1) + 1)]
+        # stages of one level are kept in order of declaration
+        for stage in self.stages:
+            if stage in levels:
+                plan[levels[stage]].append(stage)
+
+        return plan
+
+    def __run_stage(self, stage: Stage, values: dict[str, object]) -> dict[str, object]:
+        with self.measure(stage.name) if self.measure is not None else contextlib.nullcontext():
+            result = stage.function(*(values[input] for input in stage.inputs))
+
+        if len(stage.outputs) == 1:
+            result = (result,)
+
+        return {
+            output: StageGraph.__freeze(value) for output, value in zip(stage.outputs, result)
+        }
+
+    @staticmethod
+    def __freeze(value: object) -> object:
+        '''
+            Returns value with numpy arrays replaced by their read-only views,
+            so arrays of the caller (i.e. the source frame) stay writable outside the graph.
+        '''
+        if isinstance(value, numpy.ndarray):
+            value = value.view()
+            value.setflags(write=False)
+        elif isinstance(value, tuple):
+            value = tuple(StageGraph.__freeze(item) for item in value)
+
+        return value
@@ -0,0 +1,126 @@
+from typing import Final
+from dataclasses import dataclass, field
+from dependencies.segmentation import Segmentation
+from dependencies.objectTracker import ObjectTracker
+from dependencies.objectsDefinition import Earings
+
+X = 0
+Y = 1
+
+
+@dataclass
+class PredictedWindows:
+    '''
+        Returns regions where objects should be detected on the next frame:
+            - windows around predicted positions of tracked objects,
+              big enough for the object and the acceptable error of its type,
+            - entry band at the left edge of the frame, where new objects appear on the belt,
+              or entry regions provided by the caller instead (i.e. foreground regions of BackgroundModel).
+        Every full_sweep_interval frames (and on the first one) no regions are returned,
+        so the whole frame is searched and objects missed by the windows are found.
+
+        Only objects found recently (not missing for more frames than
+        MARK_AS_INVISIBLE_AFTER_MISSING_ON_FRAMES of their type) get windows,
+        as acceptable error of the other ones is too big to limit the search.
+    '''
+
+    # objects found only on a few frames, i.e. at the right edge of the frame, need at least
+    # MARK_AS_INVISIBLE_AFTER_MISSING_ON_FRAMES detections to be counted, so they can not wait long for a sweep
+    FULL_SWEEP_INTERVAL: Final[int] = 8
+    ENTRY_BAND_WIDTH: Final[int] = 300
+    WINDOW_MARGIN: Final[int] = 24
+
+    full_sweep_interval: int = field(default=FULL_SWEEP_INTERVAL)
+
+    full_sweeps: int = field(init=False, default=0)
+    windowed_frames: int = field(init=False, default=0)
+
+    __frames_since_sweep: int = field(init=False, default=None)
+    __covered_area: float = field(init=False, default=0.0)
+
+    def getRegions(
+        self,
+        tracker: ObjectTracker,
+        frame_shape: tuple[int, int],
+        frame_delta: int = 1,
+        entry_regions: list[tuple[int, int, int, int]] = None
+    ) -> list[tuple[int, int, int, int]] | None:
+        '''
+            Returns list of not overlapping regions (x, y, width, height) to search on the next frame,
+            or None if the whole frame has to be searched.
+            frame_delta is the number of source frames since the previous analyzed one.
+            entry_regions (x, y, width, height) replace the entry band, if provided.
+        '''
+        if (
+            self.__frames_since_sweep is None or
+            self.__frames_since_sweep + 1 >= self.full_sweep_interval
+        ):
+            self.__frames_since_sweep = 0
+            self.full_sweeps = self.full_sweeps + 1
+            return None
+
+        self.__frames_since_sweep = self.__frames_since_sweep + 1
+
+        height, width = frame_shape
+        boxes = (
+            [(0, 0, self.ENTRY_BAND_WIDTH, height)] if entry_regions is None else list(entry_regions)
+        )
+
+        for objects in (tracker.rings, tracker.necklaces, tracker.earings):
+            for object in objects:
+                if (
+                    not object.isVisible() or
+                    object.getMissingOnFrames() > object.MARK_AS_INVISIBLE_AFTER_MISSING_ON_FRAMES
+                ):
+                    continue
+
+                # the same movement and error as the tracker will use on the next frame,
+                # frame delta of the object itself is set by the tracker
+                movement = object.getAcceptableMovement(frame_delta)
+                error = object.getAcceptableError(frame_delta)
+                last_position = object.getLastPosition()
+
+                # position of earings is the middle of the pair
+                extent = last_position.size / 2
+                if isinstance(object, Earings):
+                    extent = extent + Earings.DISTANCE_BETWEEN_EARINGS / 2
+
+                x = last_position.pt[X] + movement[X]
+                y = last_position.pt[Y] + movement[Y]
+                half_width = extent + error[X]
+                half_height = extent + error[Y]
+
+                # object predicted outside of the frame
+                if (
+                    x + half_width <= 0 or x - half_width >= width or
+                    y + half_height <= 0 or y - half_height >= height
+                ):
+                    continue
+
+                boxes.append(
+                    (
+                        int(x - half_width),
+                        int(y - half_height),
+                        int(2 * half_width),
+                        int(2 * half_height)
+                    )
+                )
+
+        regions = Segmentation.mergeBoxes(boxes, self.WINDOW_MARGIN, frame_shape)
+
+        self.windowed_frames = self.windowed_frames + 1
+        self.__covered_area = self.__covered_area + (
+            sum(region_width * region_height for _, _, region_width, region_height in regions) /
+            (width * height)
+        )
+
+        return regions
+
+    def printPredictionReport(self) -> None:
+        print("Full frame sweeps: ", self.full_sweeps)
+        print("Frames searched in windows: ", self.windowed_frames)
+        if self.windowed_frames:
+            print(
+                "Average searched area [%]: ",
+                round(100 * self.__covered_area / self.windowed_frames, 1)
+            )
@@ -0,0 +1,182 @@
+import cv2
+import numpy
+from typing import Final
+from dataclasses import dataclass, field
+from dependencies.blobDetector import BlobDetector
+from dependencies.objectsDefinition import Ring, Necklace, Earings
+
+WIDTH = cv2.CC_STAT_WIDTH
+HEIGHT = cv2.CC_STAT_HEIGHT
+
+
+@dataclass
+class GateStatistics:
+    '''
+        Statistics of the presence gate for one object type:
+            - frames <- number of frames checked by the gate,
+            - skipped <- number of frames where the detector was skipped,
+            - validated <- number of skipped frames, where the detector was run anyway (validation mode),
+            - violations <- number of validated frames, where the detector found objects.
+    '''
+
+    frames: int = field(default=0)
+    skipped: int = field(default=0)
+    validated: int = field(default=0)
+    violations: int = field(default=0)
+
+
+@dataclass
+class PresenceGate:
+    '''
+        Skips detectors on frames, where objects of their type can not be found.
+
+        Blob detector finds contours on the frame thresholded with each of its thresholds
+        (from minThreshold, by thresholdStep, below maxThreshold), so area of each blob is limited
+        by the bounding box of the connected region it is made of:
+            - rings are detected on the frame with closed edges, where each blob is a region
+              enclosed by edges or the edges themselves, so it is limited by a connected region of edges,
+            - earings and necklaces are detected on the gray frame with filled contours, where each blob
+              is a dark region (hole of the thresholded frame), limited by a connected region
+              not brighter than the last threshold, or a bright region with dark center,
+              limited by a connected region brighter than the first threshold.
+        Mask is downsampled by DOWNSAMPLE_FACTOR (block is set if any of its pixels is set),
+        so connected regions are found cheaply and are never smaller than in the full resolution.
+        If the biggest bounding box (extended by one block for the contour) is smaller than
+        the minimal area of the detector, the detector is skipped, so true detections are never skipped.
+        On the bright belt, regions of the gray frame cover the whole frame, so the detectors
+        of earings and necklaces are skipped only on regions smaller than their minimal area
+        (i.e. windows of --predicted_windows).
+
+        Validation mode runs skipped detectors anyway and counts frames where objects were found
+        (violations), to check it on the recording. Objects found in validation mode are returned.
+    '''
+
+    DOWNSAMPLE_FACTOR: Final[int] = 8
+
+    # objects of these types are detected on the frame with closed edges,
+    # the other ones on the gray frame with filled contours
+    EDGE_FRAME_TYPES: Final[tuple[type, ...]] = (Ring,)
+
+    validate: bool = field(default=False)
+
+    statistics: dict[type, GateStatistics] = field(init=False, default_factory=lambda: {
+        Ring: GateStatistics(),
+        Necklace: GateStatistics(),
+        Earings: GateStatistics()
+    })
+
+    # (frame, thresholds, limit) in one tuple, as detectors of earings and necklaces can ask at the same time
+    __last_limit: tuple[numpy.ndarray, tuple[float, float], int] = field(init=False, default=None)
+
+    def detect(
+        self,
+        object_type: type[Ring | Necklace | Earings],
+        detector: BlobDetector,
+        frame: numpy.ndarray
+    ) -> tuple[cv2.KeyPoint]:
+        '''
+            Returns key points found by the detector on the frame,
+            or no key points if objects of given type can not be found on it.
+        '''
+        statistics = self.statistics[object_type]
+        statistics.frames = statistics.frames + 1
+
+        if not detector.filter_by_area or self.getAreaLimit(object_type, detector, frame) >= detector.min_area:
+            return detector.detect_objects(frame)
+
+        statistics.skipped = statistics.skipped + 1
+        if not self.validate:
+            return tuple()
+
+        key_points = detector.detect_objects(frame)
+        statistics.validated = statistics.validated + 1
+        if key_points:
+            statistics.violations = statistics.violations + 1
+            print(f"Presence gate of {object_type.__name__} would skip {len(key_points)} key points")
+
+        return key_points
+
+    def getAreaLimit(
+        self,
+        object_type: type[Ring | Necklace | Earings],
+        detector: BlobDetector,
+        frame: numpy.ndarray
+    ) -> int:
+        '''
+            Returns the biggest area of a blob, which can be found on the frame
+            by the detector of given object type.
+        '''
+        if object_type in self.EDGE_FRAME_TYPES:
+            return PresenceGate.__get_biggest_region(frame > 0, self.DOWNSAMPLE_FACTOR)
+
+        params = detector.detector_params
+        thresholds = numpy.arange(params.minThreshold, params.maxThreshold, params.thresholdStep)
+        if not len(thresholds):
+            return frame.shape[0] * frame.shape[1]
+        thresholds = (float(thresholds[0]), float(thresholds[-1]))
+
+        # earings and necklaces are detected on the same frame, so limit is computed once
+        last_limit = self.__last_limit
+        if last_limit is not None and last_limit[0] is frame and last_limit[1] == thresholds:
+            return last_limit[2]
+
+        first_threshold, last_threshold = thresholds
+        limit = max(
+            PresenceGate.__get_biggest_region(frame <= last_threshold, self.DOWNSAMPLE_FACTOR),
+            PresenceGate.__get_biggest_region(frame > first_threshold, self.DOWNSAMPLE_FACTOR)
+        )
+        self.__last_limit = (frame, thresholds, limit)
+
+        return limit
+
+    def printGateReport(self) -> None:
+        for object_type, statistics in self.statistics.items():
+            skipped = round(100 * statistics.skipped / statistics.frames, 1) if statistics.frames else 0.0
+            print(
+                f"Presence gate {object_type.__name__}: ",
+                f"frames {statistics.frames},",
+                f"skipped {statistics.skipped} ({skipped}%)"
+            )
+            if self.validate:
+                print(
+                    f"Presence gate {object_type.__name__} validation: ",
+                    f"validated {statistics.validated},",
+                    f"violations {statistics.violations}"
+                )
+
+    @staticmethod
+    def __get_biggest_region(mask: numpy.ndarray, downsample_factor: int) -> int:
+        '''
+            Returns the biggest area of the bounding box of connected region in the mask,
+            in pixels of the full resolution, extended by one block.
+        '''
+        height, width = mask.shape[:2]
+        small_height, small_width = -(-height // downsample_factor), -(-width // downsample_factor)
+
+        # mask is padded to whole blocks, so each block is the average of its pixels,
+        # which is not 0 if any of them is set
+        small_mask = cv2.resize(
+            cv2.copyMakeBorder(
+                mask.view(numpy.uint8) * numpy.uint8(255),
+                0, small_height * downsample_factor - height,
+                0, small_width * downsample_factor - width,
+                cv2.BORDER_CONSTANT,
+                value=0
+            ),
+            (small_width, small_height),
+            interpolation=cv2.INTER_AREA
+        )
+
+        _, _, stats, _ = cv2.connectedComponentsWithStats(
+            (small_mask > 0).view(numpy.uint8),
+            connectivity=8
+        )
+
+        # label 0 is the background
+        if len(stats) < 2:
+            return 0
+
+        return int(
+            numpy.max((stats[1:, WIDTH] + 1) * (stats[1:, HEIGHT] + 1)) *
+            downsample_factor ** 2
+        )
@@ -0,0 +1,229 @@
+import time
+import contextlib
+from enum import IntEnum
+from typing import Final, Callable
+from dataclasses import dataclass, field
+
+
+class DegradationLevel(IntEnum):
+    '''
+        Levels of degradation, each one includes all previous ones.
+    '''
+    FULL = 0
+    SKIP_RENDERING = 1
+    LOWER_RESOLUTION = 2
+    FRAME_STRIDE = 3
+    DROP_FRAMES = 4
+
+
+@dataclass
+class DeadlineScheduler:
+    '''
+        Compares measured processing time with the frame period of the source
+        and steps the degradation level down, when the pipeline cannot keep up with the source,
+        or up, when there is enough headroom again.
+
+        Load is the processing time of the whole loop iteration,
+        divided by the time of source frames consumed in that iteration.
+        It is smoothed with exponential moving average.
+
+        Each measured stage time is also passed to stage_observer, if it is provided.
+        If stage_profiler is provided, each stage is also run inside its measure context manager.
+        frame_stride is the stride used at all levels, FRAME_STRIDE level can only increase it.
+
+        Live sources (live) keep only the newest frame, so they drop frames on their own
+        and can not skip them: load is the processing time of the iteration divided by the frame period,
+        no frames are skipped or dropped by the scheduler and the highest level is LOWER_RESOLUTION.
+        Time of waiting for the next frame is not counted, so startFrame has to be called, when it is taken.
+    '''
+
+    HIGH_LOAD: Final[float] = 0.95
+    LOW_LOAD: Final[float] = 0.5
+    FRAMES_TO_STEP_DOWN: Final[int] = 5
+    FRAMES_TO_STEP_UP: Final[int] = 30
+    SMOOTHING: Final[float] = 0.2
+
+    DETECTION_SCALE: Final[float] = 0.5
+    FRAME_STRIDE: Final[int] = 2
+
+    frame_period: float = field(default=None)
+    enabled: bool = field(default=True)
+    stage_observer: Callable[[str, float], None] = field(default=None)
+    stage_profiler: object = field(default=None)
+    frame_stride: int = field(default=1)
+    live: bool = field(default=False)
+
+    level: DegradationLevel = field(init=False, default=DegradationLevel.FULL)
+    load: float = field(init=False, default=0.0)
+    stage_times: dict[str, float] = field(init=False, default_factory=dict)
+    skipped_frames: int = field(init=False, default=0)
+    dropped_frames: int = field(init=False, default=0)
+    level_changes: int = field(init=False, default=0)
+
+    __start_time: float = field(init=False, default=None)
+    __last_frame_end: float = field(init=False, default=None)
+    __frame_start: float = field(init=False, default=None)
+    __consumed_frames: int = field(init=False, default=0)
+    __frames_in_iteration: int = field(init=False, default=1)
+    __frames_over_budget: int = field(init=False, default=0)
+    __frames_under_budget: int = field(init=False, default=0)
+
+    def __post_init__(self):
+        if self.frame_period is None:
+            raise Exception("Frame period not defined")
+
+        if self.live and self.frame_stride != 1:
+            raise Exception("Frame stride not available for live source")
+
+    def shouldRender(self) -> bool:
+        return self.level < DegradationLevel.SKIP_RENDERING
+
+    def getDetectionScale(self) -> float:
+        if self.level >= DegradationLevel.LOWER_RESOLUTION:
+            return self.DETECTION_SCALE
+        return 1.0
+
+    @contextlib.contextmanager
+    def measure(self, stage: str):
+        '''
+            Context manager to measure processing time of given pipeline stage.
+        '''
+        start_time = time.perf_counter()
+        if self.stage_profiler is None:
+            yield
+        else:
+            with self.stage_profiler.measure(stage):
+                yield
+        stage_time = time.perf_counter() - start_time
+
+        if self.stage_observer is not None:
+            self.stage_observer(stage, stage_time)
+
+        self.stage_times[stage] = (
+            stage_time if stage not in self.stage_times else
+            self.stage_times[stage] +
+            self.SMOOTHING * (stage_time - self.stage_times[stage])
+        )
+
+    def startFrame(self) -> None:
+        '''
+            Has to be called, when the frame was taken from the source, at the beginning of each loop iteration.
+        '''
+        self.__frame_start = time.perf_counter()
+
+    def endFrame(self) -> int:
+        '''
+            Has to be called once at the end of each loop iteration.
+            Updates load and degradation level.
+            Returns number of source frames, which should be skipped before the next one.
+        '''
+        now = time.perf_counter()
+
+        # live source drops frames itself, so each iteration is related to one frame period
+        if self.live:
+            if self.__frame_start is not None:
+                iteration_load = (now - self.__frame_start) / self.frame_period
+                self.load = self.load + self.SMOOTHING * (iteration_load - self.load)
+                if self.enabled:
+                    self.__update_level()
+            self.__frame_start = None
+            return 0
+
+        # the first frame has no previous iteration to compare with
+        if self.__last_frame_end is None:
+            self.__start_time = now
+            self.__last_frame_end = now
+            frames_to_skip = self.__get_frames_to_skip()
+            self.skipped_frames = self.skipped_frames + frames_to_skip
+            self.__frames_in_iteration = frames_to_skip + 1
+            self.__consumed_frames = self.__frames_in_iteration
+            return frames_to_skip
+
+        # load of the last iteration, related to number of source frames it consumed
+        iteration_load = (
+            (now - self.__last_frame_end) /
+            (self.frame_period * self.__frames_in_iteration)
+        )
+        self.load = self.load + self.SMOOTHING * (iteration_load - self.load)
+        self.__last_frame_end = now
+
+        if self.enabled:
+            self.__update_level()
+
+        # frames skipped because of frame stride
+        frames_to_skip = self.__get_frames_to_skip()
+        self.skipped_frames = self.skipped_frames + frames_to_skip
+
+        # frames dropped to catch up with the source
+        frames_to_drop = 0
+        if self.level >= DegradationLevel.DROP_FRAMES:
+            expected_frames = int((now - self.__start_time) / self.frame_period)
+            frames_to_drop = max(
+                0,
+                expected_frames - self.__consumed_frames - frames_to_skip - 1
+            )
+            self.dropped_frames = self.dropped_frames + frames_to_drop
+
+        self.__frames_in_iteration = frames_to_skip + frames_to_drop + 1
+        self.__consumed_frames = (
+            self.__consumed_frames + self.__frames_in_iteration
+        )
+
+        return frames_to_skip + frames_to_drop
+
+    def printSchedulingReport(self) -> None:
+        print("Frame period [ms]: ", round(self.frame_period * 1000, 2))
+        for stage, stage_time in self.stage_times.items():
+            print(f"Stage {stage} [ms]: ", round(stage_time * 1000, 2))
+        print("Degradation level: ", self.level.name)
+        print("Degradation level changes: ", self.level_changes)
+        if not self.live:
+            print("Skipped frames: ", self.skipped_frames)
+            print("Dropped frames: ", self.dropped_frames)
+
+    def __get_frames_to_skip(self) -> int:
+        if self.level >= DegradationLevel.FRAME_STRIDE:
+            return max(self.frame_stride, self.FRAME_STRIDE) - 1
+        return self.frame_stride - 1
+
+    def __get_highest_level(self) -> DegradationLevel:
+        if self.live:
+            return DegradationLevel.LOWER_RESOLUTION
+        return DegradationLevel.DROP_FRAMES
+
+    def __update_level(self) -> None:
+
+        # count consecutive frames over and under the budget
+        if self.load > self.HIGH_LOAD:
+            self.__frames_over_budget = self.__frames_over_budget + 1
+            self.__frames_under_budget = 0
+        elif self.load < self.LOW_LOAD:
+            self.__frames_under_budget = self.__frames_under_budget + 1
+            self.__frames_over_budget = 0
+        else:
+            self.__frames_over_budget = 0
+            self.__frames_under_budget = 0
+
+        if (
+            (self.__frames_over_budget >= self.FRAMES_TO_STEP_DOWN) and
+            (self.level < self.__get_highest_level())
+        ):
+            self.__change_level(DegradationLevel(self.level + 1))
+
+        elif (
+            (self.__frames_under_budget >= self.FRAMES_TO_STEP_UP) and
+            (self.level > DegradationLevel.FULL)
+        ):
+            self.__change_level(DegradationLevel(self.level - 1))
+
+        return None
+
+    def __change_level(self, level: DegradationLevel) -> None:
+        print(
+            f"Degradation level changed: {self.level.name} -> {level.name}",
+            f"(load: {self.load:.2f})"
+        )
+        self.level = level
+        self.level_changes = self.level_changes + 1
+        self.__frames_over_budget = 0
+        self.__frames_under_budget = 0
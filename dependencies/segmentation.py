@@ -20,11 +20,86 @@ class Segmentation:
         )
 
     @staticmethod
-    def findContours(frame: numpy.ndarray, mode: int = cv2.RETR_LIST, method: int = cv2.CHAIN_APPROX_SIMPLE):
+    def findContours(
+        frame: numpy.ndarray,
+        mode: int = cv2.RETR_LIST,
+        method: int = cv2.CHAIN_APPROX_SIMPLE,
+        offset: tuple[int, int] = (0, 0)
+    ):
         return (
             cv2.findContours(
                 image=frame,
                 mode=mode,
-                method=method
+                method=method,
+                offset=offset
             )
         )[0]
+
+    @staticmethod
+    def boundingBoxes(mask: numpy.ndarray, min_area: int = 0) -> list[tuple[int, int, int, int]]:
+        '''
+            Returns bounding boxes (x, y, width, height) of connected regions in mask,
+            with area not smaller than min_area.
+        '''
+        _, _, stats, _ = cv2.connectedComponentsWithStats(mask)
+
+        # label 0 is the background
+        return [
+            (
+                int(stats[label, cv2.CC_STAT_LEFT]),
+                int(stats[label, cv2.CC_STAT_TOP]),
+                int(stats[label, cv2.CC_STAT_WIDTH]),
+                int(stats[label, cv2.CC_STAT_HEIGHT])
+            )
+            for label in range(1, len(stats))
+            if stats[label, cv2.CC_STAT_AREA] >= min_area
+        ]
+
+    @staticmethod
+    def mergeBoxes(
+        boxes: list[tuple[int, int, int, int]],
+        margin: int,
+        frame_shape: tuple[int, int]
+    ) -> list[tuple[int, int, int, int]]:
+        '''
+            Extends boxes (x, y, width, height) by margin, limited to frame shape (height, width),
+            and merges the overlapping ones, until none of them overlap.
+        '''
+        height, width = frame_shape
+        merged = [
+            [
+                max(x - margin, 0),
+                max(y - margin, 0),
+                min(x + box_width + margin, width),
+                min(y + box_height + margin, height)
+            ]
+            for x, y, box_width, box_height in boxes
+        ]
+
+        # merge pairs of overlapping boxes, until there is nothing to merge
+        merging = True
+        while merging:
+            merging = False
+            i = 0
+            while i < len(merged):
+                j = i + 1
+                while j < len(merged):
+                    if (
+                        merged[i][0] < merged[j][2] and merged[j][0] < merged[i][2] and
+                        merged[i][1] < merged[j][3] and merged[j][1] < merged[i][3]
+                    ):
+                        merged[i] = [
+                            min(merged[i][0], merged[j][0]),
+                            min(merged[i][1], merged[j][1]),
+                            max(merged[i][2], merged[j][2]),
+                            max(merged[i][3], merged[j][3])
+                        ]
+                        del merged[j]
+                        merging = True
+                    else:
+                        j = j + 1
+                i = i + 1
+
+        return [
+            (x1, y1, x2 - x1, y2 - y1) for x1, y1, x2, y2 in merged
+        ]
@@ -0,0 +1,125 @@
+import cv2
+import numpy
+from typing import Final
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from dependencies.filter import Filter
+from dependencies.segmentation import Segmentation
+from dependencies.draw import Draw
+
+
+@dataclass
+class StripParallelPreprocessor:
+    '''
+        Transforms frame the same way as transformFrame in main.py,
+        but splits it into horizontal strips, processed in parallel on thread pool.
+        Each strip is extended by halo rows, big enough for the kernel of given step,
+        so after cutting the halo off, strips are stitched without any seams
+        and the result is bit-identical to the serial processing.
+
+        Steps processed in strips:
+            - gray conversion and gaussian blur (halo: half of gauss kernel height),
+            - closing (halo: 2 disk radiuses, one for dilation and one for erosion),
+              computed with Filter.fast_closing, as OpenCV releases GIL.
+        Canny is run on the whole frame, as its hysteresis follows edges through
+        any number of rows, so no halo can guarantee the same result.
+        OpenCV already parallelizes Canny internally.
+    '''
+
+    STRIPS: Final[int] = 4
+
+    strips: int = field(default=STRIPS)
+
+    __executor: ThreadPoolExecutor = field(init=False, default=None)
+
+    def __post_init__(self):
+        self.__executor = ThreadPoolExecutor(max_workers=self.strips)
+
+    def __del__(self):
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False)
+
+    def transformFrame(
+        self,
+        frame: numpy.ndarray
+    ) -> tuple[
+        numpy.ndarray,
+        numpy.ndarray
+    ]:
+        '''
+            Returns 2 frames in tuple.
+            First one is dedicated for detecting the rings,
+            the second one for necklaces and earings
+        '''
+        height, width = frame.shape[:2]
+        gray_frame = numpy.empty((height, width), dtype=numpy.uint8)
+        gaussian_frame = numpy.empty((height, width), dtype=numpy.uint8)
+        rings_frame = numpy.empty((height, width), dtype=numpy.uint8)
+
+        # gray conversion and gaussian blur in strips
+        self.__run_in_strips(
+            lambda strip: self.__gray_and_gauss(
+                frame, gray_frame, gaussian_frame, *strip
+            ),
+            height,
+            Filter.GAUSS_K_SIZE[1] // 2
+        )
+
+        # edge detection on the whole frame
+        canny_frame = Filter.canny(gaussian_frame)
+
+        # closing in strips
+        self.__run_in_strips(
+            lambda strip: self.__closing(canny_frame, rings_frame, *strip),
+            height,
+            2 * Filter.CLOSING_DISK_RADIUS
+        )
+
+        # contours are filled on the whole frame, as they can cross many strips
+        contours = Segmentation.findContours(rings_frame)
+        ear_neck_frame = Draw.contourFill(gray_frame, contours)
+
+        return (rings_frame, ear_neck_frame)
+
+    def __run_in_strips(self, function, height: int, halo: int) -> None:
+        '''
+            Runs function for each strip on thread pool and waits until all are done.
+            Function gets: first and last row of the strip, first and last row including halo.
+        '''
+        strip_height = -(-height // self.strips)
+        strips = []
+
+        for start in range(0, height, strip_height):
+            end = min(start + strip_height, height)
+            strips.append(
+                (start, end, max(start - halo, 0), min(end + halo, height))
+            )
+
+        # list() to wait for all strips and to raise exceptions from threads
+        list(self.__executor.map(function, strips))
+
+    @staticmethod
+    def __gray_and_gauss(
+        frame: numpy.ndarray,
+        gray_frame: numpy.ndarray,
+        gaussian_frame: numpy.ndarray,
+        start: int, end: int, halo_start: int, halo_end: int
+    ) -> None:
+        gray_strip = cv2.cvtColor(frame[halo_start:halo_end], cv2.COLOR_BGR2GRAY)
+        gaussian_strip = Filter.gauss(gray_strip)
+
+        gray_frame[start:end] = gray_strip[start - halo_start:end - halo_start]
+        gaussian_frame[start:end] = gaussian_strip[start - halo_start:end - halo_start]
+
+    @staticmethod
+    def __closing(
+        canny_frame: numpy.ndarray,
+        rings_frame: numpy.ndarray,
+        start: int, end: int, halo_start: int, halo_end: int
+    ) -> None:
+        closed_strip = Filter.fast_closing(
+            canny_frame[halo_start:halo_end],
+            Filter.CLOSING_DISK_RADIUS
+        )
+
+        rings_frame[start:end] = closed_strip[start - halo_start:end - halo_start]
@@ -0,0 +1,204 @@
+import cv2
+import numpy
+from dataclasses import dataclass, field
+from dependencies.objectTracker import ObjectTracker
+
+X = 0
+Y = 1
+
+# names of tracker lists, the same as in tracker state
+OBJECT_TYPES = ("rings", "necklaces", "earings")
+
+
+@dataclass
+class SegmentResult:
+    '''
+        Result of tracking one time segment of the recording with separate tracker.
+        Frames [start, core_start) overlap the previous segment and are analyzed only
+        to find objects visible at the segment boundary (warm-up).
+        Frames [core_start, end) are the ones the segment is responsible for.
+
+        Contains:
+            - boundary_state <- state of the tracker after warm-up, before the first frame of the core,
+            - end_state <- state of the tracker after the last frame,
+            - key_points <- key points found on each frame of the core,
+              as (frame_no, (rings, earings, necklaces)) with (x, y, size) of each key point,
+              used to track the segment again if its boundary state is not the expected one.
+    '''
+
+    start: int = field(default=0)
+    core_start: int = field(default=0)
+    end: int = field(default=0)
+
+    boundary_state: dict = field(default=None)
+    end_state: dict = field(default=None)
+    key_points: list[tuple[int, tuple]] = field(default_factory=list)
+
+    processing_time: float = field(default=0)
+
+    def getAnalyzedFrames(self) -> int:
+        return len(self.key_points)
+
+    def trackFrame(
+        self,
+        tracker: ObjectTracker,
+        frame_no: int,
+        detectedObjects: tuple[
+            tuple[cv2.KeyPoint],
+            tuple[cv2.KeyPoint],
+            tuple[cv2.KeyPoint]
+        ]
+    ) -> None:
+        '''
+            Tracks key points found on the frame of the segment with the segment tracker,
+            saving its state at the segment boundary and key points of the core.
+        '''
+        if self.boundary_state is None and frame_no >= self.core_start:
+            self.boundary_state = tracker.getState()
+
+        rings_KP, earings_KP, necklaces_KP = detectedObjects
+        tracker.trackObjects(
+            rings_key_points=rings_KP,
+            necklaces_key_points=necklaces_KP,
+            earings_key_points=earings_KP
+        )
+
+        if frame_no >= self.core_start:
+            self.recordKeyPoints(frame_no, detectedObjects)
+
+    def finish(self, tracker: ObjectTracker, end: int) -> None:
+        '''
+            Has to be called after the last frame of the segment, end is the number of the next frame.
+        '''
+        # video ended before the core of the segment
+        if self.boundary_state is None:
+            self.boundary_state = tracker.getState()
+
+        self.end = end
+        self.end_state = tracker.getState()
+
+    def recordKeyPoints(
+        self,
+        frame_no: int,
+        detectedObjects: tuple[
+            tuple[cv2.KeyPoint],
+            tuple[cv2.KeyPoint],
+            tuple[cv2.KeyPoint]
+        ]
+    ) -> None:
+        self.key_points.append(
+            (
+                frame_no,
+                tuple(
+                    tuple((kp.pt[X], kp.pt[Y], kp.size) for kp in key_points)
+                    for key_points in detectedObjects
+                )
+            )
+        )
+
+
+@dataclass
+class TrackStitcher:
+    '''
+        Joins results of consecutive segments of one recording into the state of one tracker,
+        the same as after tracking the whole recording serially.
+
+        Tracking of the next frames depends only on visible objects: their order, last positions,
+        number of frames where they were missing and measured belt movement.
+        If visible objects of the segment tracker after warm-up are the same as visible objects
+        of the stitched tracker at the segment boundary, both trackers continue the same way,
+        so tracks of the segment are appended to the stitched ones.
+        Otherwise (i.e. object visible for longer than the overlap), key points of the segment
+        are tracked again by the stitched tracker, which is fast comparing to the detection.
+        Segments have to be added in order.
+    '''
+
+    tracker: ObjectTracker = field(init=False, default_factory=ObjectTracker)
+
+    stitched_segments: int = field(init=False, default=0)
+    tracked_again_segments: int = field(init=False, default=0)
+
+    def addSegment(self, segment: SegmentResult) -> None:
+        state = self.tracker.getState()
+
+        if TrackStitcher.__visible_objects_match(state, segment.boundary_state):
+            self.tracker.restoreState(
+                TrackStitcher.__append_segment_state(state, segment)
+            )
+            self.stitched_segments = self.stitched_segments + 1
+            return None
+
+        for _, detectedObjects in segment.key_points:
+            rings_KP, earings_KP, necklaces_KP = (
+                tuple(cv2.KeyPoint(x, y, size) for x, y, size in key_points)
+                for key_points in detectedObjects
+            )
+            self.tracker.trackObjects(
+                rings_key_points=rings_KP,
+                necklaces_key_points=necklaces_KP,
+                earings_key_points=earings_KP
+            )
+        self.tracked_again_segments = self.tracked_again_segments + 1
+
+        return None
+
+    def getTrackingReport(self) -> dict[str, int]:
+        return self.tracker.getTrackingReport()
+
+    @staticmethod
+    def __visible_objects_match(state: dict, boundary_state: dict) -> bool:
+        for name in OBJECT_TYPES:
+            objects = [object for object in state[name] if object["visible"]]
+            boundary_objects = [object for object in boundary_state[name] if object["visible"]]
+
+            if len(objects) != len(boundary_objects):
+                return False
+
+            for object, boundary_object in zip(objects, boundary_objects):
+                if (
+                    object["missing_on_frames"] != boundary_object["missing_on_frames"] or
+                    object["belt_movement"] != boundary_object["belt_movement"] or
+                    not numpy.array_equal(object["positions"][-1], boundary_object["positions"][-1])
+                ):
+                    return False
+
+        return True
+
+    @staticmethod
+    def __append_segment_state(state: dict, segment: SegmentResult) -> dict:
+        '''
+            Returns state of the stitched tracker after the segment.
+            Visible objects continue as the matching objects of the segment tracker,
+            objects found in the core of the segment are added after already known ones.
+        '''
+        stitched_state = {
+            "analyzed_frames": state["analyzed_frames"] + segment.getAnalyzedFrames()
+        }
+
+        for name in OBJECT_TYPES:
+            objects = [dict(object) for object in state[name]]
+            boundary_objects = segment.boundary_state[name]
+            end_objects = segment.end_state[name]
+
+            # objects not visible after warm-up are not tracked anymore, so they are skipped
+            visible_objects = [object for object in objects if object["visible"]]
+            boundary_ids = [
+                object_id for object_id, object in enumerate(boundary_objects) if object["visible"]
+            ]
+
+            for object, object_id in zip(visible_objects, boundary_ids):
+                boundary_object, end_object = boundary_objects[object_id], end_objects[object_id]
+
+                object["positions"] = numpy.concatenate(
+                    (object["positions"], end_object["positions"][len(boundary_object["positions"]):])
+                )
+                object["found_on_frames"] = (
+                    object["found_on_frames"] +
+                    end_object["found_on_frames"] - boundary_object["found_on_frames"]
+                )
+                for key in ("missing_on_frames", "appended", "visible", "belt_movement"):
+                    object[key] = end_object[key]
+
+            stitched_state[name] = objects + end_objects[len(boundary_objects):]
+
+        return stitched_state
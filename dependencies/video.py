@@ -1,4 +1,5 @@
 import cv2
+import time
 import numpy
 from typing import Final
 from dataclasses import dataclass, field
@@ -22,9 +23,15 @@ class Video:
     height: int = field(default=720)
 
     frame_no: int = field(default=0, init=True)
+    fps: float = field(default=None, init=False)
     frame_flag: bool = field(default=True, init=False)
     capture: cv2.VideoCapture = field(default=None, init=False)
     current_frame: numpy.ndarray = field(default=None, init=False)
+    capture_timestamp: float = field(default=None, init=False)
+
+    # frames read from the file, including the skipped ones, which are also counted as dropped
+    captured_frames: int = field(default=0, init=False)
+    dropped_frames: int = field(default=0, init=False)
 
     def __post_init__(self):
         if self.path is None:
@@ -54,6 +61,7 @@ class Video:
                 self.capture.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
                 self.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
                 self.capture.set(cv2.CAP_PROP_POS_FRAMES, self.frame_no)
+                self.fps = self.capture.get(cv2.CAP_PROP_FPS)
                 break
 
         # execute if loop was not exited with break
@@ -78,6 +86,9 @@ class Video:
         ):
             self.frame_flag, self.current_frame = self.capture.read()
             if self.frame_flag:
+                self.captured_frames = self.captured_frames + 1
+                # monotonic clock, the same as used by live sources, to measure latency
+                self.capture_timestamp = time.monotonic()
                 self.frame_no = self.capture.get(cv2.CAP_PROP_POS_FRAMES)
                 break
 
@@ -96,6 +107,17 @@ class Video:
         )
         return self.current_frame
 
+    def skip_frames(self, frames_to_skip: int) -> None:
+
+        # grab frames without decoding them, as they will not be analyzed
+        for _ in range(frames_to_skip):
+            if not self.capture.grab():
+                break
+            self.captured_frames = self.captured_frames + 1
+            self.dropped_frames = self.dropped_frames + 1
+
+        self.frame_no = self.capture.get(cv2.CAP_PROP_POS_FRAMES)
+
     def get_gray_frame(self) -> numpy.ndarray:
         self.current_frame = cv2.cvtColor(self.get_frame(), cv2.COLOR_BGR2GRAY)
 
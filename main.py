@@ -1,37 +1,244 @@
 import numpy
 import cv2
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from dependencies.descriptions import *
 from dependencies.video import Video
+from dependencies.capture import LatestFrameCapture, CameraCapture, SimulatedCamera
 from dependencies.filter import Filter
 from dependencies.segmentation import Segmentation
 from dependencies.draw import Draw
+from dependencies.blobDetector import BlobDetector
 from dependencies.blobDetectorInit import RINGS_DETECTOR, EARINGS_DETECTOR, NECKLACES_DETECTOR
 from dependencies.objectTracker import ObjectTracker
+from dependencies.objectsDefinition import Ring, Necklace, Earings
+from dependencies.keyPointRecorder import KeyPointRecorder
+from dependencies.beltMotion import BeltMotionEstimator
+from dependencies.scheduler import DeadlineScheduler
+from dependencies.metrics import PipelineMetrics
+from dependencies.stripParallel import StripParallelPreprocessor
+from dependencies.batchPreprocessing import BatchedVideo
+from dependencies.backgroundModel import BackgroundModel
+from dependencies.predictedWindows import PredictedWindows
+from dependencies.memoryProfiler import MemoryProfiler
+from dependencies.latencyTracer import LatencyTracer
+from dependencies.frameBus import FrameBus
+from dependencies.presenceGate import PresenceGate
+from dependencies.pipeline import Stage, StageGraph
+from dependencies.checkpoint import TrackerCheckpointer
+from dependencies.configWatcher import ConfigWatcher, PipelineConfig
 
 VIDEO_FILE_PATH = "./assets/nagranie_v4_cut.mp4"
 STARTING_FRAME_NO = 0
+DEFAULT_FPS = 30
+
+# values passed to the stage graph on each frame
+STAGE_GRAPH_SOURCES = ("frame", "scale", "belt_movement", "frame_delta", "capture_timestamp")
+# outputs of the stage graph needed on each frame, frame_to_display is requested only to display it
+STAGE_GRAPH_OUTPUTS = ("rings_KP", "earings_KP", "necklaces_KP", "tracked")
+
+# rows and columns around a pixel, which change its value after Canny (gradient and non-maximum suppression),
+# hysteresis can follow edges further, so rare differences are left to detectObjectsInRegions
+CANNY_HALO = 2
+
+# set in __main__, functions of this file are also used without it (i.e. by segmented.py)
+presence_gate: PresenceGate = None
 
 
 def main():
 
+    previous_frame_no = None
+
     while (org_frame := video.get_frame()) is not None:
+        scheduler.startFrame()
+
+        # number of source frames since the previous analyzed one,
+        # greater than 1 if frames were skipped or dropped
+        frame_delta = 1 if previous_frame_no is None else int(video.frame_no - previous_frame_no)
+        previous_frame_no = video.frame_no
+
+        # config modified on the line is applied between frames, as a whole
+        if config_watcher is not None and (config := config_watcher.takePendingConfig()) is not None:
+            applyConfig(config)
+
+        belt_movement = None
+        if belt_motion_estimator is not None:
+            belt_movement = belt_motion_estimator.estimate(org_frame)
+
+        # the whole frame processed by stages of the graph
+        if stage_graph is not None:
+            outputs = stage_graph.run(
+                sources={
+                    "frame": org_frame,
+                    "scale": scheduler.getDetectionScale(),
+                    "belt_movement": belt_movement,
+                    "frame_delta": frame_delta,
+                    "capture_timestamp": video.capture_timestamp
+                },
+                outputs=STAGE_GRAPH_OUTPUTS + (
+                    ("frame_to_display",) if scheduler.shouldRender() else ()
+                )
+            )
+            detectedObjects = (
+                outputs["rings_KP"],
+                outputs["earings_KP"],
+                outputs["necklaces_KP"]
+            )
+            frame_to_display = outputs.get("frame_to_display")
+
+        else:
+            regions = None
+            if predicted_windows is not None:
+
+                # foreground regions replace the entry band, model is updated on each frame
+                entry_regions = None
+                if background_model is not None:
+                    with scheduler.measure("backgroundModel"):
+                        entry_regions = background_model.getForegroundRegions(org_frame)
+
+                # None on frames, where the whole frame is searched
+                regions = predicted_windows.getRegions(
+                    tracker,
+                    org_frame.shape[:2],
+                    frame_delta,
+                    entry_regions
+                )
+
+            with scheduler.measure("transformFrame"):
+                if regions is not None:
+                    transformedFrames = transformFrameInRegions(org_frame, regions)
+
+                # frames were transformed in batch, when they were read
+                elif isinstance(video, BatchedVideo):
+                    transformedFrames = video.get_transformed_frames()
+
+                # strips are used only with full resolution
+                elif (
+                    strip_preprocessor is not None and
+                    scheduler.getDetectionScale() == 1.0
+                ):
+                    transformedFrames = strip_preprocessor.transformFrame(org_frame)
+                else:
+                    transformedFrames = transformFrame(
+                        org_frame,
+                        scheduler.getDetectionScale()
+                    )
+
+            # frame is passed to the tracker only if it will be displayed
+            frame_to_draw = org_frame if scheduler.shouldRender() else None
 
-        transformedFrames = transformFrame(org_frame)
+            # each object type detected and tracked in separate task,
+            # available only for detection on the whole frame
+            if class_executor is not None and regions is None:
+                with scheduler.measure("detectAndTrackObjects"):
+                    detectedObjects, frame_to_display = detectAndCountObjectsConcurrently(
+                        transformedFrames,
+                        frame_to_draw,
+                        belt_movement,
+                        frame_delta,
+                        video.capture_timestamp
+                    )
+            else:
+                with scheduler.measure("detectObjects"):
+                    detectedObjects = detectObjects(transformedFrames, regions)
 
-        detectedObjects = detectObjects(transformedFrames)
+                with scheduler.measure("trackObjects"):
+                    frame_to_display = countObjects(
+                        detectedObjects,
+                        frame_to_draw,
+                        belt_movement,
+                        frame_delta,
+                        video.capture_timestamp
+                    )
 
-        frame_to_display = countObjects(detectedObjects, org_frame)
+        if latency_tracer is not None:
+            latency_tracer.observeFrame(video.capture_timestamp)
 
-        video.show_frame(frame_to_display)
+        if recorder is not None:
+            recorder.record(video.frame_no, detectedObjects)
+
+        # frames are published for viewers in other processes, instead of displaying them
+        if frame_bus is not None:
+            frame_bus.publish(
+                video.frame_no,
+                video.capture_timestamp,
+                org_frame,
+                frame_to_display
+            )
+        elif scheduler.shouldRender():
+            video.show_frame(frame_to_display)
+
+        if isinstance(video, LatestFrameCapture):
+            video.mark_processed()
+
+        video.skip_frames(scheduler.endFrame())
+
+        if checkpointer is not None:
+            checkpointer.update(video.frame_no, tracker)
+
+        if memory_profiler is not None:
+            memory_profiler.update(tracker)
 
     tracker.printTrackingReport()
 
+    if latency_tracer is not None:
+        latency_tracer.printLatencyReport(tracker)
+
+    if presence_gate is not None:
+        presence_gate.printGateReport()
+
+    if isinstance(video, LatestFrameCapture):
+        video.print_capture_report()
+
+    if args.real_time:
+        scheduler.printSchedulingReport()
+
+    if predicted_windows is not None:
+        predicted_windows.printPredictionReport()
+
+    if recorder is not None:
+        recorder.save()
+
+    if checkpointer is not None:
+        checkpointer.close()
+        if checkpointer.failed_writes:
+            print("Checkpoints not written: ", checkpointer.failed_writes)
+
+    if config_watcher is not None:
+        config_watcher.stop()
+
+    if frame_bus is not None:
+        frame_bus.close()
+
+    if metrics is not None:
+        metrics.shutdown()
+
+    if memory_profiler is not None:
+        memory_profiler.report(tracker)
+        memory_profiler.stop()
+
+    return None
+
+
+def applyConfig(config: PipelineConfig) -> None:
+    '''
+        Applies config loaded by ConfigWatcher.
+        Detectors are already built, so they are only swapped.
+    '''
+    global RINGS_DETECTOR, EARINGS_DETECTOR, NECKLACES_DETECTOR
+
+    config.applyConstants()
+
+    RINGS_DETECTOR = config.detectors["rings"]
+    EARINGS_DETECTOR = config.detectors["earings"]
+    NECKLACES_DETECTOR = config.detectors["necklaces"]
+
     return None
 
 
 def transformFrame(
-    frame: numpy.ndarray
+    frame: numpy.ndarray,
+    scale: float = 1.0
 ) -> tuple[
     numpy.ndarray,
     numpy.ndarray
@@ -39,19 +246,43 @@ def transformFrame(
     '''
         Returns 2 frames in tuple.
         First one is dedicated for detecting the rings,
-        the second one for necklaces and earings
+        the second one for necklaces and earings.
+        If scale is lower than 1, edges are detected on the frame with lowered resolution
+        and then scaled back to the original resolution.
     '''
     # Zamiana klatki na odcienie szarości
     gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
 
+    # Zmniejszenie rozdzielczości klatki do wykrywania krawędzi
+    edges_frame = gray_frame
+    if scale != 1.0:
+        edges_frame = cv2.resize(
+            gray_frame,
+            None,
+            fx=scale,
+            fy=scale,
+            interpolation=cv2.INTER_AREA
+        )
+
     # Rozmazanie klatki
-    gaussian_frame = Filter.gauss(gray_frame)
+    gaussian_frame = Filter.gauss(edges_frame)
 
     # Wykrywanie krawędzi
     canny_frame = Filter.canny(gaussian_frame)
 
     # Domknięcie krawędzi
-    rings_frame = Filter.closing(canny_frame, 2)
+    rings_frame = Filter.fast_closing(
+        canny_frame,
+        max(1, round(Filter.CLOSING_DISK_RADIUS * scale))
+    )
+
+    # Przywrócenie pierwotnej rozdzielczości
+    if scale != 1.0:
+        rings_frame = cv2.resize(
+            rings_frame,
+            (gray_frame.shape[1], gray_frame.shape[0]),
+            interpolation=cv2.INTER_NEAREST
+        )
 
     # Znalezienie krawędzi
     contours = Segmentation.findContours(rings_frame)
@@ -62,11 +293,57 @@ def transformFrame(
     return (rings_frame, ear_neck_frame)
 
 
+def transformFrameInRegions(
+    frame: numpy.ndarray,
+    regions: list[tuple[int, int, int, int]]
+) -> tuple[
+    numpy.ndarray,
+    numpy.ndarray
+]:
+    '''
+        Returns the same 2 frames as transformFrame,
+        but edges are detected and filled only inside given regions (x, y, width, height).
+        Outside of them, frame for rings is empty and frame for necklaces and earings is just gray.
+        Edges are detected on regions extended by the halo of blur, Canny and closing,
+        so inside regions they are the same as on the whole frame.
+    '''
+    # Zamiana klatki na odcienie szarości
+    gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    rings_frame = numpy.zeros_like(gray_frame)
+    frame_height, frame_width = gray_frame.shape
+    halo = max(Filter.GAUSS_K_SIZE) // 2 + CANNY_HALO + 2 * Filter.CLOSING_DISK_RADIUS
+
+    for x, y, width, height in regions:
+        halo_x, halo_y = max(x - halo, 0), max(y - halo, 0)
+        gray_halo_region = gray_frame[
+            halo_y:min(y + height + halo, frame_height),
+            halo_x:min(x + width + halo, frame_width)
+        ]
+
+        # Rozmazanie, wykrywanie krawędzi i ich domknięcie w obszarze z marginesem, bez marginesu w wyniku
+        rings_frame[y:y + height, x:x + width] = Filter.fast_closing(
+            Filter.canny(Filter.gauss(gray_halo_region)),
+            Filter.CLOSING_DISK_RADIUS
+        )[y - halo_y:y - halo_y + height, x - halo_x:x - halo_x + width]
+
+    # Znalezienie krawędzi, we współrzędnych całej klatki, i ich wypełnienie,
+    # dopiero po wykryciu krawędzi wszystkich obszarów, których marginesy czytają szarą klatkę
+    for x, y, width, height in regions:
+        contours = Segmentation.findContours(
+            rings_frame[y:y + height, x:x + width],
+            offset=(x, y)
+        )
+        Draw.contourFill(gray_frame, contours)
+
+    return (rings_frame, gray_frame)
+
+
 def detectObjects(
     framesForDetection: tuple[
         numpy.ndarray,
         numpy.ndarray
-    ]
+    ],
+    regions: list[tuple[int, int, int, int]] = None
 ) -> tuple[
     tuple[cv2.KeyPoint],
     tuple[cv2.KeyPoint],
@@ -77,30 +354,184 @@ def detectObjects(
             - rings,
             - earings,
             - necklaces.
+        If regions (x, y, width, height) are provided, objects are detected only inside them.
     '''
+    if regions is not None:
+        return detectObjectsInRegions(framesForDetection, regions)
+
     # Rozpakowanie tuple przygotowanych ramek
     rings_frame = framesForDetection[0]
     ear_neck_frame = framesForDetection[1]
 
     # Znalezienie pierścionków
-    rings_KP = RINGS_DETECTOR.detect_objects(rings_frame)
+    rings_KP = detectObjectsOfType(Ring, RINGS_DETECTOR, rings_frame)
 
     # Znalezienie kolczyków
-    earings_KP = EARINGS_DETECTOR.detect_objects(ear_neck_frame)
+    earings_KP = detectObjectsOfType(Earings, EARINGS_DETECTOR, ear_neck_frame)
 
     # Znalezienie naszyjników
-    necklaces_KP = NECKLACES_DETECTOR.detect_objects(ear_neck_frame)
+    necklaces_KP = detectObjectsOfType(Necklace, NECKLACES_DETECTOR, ear_neck_frame)
 
     return (rings_KP, earings_KP, necklaces_KP)
 
 
+def detectObjectsOfType(
+    object_type: type[Ring | Necklace | Earings],
+    detector: BlobDetector,
+    frame: numpy.ndarray
+) -> tuple[cv2.KeyPoint]:
+    '''
+        Returns key points found by the detector.
+        If presence gate is used, detector is skipped on frames where objects of given type can not be found.
+    '''
+    if presence_gate is None:
+        return detector.detect_objects(frame)
+
+    return presence_gate.detect(object_type, detector, frame)
+
+
+def detectAndCountObjectsConcurrently(
+    framesForDetection: tuple[
+        numpy.ndarray,
+        numpy.ndarray
+    ],
+    frame_to_mark_objects: numpy.ndarray,
+    belt_movement: tuple[float, float] = None,
+    frame_delta: int = 1,
+    capture_timestamp: float = None
+) -> tuple[
+    tuple[
+        tuple[cv2.KeyPoint],
+        tuple[cv2.KeyPoint],
+        tuple[cv2.KeyPoint]
+    ],
+    numpy.ndarray
+]:
+    '''
+        Does the same as detectObjects followed by countObjects,
+        but each object type is detected and tracked in separate task on thread pool.
+        Objects are marked on the frame after all tasks are done,
+        so tasks never write to the same frame.
+        Returns key points (as detectObjects) and frame with marked objects.
+    '''
+    # Rozpakowanie tuple przygotowanych ramek
+    rings_frame = framesForDetection[0]
+    ear_neck_frame = framesForDetection[1]
+
+    tracker.countAnalyzedFrame()
+
+    # Znalezienie i identyfikacja pierścionków, kolczyków i naszyjników w osobnych zadaniach
+    rings_task = class_executor.submit(
+        detectAndTrackObjectsOfType,
+        Ring, RINGS_DETECTOR, rings_frame,
+        belt_movement, frame_delta, capture_timestamp
+    )
+    earings_task = class_executor.submit(
+        detectAndTrackObjectsOfType,
+        Earings, EARINGS_DETECTOR, ear_neck_frame,
+        belt_movement, frame_delta, capture_timestamp
+    )
+    necklaces_task = class_executor.submit(
+        detectAndTrackObjectsOfType,
+        Necklace, NECKLACES_DETECTOR, ear_neck_frame,
+        belt_movement, frame_delta, capture_timestamp
+    )
+
+    rings_KP = rings_task.result()
+    earings_KP = earings_task.result()
+    necklaces_KP = necklaces_task.result()
+
+    # Zaznaczenie obiektów na ramce
+    frame_to_display = tracker.drawObjects(
+        frame_to_mark_objects,
+        rings_key_points=rings_KP,
+        necklaces_key_points=necklaces_KP,
+        earings_key_points=earings_KP
+    )
+
+    return ((rings_KP, earings_KP, necklaces_KP), frame_to_display)
+
+
+def detectAndTrackObjectsOfType(
+    object_type: type[Ring | Necklace | Earings],
+    detector: BlobDetector,
+    frame: numpy.ndarray,
+    belt_movement: tuple[float, float] = None,
+    frame_delta: int = 1,
+    capture_timestamp: float = None
+) -> tuple[cv2.KeyPoint]:
+    '''
+        Returns key points of objects of given type, after tracking them.
+    '''
+    key_points = detectObjectsOfType(object_type, detector, frame)
+
+    tracker.trackObjectsOfType(
+        object_type, key_points, belt_movement, frame_delta, capture_timestamp
+    )
+
+    return key_points
+
+
+def detectObjectsInRegions(
+    framesForDetection: tuple[
+        numpy.ndarray,
+        numpy.ndarray
+    ],
+    regions: list[tuple[int, int, int, int]]
+) -> tuple[
+    tuple[cv2.KeyPoint],
+    tuple[cv2.KeyPoint],
+    tuple[cv2.KeyPoint]
+]:
+    '''
+        Returns the same 3 tuples of key points as detectObjects,
+        but objects are detected separately inside each region (x, y, width, height).
+        Key points are moved to the coordinates of the whole frame.
+        Blobs cut by the edge of the region (not the edge of the frame) are dropped,
+        as their shape and position are not the same as on the whole frame.
+    '''
+    rings_KP, earings_KP, necklaces_KP = [], [], []
+    frame_height, frame_width = framesForDetection[0].shape[:2]
+
+    for x, y, width, height in regions:
+        detectedObjects = detectObjects(
+            (
+                framesForDetection[0][y:y + height, x:x + width],
+                framesForDetection[1][y:y + height, x:x + width]
+            )
+        )
+
+        # Przesunięcie key points do współrzędnych całej klatki
+        for all_KP, region_KP in zip(
+            (rings_KP, earings_KP, necklaces_KP),
+            detectedObjects
+        ):
+            for key_point in region_KP:
+                radius = key_point.size / 2
+                if (
+                    (x > 0 and key_point.pt[0] - radius <= 0) or
+                    (y > 0 and key_point.pt[1] - radius <= 0) or
+                    (x + width < frame_width and key_point.pt[0] + radius >= width - 1) or
+                    (y + height < frame_height and key_point.pt[1] + radius >= height - 1)
+                ):
+                    continue
+
+                key_point.pt = (key_point.pt[0] + x, key_point.pt[1] + y)
+                all_KP.append(key_point)
+
+    return (tuple(rings_KP), tuple(earings_KP), tuple(necklaces_KP))
+
+
 def countObjects(
     detectedObjects: tuple[
         tuple[cv2.KeyPoint],
         tuple[cv2.KeyPoint],
         tuple[cv2.KeyPoint]
     ],
-    frame_to_mark_objects: numpy.ndarray
+    frame_to_mark_objects: numpy.ndarray,
+    belt_movement: tuple[float, float] = None,
+    frame_delta: int = 1,
+    capture_timestamp: float = None
 ) -> numpy.ndarray:
     '''
         Returns frame passed in, with marked objects which were found
@@ -115,7 +546,150 @@ def countObjects(
         rings_key_points=rings_KP,
         necklaces_key_points=necklaces_KP,
         earings_key_points=earings_KP,
-        frame_to_draw=frame_to_mark_objects
+        frame_to_draw=frame_to_mark_objects,
+        belt_movement=belt_movement,
+        frame_delta=frame_delta,
+        capture_timestamp=capture_timestamp
+    )
+
+
+def trackDetectedObjects(
+    rings_KP: tuple[cv2.KeyPoint],
+    earings_KP: tuple[cv2.KeyPoint],
+    necklaces_KP: tuple[cv2.KeyPoint],
+    belt_movement: tuple[float, float] = None,
+    frame_delta: int = 1,
+    capture_timestamp: float = None
+) -> int:
+    '''
+        Tracks objects without marking them on the frame.
+        Returns number of analyzed frames, so other stages can depend on tracking.
+    '''
+    countObjects(
+        (rings_KP, earings_KP, necklaces_KP),
+        None,
+        belt_movement,
+        frame_delta,
+        capture_timestamp
+    )
+
+    return tracker.getAnalyzedFrames()
+
+
+def buildStageGraph(workers: int = 1) -> StageGraph:
+    '''
+        Returns graph of stages doing the same as transformFrame, detectObjects and countObjects.
+        Gray frame is not filled in place, so it can be shared by stages.
+        Detectors are read on each call, so they can be swapped by applyConfig.
+    '''
+    stages = [
+        # Zamiana klatki na odcienie szarości
+        Stage(
+            "gray",
+            lambda frame: cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY),
+            ("frame",),
+            ("gray_frame",)
+        ),
+
+        # Zmniejszenie rozdzielczości klatki do wykrywania krawędzi
+        Stage(
+            "downscale",
+            lambda gray_frame, scale: gray_frame if scale == 1.0 else cv2.resize(
+                gray_frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA
+            ),
+            ("gray_frame", "scale"),
+            ("edges_frame",)
+        ),
+
+        # Rozmazanie klatki
+        Stage("gauss", Filter.gauss, ("edges_frame",), ("gaussian_frame",)),
+
+        # Wykrywanie krawędzi
+        Stage("canny", Filter.canny, ("gaussian_frame",), ("canny_frame",)),
+
+        # Domknięcie krawędzi
+        Stage(
+            "closing",
+            lambda canny_frame, scale: Filter.fast_closing(
+                canny_frame, max(1, round(Filter.CLOSING_DISK_RADIUS * scale))
+            ),
+            ("canny_frame", "scale"),
+            ("closed_frame",)
+        ),
+
+        # Przywrócenie pierwotnej rozdzielczości
+        Stage(
+            "upscale",
+            lambda closed_frame, gray_frame, scale: closed_frame if scale == 1.0 else cv2.resize(
+                closed_frame,
+                (gray_frame.shape[1], gray_frame.shape[0]),
+                interpolation=cv2.INTER_NEAREST
+            ),
+            ("closed_frame", "gray_frame", "scale"),
+            ("rings_frame",)
+        ),
+
+        # Znalezienie krawędzi
+        Stage("contours", Segmentation.findContours, ("rings_frame",), ("contours",)),
+
+        # Wypełnienie znalezionych krawędzi, na kopii klatki w odcieniach szarości
+        Stage(
+            "fill",
+            lambda gray_frame, contours: Draw.contourFill(gray_frame.copy(), contours),
+            ("gray_frame", "contours"),
+            ("ear_neck_frame",)
+        ),
+
+        # Znalezienie pierścionków, kolczyków i naszyjników
+        Stage(
+            "detectRings",
+            lambda rings_frame: detectObjectsOfType(Ring, RINGS_DETECTOR, rings_frame),
+            ("rings_frame",),
+            ("rings_KP",)
+        ),
+        Stage(
+            "detectEarings",
+            lambda ear_neck_frame: detectObjectsOfType(Earings, EARINGS_DETECTOR, ear_neck_frame),
+            ("ear_neck_frame",),
+            ("earings_KP",)
+        ),
+        Stage(
+            "detectNecklaces",
+            lambda ear_neck_frame: detectObjectsOfType(Necklace, NECKLACES_DETECTOR, ear_neck_frame),
+            ("ear_neck_frame",),
+            ("necklaces_KP",)
+        ),
+
+        # Identyfikacja obiektów
+        Stage(
+            "track",
+            trackDetectedObjects,
+            (
+                "rings_KP", "earings_KP", "necklaces_KP",
+                "belt_movement", "frame_delta", "capture_timestamp"
+            ),
+            ("tracked",)
+        ),
+
+        # Zaznaczenie obiektów na ramce
+        Stage(
+            "render",
+            lambda frame, rings_KP, earings_KP, necklaces_KP: tracker.drawObjects(
+                frame,
+                rings_key_points=rings_KP,
+                necklaces_key_points=necklaces_KP,
+                earings_key_points=earings_KP
+            ),
+            ("frame", "rings_KP", "earings_KP", "necklaces_KP"),
+            ("frame_to_display",)
+        )
+    ]
+
+    return StageGraph(
+        stages=stages,
+        sources=STAGE_GRAPH_SOURCES,
+        workers=workers,
+        measure=scheduler.measure
     )
 
 
@@ -135,11 +709,324 @@ if __name__ == "__main__":
         type=int,
         help=START_FRAME_NUMBER_HELPER
     )
-    args = parser.parse_args()
-    video = Video(
-        path=args.video_file_path,
-        frame_no=args.start_frame_number
+    parser.add_argument(
+        "-r",
+        "--record_key_points",
+        default=None,
+        type=str,
+        help=RECORD_KEY_POINTS_HELPER
+    )
+    parser.add_argument(
+        "-m",
+        "--measure_belt_motion",
+        action="store_true",
+        help=MEASURE_BELT_MOTION_HELPER
+    )
+    parser.add_argument(
+        "--belt_strip",
+        nargs=2,
+        default=None,
+        type=int,
+        metavar=("TOP", "BOTTOM"),
+        help=BELT_STRIP_HELPER
+    )
+    parser.add_argument(
+        "-t",
+        "--real_time",
+        action="store_true",
+        help=REAL_TIME_HELPER
+    )
+    parser.add_argument(
+        "-c",
+        "--camera_index",
+        default=None,
+        type=int,
+        help=CAMERA_INDEX_HELPER
+    )
+    parser.add_argument(
+        "-s",
+        "--simulate_camera",
+        action="store_true",
+        help=SIMULATE_CAMERA_HELPER
+    )
+    parser.add_argument(
+        "--metrics_port",
+        default=None,
+        type=int,
+        help=METRICS_PORT_HELPER
+    )
+    parser.add_argument(
+        "--strips",
+        default=None,
+        type=int,
+        help=STRIPS_HELPER
+    )
+    parser.add_argument(
+        "-b",
+        "--background_model",
+        action="store_true",
+        help=BACKGROUND_MODEL_HELPER
+    )
+    parser.add_argument(
+        "--concurrent_classes",
+        action="store_true",
+        help=CONCURRENT_CLASSES_HELPER
+    )
+    parser.add_argument(
+        "--checkpoint_path",
+        default=None,
+        type=str,
+        help=CHECKPOINT_PATH_HELPER
+    )
+    parser.add_argument(
+        "--checkpoint_interval",
+        default=TrackerCheckpointer.CHECKPOINT_INTERVAL,
+        type=int,
+        help=CHECKPOINT_INTERVAL_HELPER
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=RESUME_HELPER
+    )
+    parser.add_argument(
+        "-w",
+        "--predicted_windows",
+        action="store_true",
+        help=PREDICTED_WINDOWS_HELPER
+    )
+    parser.add_argument(
+        "--full_sweep_interval",
+        default=PredictedWindows.FULL_SWEEP_INTERVAL,
+        type=int,
+        help=FULL_SWEEP_INTERVAL_HELPER
     )
+    parser.add_argument(
+        "--frame_stride",
+        default=1,
+        type=int,
+        help=FRAME_STRIDE_HELPER
+    )
+    parser.add_argument(
+        "--profile_memory",
+        action="store_true",
+        help=PROFILE_MEMORY_HELPER
+    )
+    parser.add_argument(
+        "--memory_report_interval",
+        default=MemoryProfiler.REPORT_INTERVAL,
+        type=int,
+        help=MEMORY_REPORT_INTERVAL_HELPER
+    )
+    parser.add_argument(
+        "--memory_report_path",
+        default=None,
+        type=str,
+        help=MEMORY_REPORT_PATH_HELPER
+    )
+    parser.add_argument(
+        "--stage_graph",
+        action="store_true",
+        help=STAGE_GRAPH_HELPER
+    )
+    parser.add_argument(
+        "--stage_workers",
+        default=1,
+        type=int,
+        help=STAGE_WORKERS_HELPER
+    )
+    parser.add_argument(
+        "--trace_latency",
+        action="store_true",
+        help=TRACE_LATENCY_HELPER
+    )
+    parser.add_argument(
+        "--frame_bus",
+        default=None,
+        type=str,
+        help=FRAME_BUS_HELPER
+    )
+    parser.add_argument(
+        "--presence_gate",
+        action="store_true",
+        help=PRESENCE_GATE_HELPER
+    )
+    parser.add_argument(
+        "--validate_presence_gate",
+        action="store_true",
+        help=VALIDATE_PRESENCE_GATE_HELPER
+    )
+    parser.add_argument(
+        "--batch_size",
+        default=None,
+        type=int,
+        help=BATCH_SIZE_HELPER
+    )
+    parser.add_argument(
+        "--config",
+        default=None,
+        type=str,
+        help=CONFIG_HELPER
+    )
+    args = parser.parse_args()
+
+    # tracemalloc counts allocations of the whole process, so stages running at the same time
+    # would be counted in each other's peaks
+    if args.profile_memory and (args.concurrent_classes or args.stage_workers > 1):
+        parser.error("--profile_memory can not be combined with --concurrent_classes or --stage_workers")
+
+    # live sources keep only the newest frame, so they drop frames on their own and can not skip them
+    if args.frame_stride != 1 and (args.camera_index is not None or args.simulate_camera):
+        parser.error("--frame_stride can not be combined with --camera_index or --simulate_camera")
+
+    if args.belt_strip is not None and not args.measure_belt_motion:
+        parser.error("--belt_strip requires --measure_belt_motion")
+
+    if args.stage_graph and (
+        args.background_model or args.predicted_windows or
+        args.strips is not None or args.concurrent_classes
+    ):
+        parser.error(
+            "--stage_graph can not be combined with --background_model, "
+            "--predicted_windows, --strips or --concurrent_classes"
+        )
+
+    if args.batch_size is not None and args.batch_size < 1:
+        parser.error("--batch_size has to be at least 1")
+
+    if args.batch_size is not None and (
+        args.real_time or args.camera_index is not None or args.simulate_camera or
+        args.background_model or args.predicted_windows or args.strips is not None or
+        args.stage_graph or args.frame_stride != 1
+    ):
+        parser.error(
+            "--batch_size is available only for offline processing of the whole frames, "
+            "without --real_time, --frame_stride, camera or other preprocessing modes"
+        )
+
+    # continue from the frame saved in checkpoint, with saved tracker state
+    tracker_state = None
+    if args.resume:
+        if args.checkpoint_path is None:
+            parser.error("--resume requires --checkpoint_path")
+        args.start_frame_number, tracker_state = TrackerCheckpointer.load(
+            args.checkpoint_path
+        )
+        print(f"Resuming from frame {args.start_frame_number}")
+
+    config_watcher = None
+    if args.config is not None:
+        config_watcher = ConfigWatcher(
+            path=args.config,
+            detectors={
+                "rings": RINGS_DETECTOR,
+                "earings": EARINGS_DETECTOR,
+                "necklaces": NECKLACES_DETECTOR
+            }
+        )
+
+    if args.camera_index is not None:
+        video = CameraCapture(device_index=args.camera_index)
+    elif args.simulate_camera:
+        video = SimulatedCamera(
+            path=args.video_file_path,
+            start_frame_no=args.start_frame_number
+        )
+    else:
+        video = Video(
+            path=args.video_file_path,
+            frame_no=args.start_frame_number
+        )
+
+    if args.batch_size is not None:
+        video = BatchedVideo(video=video, batch_size=args.batch_size)
 
     tracker = ObjectTracker()
+    if tracker_state is not None:
+        tracker.restoreState(tracker_state)
+
+    checkpointer = None
+    if args.checkpoint_path is not None:
+        checkpointer = TrackerCheckpointer(
+            path=args.checkpoint_path,
+            interval=args.checkpoint_interval
+        )
+
+    recorder = None
+    if args.record_key_points is not None:
+        recorder = KeyPointRecorder(path=args.record_key_points)
+
+    strip_preprocessor = None
+    if args.strips is not None:
+        strip_preprocessor = StripParallelPreprocessor(strips=args.strips)
+
+    class_executor = None
+    if args.concurrent_classes:
+        class_executor = ThreadPoolExecutor(max_workers=3)
+
+    background_model = None
+    if args.background_model:
+        background_model = BackgroundModel()
+
+    # foreground regions are searched with windows of tracked objects, as static objects become background
+    predicted_windows = None
+    if args.predicted_windows or args.background_model:
+        predicted_windows = PredictedWindows(
+            full_sweep_interval=args.full_sweep_interval
+        )
+
+    belt_motion_estimator = None
+    if args.measure_belt_motion:
+        # belt fills the whole frame, unless its strip is given
+        strip_top, strip_bottom = args.belt_strip or (0, video.height)
+        if not 0 <= strip_top < strip_bottom <= video.height:
+            parser.error(f"--belt_strip has to be within rows 0 and {video.height}")
+
+        belt_motion_estimator = BeltMotionEstimator(
+            strip_top=strip_top,
+            strip_bottom=strip_bottom
+        )
+
+    scheduler = DeadlineScheduler(
+        frame_period=1 / (video.fps or DEFAULT_FPS),
+        enabled=args.real_time,
+        frame_stride=args.frame_stride,
+        live=isinstance(video, LatestFrameCapture)
+    )
+
+    if args.presence_gate or args.validate_presence_gate:
+        presence_gate = PresenceGate(validate=args.validate_presence_gate)
+
+    frame_bus = None
+    if args.frame_bus is not None:
+        frame_bus = FrameBus(
+            name=args.frame_bus,
+            frame_shape=(video.height, video.width, 3)
+        )
+
+    latency_tracer = None
+    if args.trace_latency:
+        latency_tracer = LatencyTracer()
+
+    memory_profiler = None
+    if args.profile_memory:
+        memory_profiler = MemoryProfiler(
+            report_interval=args.memory_report_interval,
+            path=args.memory_report_path
+        )
+        scheduler.stage_profiler = memory_profiler
+
+    metrics = None
+    if args.metrics_port is not None:
+        metrics = PipelineMetrics(
+            port=args.metrics_port,
+            video=video,
+            tracker=tracker
+        )
+        scheduler.stage_observer = metrics.observeStage
+
+    stage_graph = None
+    if args.stage_graph:
+        stage_graph = buildStageGraph(workers=args.stage_workers)
+
     main()
@@ -0,0 +1,167 @@
+import io
+import time
+import typing
+import argparse
+import itertools
+import contextlib
+from dependencies.descriptions import *
+from dependencies.keyPointRecorder import KeyPointReplay
+from dependencies.objectTracker import ObjectTracker
+from dependencies.objectsDefinition import Ring, Necklace, Earings
+
+KEY_POINTS_FILE_PATH = "./assets/key_points.npz"
+
+TRACKED_OBJECT_TYPES = {
+    Ring.__name__: Ring,
+    Necklace.__name__: Necklace,
+    Earings.__name__: Earings
+}
+
+
+def main():
+
+    replay = KeyPointReplay(path=args.key_points_file_path)
+
+    # without sweep just replay recording once, with default constants
+    if not args.sweep:
+        replayTracking(replay, args.frame_stride).printTrackingReport()
+        return None
+
+    sweepTrackerConstants(replay, args.sweep, args.frame_stride)
+
+    return None
+
+
+def replayTracking(replay: KeyPointReplay, frame_stride: int = 1) -> ObjectTracker:
+    '''
+        Feeds recorded key points into new tracker, frame by frame,
+        or only every frame_stride-th recorded frame, to check tracking with skipped frames.
+        Numbers of frames since the previous one are taken from the recording.
+        Returns the tracker, after the last frame.
+    '''
+    tracker = ObjectTracker()
+    previous_frame_no = None
+
+    for frame_no, (rings_KP, earings_KP, necklaces_KP) in replay.frames[::frame_stride]:
+        tracker.trackObjects(
+            rings_key_points=rings_KP,
+            necklaces_key_points=necklaces_KP,
+            earings_key_points=earings_KP,
+            frame_delta=1 if previous_frame_no is None else frame_no - previous_frame_no
+        )
+        previous_frame_no = frame_no
+
+    return tracker
+
+
+def sweepTrackerConstants(
+    replay: KeyPointReplay,
+    sweep: list[tuple[type, str, list[int | float]]],
+    frame_stride: int = 1
+) -> None:
+    '''
+        Replays recording for every combination of given tracker constants values
+        and prints tracking report for each of them.
+    '''
+    # remember current values, to restore them after the sweep
+    default_values = [
+        getattr(object_type, constant) for object_type, constant, _ in sweep
+    ]
+
+    for values in itertools.product(*[values for _, _, values in sweep]):
+
+        # set constants for this combination
+        for (object_type, constant, _), value in zip(sweep, values):
+            setattr(object_type, constant, value)
+
+        # replay recording with muted messages about found objects
+        start_time = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            report = replayTracking(replay, frame_stride).getTrackingReport()
+        replay_time = time.perf_counter() - start_time
+
+        print(
+            " ".join(
+                f"{object_type.__name__}.{constant}={value}"
+                for (object_type, constant, _), value in zip(sweep, values)
+            ),
+            "|",
+            f"rings: {report['rings']}",
+            f"necklaces: {report['necklaces']}",
+            f"earings: {report['earings']}",
+            f"({replay_time:.2f} s)"
+        )
+
+    # restore constants
+    for (object_type, constant, _), value in zip(sweep, default_values):
+        setattr(object_type, constant, value)
+
+    return None
+
+
+def parseSweepParameter(text: str) -> tuple[type, str, list[int | float]]:
+    '''
+        Parses sweep parameter in format <Class>.<CONSTANT>=<value>,<value>,...
+        Returns tuple: object type, constant name, list of values.
+    '''
+    try:
+        name, values = text.split("=")
+        object_type_name, constant = name.split(".")
+        object_type = TRACKED_OBJECT_TYPES[object_type_name]
+        values = [
+            float(value) if "." in value else int(value)
+            for value in values.split(",")
+        ]
+    except (ValueError, KeyError):
+        raise argparse.ArgumentTypeError(
+            f"Invalid sweep parameter: {text}"
+        )
+
+    if constant not in getTrackerConstants(object_type):
+        raise argparse.ArgumentTypeError(
+            f"{object_type_name} has no numeric tracker constant {constant}, "
+            f"available: {', '.join(getTrackerConstants(object_type))}"
+        )
+
+    return (object_type, constant, values)
+
+
+def getTrackerConstants(object_type: type) -> list[str]:
+    '''
+        Returns names of tracker constants of the object type, which can be swept:
+        class variables (ClassVar) with numeric values.
+    '''
+    return [
+        name for name, type_hint in typing.get_type_hints(object_type).items()
+        if typing.get_origin(type_hint) is typing.ClassVar and
+        isinstance(getattr(object_type, name), (int, float)) and
+        not isinstance(getattr(object_type, name), bool)
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=REPLAY_PROGRAM_DESCRIPTION)
+    parser.add_argument(
+        "-k",
+        "--key_points_file_path",
+        default=KEY_POINTS_FILE_PATH,
+        type=str,
+        help=KEY_POINTS_FILE_PATH_HELPER
+    )
+    parser.add_argument(
+        "-s",
+        "--sweep",
+        default=[],
+        action="append",
+        type=parseSweepParameter,
+        help=SWEEP_HELPER
+    )
+    parser.add_argument(
+        "--frame_stride",
+        default=1,
+        type=int,
+        help=REPLAY_FRAME_STRIDE_HELPER
+    )
+    args = parser.parse_args()
+
+    main()
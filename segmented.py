@@ -0,0 +1,236 @@
+import io
+import os
+import cv2
+import pickle
+import time
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+from dependencies.descriptions import *
+from dependencies.video import Video
+from dependencies.objectTracker import ObjectTracker
+from dependencies.trackStitching import SegmentResult, TrackStitcher
+from main import transformFrame, detectObjects, VIDEO_FILE_PATH
+
+OVERLAP = 300
+
+
+def main():
+
+    if args.stitch:
+        segments = []
+        for segment_file_path in args.stitch:
+            with open(segment_file_path, "rb") as segment_file:
+                segments.append(pickle.load(segment_file))
+
+        printReport("Stitched", stitchSegments(segments))
+        return None
+
+    frames = countFrames(args.video_file_path)
+    if frames < 1:
+        print("Number of frames is unknown, video is analyzed as one segment")
+
+    bounds = splitIntoSegments(
+        frames,
+        args.segments or args.workers,
+        args.overlap
+    )
+
+    if args.segment is not None and args.segment >= len(bounds):
+        parser.error(f"--segment has to be lower than the number of segments ({len(bounds)})")
+
+    # single segment, i.e. on one of many machines
+    if args.segment is not None:
+        segment = analyzeSegment(args.video_file_path, *bounds[args.segment])
+        with open(args.segment_output, "wb") as segment_file:
+            pickle.dump(segment, segment_file, protocol=pickle.HIGHEST_PROTOCOL)
+        print(
+            f"Segment {args.segment}: frames {segment.core_start}-{segment.end},",
+            f"analyzed in {segment.processing_time:.1f} s"
+        )
+        return None
+
+    start_time = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=initWorker) as executor:
+        segments = list(
+            executor.map(
+                analyzeSegment,
+                [args.video_file_path] * len(bounds),
+                *zip(*bounds)
+            )
+        )
+
+    report = stitchSegments(segments)
+    printReport(
+        f"Stitched {len(segments)} segments in {time.perf_counter() - start_time:.1f} s",
+        report
+    )
+
+    if args.compare_serial:
+        start_time = time.perf_counter()
+        serial_report = stitchSegments(
+            [analyzeSegment(args.video_file_path, 0, 0, None)]
+        )
+        printReport(
+            f"Serial in {time.perf_counter() - start_time:.1f} s",
+            serial_report
+        )
+        print("Counts match" if serial_report == report else "Counts DO NOT match")
+
+    return None
+
+
+def initWorker() -> None:
+    # each process analyzes one segment, so OpenCV threads would only compete for cores
+    cv2.setNumThreads(1)
+
+
+def countFrames(video_file_path: str) -> int:
+    capture = cv2.VideoCapture(video_file_path)
+    frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    capture.release()
+
+    return frames
+
+
+def splitIntoSegments(frames: int, segments: int, overlap: int) -> list[tuple[int, int, int | None]]:
+    '''
+        Returns list of (start, core_start, end) for each segment.
+        End of the last segment is None, as the number of frames in container might be inaccurate,
+        so the last segment is analyzed until the video ends.
+        There are no more segments than frames. If the number of frames is unknown (not positive),
+        the whole video is one segment.
+    '''
+    if frames < 1:
+        return [(0, 0, None)]
+
+    segment_length = -(-frames // max(1, min(segments, frames)))
+    bounds = []
+
+    for core_start in range(0, frames, segment_length):
+        bounds.append(
+            (max(core_start - overlap, 0), core_start, core_start + segment_length)
+        )
+
+    bounds[-1] = (*bounds[-1][:2], None)
+
+    return bounds
+
+
+def analyzeSegment(video_file_path: str, start: int, core_start: int, end: int | None) -> SegmentResult:
+    '''
+        Runs headless pipeline with its own tracker on frames [start, end) of the video file.
+        Returns states of the tracker and key points needed to stitch the segment.
+    '''
+    start_time = time.perf_counter()
+    segment = SegmentResult(start=start, core_start=core_start, end=end)
+
+    # messages about particular objects are not needed in segmented mode
+    with contextlib.redirect_stdout(io.StringIO()):
+        video = Video(path=video_file_path, frame_no=start)
+        tracker = ObjectTracker()
+
+        while (end is None or video.frame_no < end) and (org_frame := video.get_frame()) is not None:
+            # frame_no points at the next frame to read
+            frame_no = int(video.frame_no) - 1
+
+            detectedObjects = detectObjects(transformFrame(org_frame))
+            segment.trackFrame(tracker, frame_no, detectedObjects)
+
+    segment.finish(tracker, int(video.frame_no))
+    segment.processing_time = time.perf_counter() - start_time
+
+    return segment
+
+
+def stitchSegments(segments: list[SegmentResult]) -> dict[str, int]:
+    stitcher = TrackStitcher()
+
+    # messages about objects found while tracking segments again are not needed
+    with contextlib.redirect_stdout(io.StringIO()):
+        for segment in sorted(segments, key=lambda segment: segment.core_start):
+            stitcher.addSegment(segment)
+
+    print(
+        f"Segments stitched: {stitcher.stitched_segments},",
+        f"tracked again: {stitcher.tracked_again_segments}"
+    )
+
+    return stitcher.getTrackingReport()
+
+
+def printReport(title: str, report: dict[str, int]) -> None:
+    print(title)
+    print("Analyzed frames: ", report["analyzed_frames"])
+    print("Found rings: ", report["rings"])
+    print("Found necklaces: ", report["necklaces"])
+    print("Found earings: ", report["earings"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=SEGMENTED_PROGRAM_DESCRIPTION)
+    parser.add_argument(
+        "-p",
+        "--video_file_path",
+        default=VIDEO_FILE_PATH,
+        type=str,
+        help=VIDEO_FILE_PATH_HELPER
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        default=os.cpu_count(),
+        type=int,
+        help=SEGMENT_WORKERS_HELPER
+    )
+    parser.add_argument(
+        "-n",
+        "--segments",
+        default=None,
+        type=int,
+        help=SEGMENTS_HELPER
+    )
+    parser.add_argument(
+        "-o",
+        "--overlap",
+        default=OVERLAP,
+        type=int,
+        help=OVERLAP_HELPER
+    )
+    parser.add_argument(
+        "--segment",
+        default=None,
+        type=int,
+        help=SEGMENT_HELPER
+    )
+    parser.add_argument(
+        "--segment_output",
+        default=None,
+        type=str,
+        help=SEGMENT_OUTPUT_HELPER
+    )
+    parser.add_argument(
+        "--stitch",
+        nargs="+",
+        default=None,
+        type=str,
+        help=STITCH_HELPER
+    )
+    parser.add_argument(
+        "--compare_serial",
+        action="store_true",
+        help=COMPARE_SERIAL_HELPER
+    )
+    args = parser.parse_args()
+
+    if args.segment is not None and args.segment_output is None:
+        parser.error("--segment requires --segment_output")
+
+    if args.workers < 1 or (args.segments is not None and args.segments < 1):
+        parser.error("--workers and --segments have to be at least 1")
+
+    if args.segment is not None and args.segment < 0:
+        parser.error("--segment can not be negative")
+
+    main()
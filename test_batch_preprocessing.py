@@ -0,0 +1,54 @@
+import numpy
+import pytest
+from dependencies.batchPreprocessing import BatchPreprocessor
+from main import transformFrame
+from test_strip_parallel import readPreviewFrames, makeFrame, ODD_FRAME_SHAPES
+
+BATCH_SIZES = (1, 2, 3, 8)
+
+
+def assertIdentical(frames: list[numpy.ndarray], batch_size: int) -> None:
+    # frames are copied, as transformFrame fills contours on its gray frame
+    expected_frames = [
+        tuple(transformed.copy() for transformed in transformFrame(frame)) for frame in frames
+    ]
+    preprocessor = BatchPreprocessor()
+
+    # returned frames are valid only until the next batch, so each batch is compared separately
+    for start in range(0, len(frames), batch_size):
+        for (rings_frame, ear_neck_frame), (expected_rings_frame, expected_ear_neck_frame) in zip(
+            preprocessor.transformFrames(frames[start:start + batch_size]),
+            expected_frames[start:start + batch_size]
+        ):
+            assert numpy.array_equal(rings_frame, expected_rings_frame)
+            assert numpy.array_equal(ear_neck_frame, expected_ear_neck_frame)
+
+
+@pytest.mark.parametrize("batch_size", BATCH_SIZES)
+def test_preview_frames_are_identical(batch_size: int):
+    frames = readPreviewFrames()
+    if not frames:
+        pytest.skip("preview frames can not be read")
+
+    assertIdentical(frames, batch_size)
+
+
+@pytest.mark.parametrize("batch_size", BATCH_SIZES)
+@pytest.mark.parametrize("shape", ODD_FRAME_SHAPES)
+def test_odd_frames_are_identical(batch_size: int, shape: tuple[int, int]):
+    # different frames in one batch, so guard rows separate frames which differ
+    frames = [makeFrame(*shape)]
+    frames.append(numpy.ascontiguousarray(frames[0][::-1]))
+    frames.append(numpy.ascontiguousarray(frames[0][:, ::-1]))
+
+    assertIdentical(frames, batch_size)
+
+
+@pytest.mark.parametrize("batch_size", BATCH_SIZES)
+def test_uniform_frames_are_identical(batch_size: int):
+    # black and white frames next to each other, where guard rows must not leak edges
+    frames = [
+        numpy.full((120, 160, 3), value, dtype=numpy.uint8) for value in (0, 255, 0, 255, 128)
+    ]
+
+    assertIdentical(frames, batch_size)
@@ -0,0 +1,45 @@
+import cv2
+import numpy
+import pytest
+from dependencies.filter import Filter
+from test_strip_parallel import readPreviewFrames, makeFrame, ODD_FRAME_SHAPES
+
+# radius of transformFrame, also scaled (max(1, round(CLOSING_DISK_RADIUS * scale)))
+DISK_RADII = (1, 2, 3, 5)
+
+
+def toCannyFrame(frame: numpy.ndarray) -> numpy.ndarray:
+    return Filter.canny(Filter.gauss(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)))
+
+
+def assertIdentical(frame: numpy.ndarray, disk_radius: int) -> None:
+    assert numpy.array_equal(
+        Filter.fast_closing(frame, disk_radius),
+        Filter.closing(frame, disk_radius)
+    )
+
+
+@pytest.mark.parametrize("disk_radius", DISK_RADII)
+def test_preview_frames_are_identical(disk_radius: int):
+    frames = readPreviewFrames()
+    if not frames:
+        pytest.skip("preview frames can not be read")
+
+    for frame in frames:
+        assertIdentical(toCannyFrame(frame), disk_radius)
+
+
+@pytest.mark.parametrize("disk_radius", DISK_RADII)
+@pytest.mark.parametrize("shape", ODD_FRAME_SHAPES)
+def test_odd_frames_are_identical(disk_radius: int, shape: tuple[int, int]):
+    assertIdentical(toCannyFrame(makeFrame(*shape)), disk_radius)
+
+
+@pytest.mark.parametrize("disk_radius", DISK_RADII)
+@pytest.mark.parametrize("value", (0, 255))
+def test_uniform_frames_are_identical(disk_radius: int, value: int):
+    # edges at the frame border, where border handling of both closings has to match
+    frame = numpy.full((64, 96), value, dtype=numpy.uint8)
+    frame[0, :] = 255 - value
+    frame[:, -1] = 255 - value
+    assertIdentical(frame, disk_radius)
@@ -0,0 +1,123 @@
+import io
+import cv2
+import numpy
+import pytest
+import contextlib
+from dependencies.keyPointRecorder import KeyPointRecorder, KeyPointReplay
+from dependencies.objectTracker import ObjectTracker
+from dependencies.trackStitching import SegmentResult, TrackStitcher
+from segmented import splitIntoSegments
+
+FRAMES = 3000
+SEGMENTS = (1, 2, 3, 5, 8, 16)
+OVERLAPS = (0, 30, 300)
+
+
+def makeKeyPoints() -> list[tuple[int, tuple]]:
+    '''
+        Returns key points of synthetic recording, as detected on each frame:
+        rings moving along the belt, necklaces and pairs of earings moving slowly,
+        all of them missing on some frames, and phantoms found only on a few frames.
+    '''
+    generator = numpy.random.default_rng(FRAMES)
+    frames = [([], [], []) for _ in range(FRAMES)]
+
+    # (class index, first frame, x, y, movement per frame, size, number of key points)
+    objects = []
+    for first_frame in range(0, FRAMES, 70):
+        objects.append(
+            (0, first_frame + int(generator.integers(20)), 20.0, float(generator.integers(100, 620)), 4.0, 60.0, 1)
+        )
+    for first_frame in range(30, FRAMES, 450):
+        objects.append((2, first_frame, 100.0, 360.0, 1.0, 400.0, 1))
+    for first_frame in range(200, FRAMES, 500):
+        objects.append(
+            (1, first_frame, 60.0, float(generator.integers(100, 620)), 1.0, 40.0, 2)
+        )
+
+    for object_class, first_frame, x, y, movement, size, key_points in objects:
+        for frame_no in range(first_frame, FRAMES):
+            x = x + movement + generator.normal(0, 0.5)
+            if x > 1280:
+                break
+            if generator.random() < 0.1:
+                continue
+            for key_point in range(key_points):
+                frames[frame_no][object_class].append(
+                    cv2.KeyPoint(x, y + key_point * 90 + generator.normal(0, 0.5), size)
+                )
+
+    for frame_no in generator.integers(0, FRAMES, 40):
+        for phantom_frame_no in range(frame_no, min(frame_no + 3, FRAMES)):
+            frames[phantom_frame_no][0].append(cv2.KeyPoint(1100.0, 50.0, 60.0))
+
+    return [
+        (frame_no, tuple(tuple(key_points) for key_points in detectedObjects))
+        for frame_no, detectedObjects in enumerate(frames)
+    ]
+
+
+@pytest.fixture(scope="module")
+def recorded_frames(tmp_path_factory) -> list[tuple[int, tuple]]:
+    # recorded and loaded again, as segments are stitched from recorded key points
+    path = str(tmp_path_factory.mktemp("key_points") / "key_points.npz")
+    recorder = KeyPointRecorder(path=path)
+    for frame_no, detectedObjects in makeKeyPoints():
+        recorder.record(frame_no, detectedObjects)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        recorder.save()
+
+    return KeyPointReplay(path=path).frames
+
+
+def trackSerially(frames: list[tuple[int, tuple]]) -> dict[str, int]:
+    tracker = ObjectTracker()
+    for _, (rings_KP, earings_KP, necklaces_KP) in frames:
+        tracker.trackObjects(
+            rings_key_points=rings_KP,
+            necklaces_key_points=necklaces_KP,
+            earings_key_points=earings_KP
+        )
+
+    return tracker.getTrackingReport()
+
+
+def trackInSegments(frames: list[tuple[int, tuple]], segments: int, overlap: int) -> TrackStitcher:
+    stitcher = TrackStitcher()
+
+    for start, core_start, end in splitIntoSegments(len(frames), segments, overlap):
+        end = len(frames) if end is None else end
+        segment = SegmentResult(start=start, core_start=core_start, end=end)
+        tracker = ObjectTracker()
+
+        for frame_no, detectedObjects in frames[start:end]:
+            segment.trackFrame(tracker, frame_no, detectedObjects)
+        segment.finish(tracker, end)
+
+        stitcher.addSegment(segment)
+
+    return stitcher
+
+
+@pytest.mark.parametrize("overlap", OVERLAPS)
+@pytest.mark.parametrize("segments", SEGMENTS)
+def test_stitched_report_is_serial_report(recorded_frames, segments: int, overlap: int):
+    with contextlib.redirect_stdout(io.StringIO()):
+        serial_report = trackSerially(recorded_frames)
+        stitcher = trackInSegments(recorded_frames, segments, overlap)
+
+    assert serial_report["rings"] > 0 and serial_report["necklaces"] > 0 and serial_report["earings"] > 0
+    assert stitcher.getTrackingReport() == serial_report
+    assert stitcher.stitched_segments + stitcher.tracked_again_segments == min(segments, FRAMES)
+
+
+def test_segments_are_stitched_and_tracked_again(recorded_frames):
+    # both ways of joining segments are compared with serial tracking above,
+    # segments overlapping the whole recording before them are always the same as serial tracking
+    with contextlib.redirect_stdout(io.StringIO()):
+        long_overlap_stitcher = trackInSegments(recorded_frames, 2, FRAMES)
+        no_overlap_stitcher = trackInSegments(recorded_frames, 8, 0)
+
+    assert long_overlap_stitcher.stitched_segments == 2
+    assert no_overlap_stitcher.tracked_again_segments > 0
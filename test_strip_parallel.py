@@ -0,0 +1,66 @@
+import cv2
+import numpy
+import pytest
+from dependencies.stripParallel import StripParallelPreprocessor
+from main import transformFrame
+
+PREVIEW_FILE_PATH = "./assets/previews/1.mp4"
+PREVIEW_FRAME_NUMBERS = (0, 200, 450)
+STRIPS = (1, 2, 3, 4, 7, 16)
+ODD_FRAME_SHAPES = ((333, 517), (97, 1001), (720, 1279), (15, 15))
+
+
+def readPreviewFrames() -> list[numpy.ndarray]:
+    capture = cv2.VideoCapture(PREVIEW_FILE_PATH)
+    frames = []
+
+    for frame_no in PREVIEW_FRAME_NUMBERS:
+        capture.set(cv2.CAP_PROP_POS_FRAMES, frame_no)
+        frame_flag, frame = capture.read()
+        if frame_flag:
+            frames.append(cv2.resize(frame, (1280, 720)))
+
+    capture.release()
+
+    return frames
+
+
+def makeFrame(height: int, width: int) -> numpy.ndarray:
+    '''
+        Returns noisy frame with bright belt and dark rings, so all steps have something to do.
+    '''
+    generator = numpy.random.default_rng(height * width)
+    frame = numpy.full((height, width, 3), 180, dtype=numpy.uint8)
+
+    for _ in range(max(1, height * width // 20_000)):
+        center = (int(generator.integers(width)), int(generator.integers(height)))
+        radius = int(generator.integers(3, max(4, min(height, width) // 3)))
+        cv2.circle(frame, center, radius, (40, 40, 40), int(generator.integers(1, 6)))
+
+    noise = generator.integers(-30, 30, frame.shape)
+    return numpy.clip(frame + noise, 0, 255).astype(numpy.uint8)
+
+
+def assertIdentical(frame: numpy.ndarray, strips: int) -> None:
+    # transformFrame fills contours on its own gray frame, the input frame is not changed
+    expected_rings_frame, expected_ear_neck_frame = transformFrame(frame)
+    rings_frame, ear_neck_frame = StripParallelPreprocessor(strips=strips).transformFrame(frame)
+
+    assert numpy.array_equal(rings_frame, expected_rings_frame)
+    assert numpy.array_equal(ear_neck_frame, expected_ear_neck_frame)
+
+
+@pytest.mark.parametrize("strips", STRIPS)
+def test_preview_frames_are_identical(strips: int):
+    frames = readPreviewFrames()
+    if not frames:
+        pytest.skip(f"{PREVIEW_FILE_PATH} can not be read")
+
+    for frame in frames:
+        assertIdentical(frame, strips)
+
+
+@pytest.mark.parametrize("strips", STRIPS)
+@pytest.mark.parametrize("shape", ODD_FRAME_SHAPES)
+def test_odd_frames_are_identical(strips: int, shape: tuple[int, int]):
+    assertIdentical(makeFrame(*shape), strips)
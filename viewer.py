@@ -0,0 +1,121 @@
+import cv2
+import time
+import argparse
+from dependencies.descriptions import *
+from dependencies.frameBus import FrameBusReader
+
+WINDOW_TITLE = "Frame bus"
+EXIT_KEY = 27
+POLL_INTERVAL = 0.005
+RECORDING_FPS = 30
+PUBLISHER_TIMEOUT = 10
+
+
+def main():
+
+    reader = FrameBusReader(name=args.name)
+    writer = None
+    latency_sum = 0.0
+    latency_samples = 0
+
+    print(f"Attached to frame bus {args.name}: {reader.slots} slots of {reader.frame_shape}")
+
+    while True:
+        # recorder needs all frames it can get, viewer only the newest one
+        frame = reader.readNext() if args.record is not None else reader.readLatest()
+
+        if frame is None:
+            if reader.isClosed():
+                print("Frame bus closed")
+                break
+            # publisher crashed, so the frame bus is never closed
+            if not reader.isPublisherAlive() or reader.getIdleTime() > args.timeout:
+                print("Publisher stopped")
+                break
+            time.sleep(POLL_INTERVAL)
+            continue
+
+        frame_no, capture_timestamp, raw_frame, annotated_frame = frame
+        frame_to_show = raw_frame if args.raw else annotated_frame
+
+        # monotonic clock is shared by processes on the same machine
+        if capture_timestamp is not None:
+            latency_sum = latency_sum + time.monotonic() - capture_timestamp
+            latency_samples = latency_samples + 1
+
+        if args.record is not None:
+            if writer is None:
+                writer = cv2.VideoWriter(
+                    args.record,
+                    cv2.VideoWriter_fourcc(*"mp4v"),
+                    args.fps,
+                    (frame_to_show.shape[1], frame_to_show.shape[0])
+                )
+            writer.write(frame_to_show)
+
+        if not args.no_display:
+            cv2.imshow(WINDOW_TITLE, frame_to_show)
+            if cv2.waitKey(1) == EXIT_KEY:
+                print("Program exited")
+                break
+
+    if writer is not None:
+        writer.release()
+    cv2.destroyAllWindows()
+
+    print("Received frames: ", reader.received_frames)
+    print("Missed frames: ", reader.missed_frames)
+    print("Torn reads: ", reader.torn_reads)
+    if latency_samples:
+        print("Capture to view latency [ms]: ", round(latency_sum / latency_samples * 1000, 2))
+
+    reader.close()
+
+    return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=VIEWER_PROGRAM_DESCRIPTION)
+    parser.add_argument(
+        "-n",
+        "--name",
+        required=True,
+        type=str,
+        help=FRAME_BUS_NAME_HELPER
+    )
+    parser.add_argument(
+        "--raw",
+        action="store_true",
+        help=VIEWER_RAW_HELPER
+    )
+    parser.add_argument(
+        "-r",
+        "--record",
+        default=None,
+        type=str,
+        help=VIEWER_RECORD_HELPER
+    )
+    parser.add_argument(
+        "--fps",
+        default=RECORDING_FPS,
+        type=float,
+        help=VIEWER_FPS_HELPER
+    )
+    parser.add_argument(
+        "--no_display",
+        action="store_true",
+        help=VIEWER_NO_DISPLAY_HELPER
+    )
+    parser.add_argument(
+        "-t",
+        "--timeout",
+        default=PUBLISHER_TIMEOUT,
+        type=float,
+        help=VIEWER_TIMEOUT_HELPER
+    )
+    args = parser.parse_args()
+
+    if args.timeout <= 0:
+        parser.error("--timeout has to be positive")
+
+    main()